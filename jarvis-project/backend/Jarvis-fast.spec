@@ -0,0 +1,130 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Start-up optimized build: `pyinstaller Jarvis-fast.spec`
+#
+# Same app as Jarvis.spec, but laid out for fast launches:
+#   - onedir: dist/Jarvis-fast/ is run in place, nothing is unpacked to a
+#     temp folder on every boot
+#   - no UPX: compressed binaries cost time on each start
+#   - bytecode optimized (asserts stripped). Level 2 would also strip
+#     docstrings, which breaks libraries that read __doc__ at import time
+#   - litellm without its proxy admin UI, proxy server app and tests, and
+#     with the bundled model cost map instead of a download at import time
+#   - the Spotify worker is built into the same folder, sharing its libraries
+from PyInstaller.utils.hooks import collect_all, collect_data_files, collect_submodules
+
+OPTIMIZE = 1
+
+# Pieces of litellm that Jarvis never imports (we only talk to Ollama).
+# litellm itself imports litellm.proxy._types, so the proxy package stays and
+# only its server app goes.
+LITELLM_UNUSED = ['litellm.proxy.proxy_server', 'litellm.proxy.proxy_cli', 'litellm.tests']
+LITELLM_UNUSED_DATA = ['proxy/_experimental/**', 'proxy/swagger/**', 'tests/**', '**/*.md']
+
+# Other GUI toolkits, test runners and cloud SDKs that get pulled in by
+# optional imports. pywebview only needs its Linux (GTK/Qt) platform.
+EXCLUDES = [
+    'tkinter',
+    'matplotlib',
+    'pytest',
+    'boto3',
+    'botocore',
+    'google.cloud',
+    'webview.platforms.winforms',
+    'webview.platforms.edgechromium',
+    'webview.platforms.mshtml',
+    'webview.platforms.cocoa',
+    'webview.platforms.android',
+] + LITELLM_UNUSED
+
+def is_used(name):
+    return not any(name == unused or name.startswith(unused + '.') for unused in LITELLM_UNUSED)
+
+datas = [('gui', 'gui')]
+binaries = []
+hiddenimports = []
+for package in ('dns', 'readchar', 'yaspin', 'engineio', 'flask_socketio', 'webview'):
+    tmp_ret = collect_all(package)
+    datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
+
+# litellm: submodules and data, minus the unused parts
+hiddenimports += collect_submodules('litellm', filter=is_used)
+datas += collect_data_files('litellm', excludes=LITELLM_UNUSED_DATA)
+
+
+jarvis = Analysis(
+    ['server.py'],
+    pathex=[],
+    binaries=binaries,
+    datas=datas,
+    hiddenimports=hiddenimports,
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=['rth_fast_start.py'],
+    excludes=EXCLUDES,
+    noarchive=False,
+    optimize=OPTIMIZE,
+)
+worker = Analysis(
+    ['spotify_worker.py'],
+    pathex=[],
+    binaries=[],
+    datas=[],
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=EXCLUDES,
+    noarchive=False,
+    optimize=OPTIMIZE,
+)
+
+jarvis_pyz = PYZ(jarvis.pure)
+worker_pyz = PYZ(worker.pure)
+
+jarvis_exe = EXE(
+    jarvis_pyz,
+    jarvis.scripts,
+    [],
+    exclude_binaries=True,
+    name='Jarvis-fast',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=True,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+# Named as SpotifyClient expects to find it next to the main executable
+worker_exe = EXE(
+    worker_pyz,
+    worker.scripts,
+    [],
+    exclude_binaries=True,
+    name='spotify_worker',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=True,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+
+coll = COLLECT(
+    jarvis_exe,
+    jarvis.binaries,
+    jarvis.datas,
+    worker_exe,
+    worker.binaries,
+    worker.datas,
+    strip=False,
+    upx=False,
+    name='Jarvis-fast',
+)
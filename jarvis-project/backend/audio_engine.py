@@ -0,0 +1,205 @@
+"""
+Long-lived audio playback engine.
+
+The mixer is opened once and stays open for the life of the process.
+Replies are split into sentences; one thread synthesizes them while another
+plays them, so the first sentence starts playing while later ones are still
+being generated. Clips are decoded straight from memory (no temp files), and
+an optional TTSCache lets repeated phrases skip synthesis entirely.
+"""
+import io
+import queue
+import threading
+import time
+
+import pygame
+
+from tts_backends import GTTSBackend, split_sentences
+from tts_cache import audio_format
+from tracing import current_trace
+
+
+class Utterance:
+    """One queued reply. `done` is set when it finished playing or was dropped."""
+
+    def __init__(self, text, generation):
+        self.text = text
+        self.generation = generation
+        self.sentences = split_sentences(text) or [text]
+        self.done = threading.Event()
+        self.cancelled = False
+        # Synthesis and playback happen on engine threads; keep the caller's trace
+        self.trace = current_trace()
+        self.queued_at = time.perf_counter()
+        self.playing = False
+
+
+class AudioEngine:
+    def __init__(self, stop_event=None, cache=None, backends=None, poll_interval=0.01):
+        # The engine watches the caller's stop_event so "stop" cuts playback
+        self.stop_event = stop_event or threading.Event()
+        self.cache = cache
+        self.backends = backends or [GTTSBackend()]
+        self.poll_interval = poll_interval
+        self._text_queue = queue.Queue()
+        self._clip_queue = queue.Queue(maxsize=4)
+        self._interrupt = threading.Event()
+        self._generation = 0
+        self._threads = []
+        self._lock = threading.Lock()
+
+    # --- LIFECYCLE ---
+    def start(self):
+        with self._lock:
+            if self._threads and all(t.is_alive() for t in self._threads):
+                return
+            self._threads = [
+                threading.Thread(target=self._synth_loop, name="tts-synth", daemon=True),
+                threading.Thread(target=self._play_loop, name="audio-engine", daemon=True),
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def shutdown(self):
+        self.stop()
+        self._text_queue.put(None)
+
+    # --- PUBLIC API ---
+    def say(self, text, wait=True):
+        """Queue `text` for playback. Blocks until it has been spoken if `wait`."""
+        self.start()
+        with self._lock:
+            utterance = Utterance(text, self._generation)
+        self._text_queue.put(utterance)
+        if wait:
+            utterance.done.wait()
+        return utterance
+
+    def stop(self):
+        """Cut the current utterance and drop everything still queued."""
+        with self._lock:
+            self._generation += 1
+        self._interrupt.set()
+
+    def prewarm(self, phrases):
+        """Synthesize fixed replies into the cache on a background thread."""
+        if self.cache is None:
+            return None
+
+        def warm():
+            warmed = 0
+            sentences = [s for text in phrases for s in (split_sentences(text) or [text])]
+            for text in sentences:
+                backend = next((b for b in self.backends if b.available()), None)
+                if backend is None:
+                    return
+                if self.cache.contains(text, backend.lang, backend.cache_tag):
+                    continue
+                try:
+                    self.cache.put(text, backend.synthesize(text), backend.lang, backend.cache_tag)
+                    warmed += 1
+                except Exception as e:
+                    print(f"(TTS Prewarm Error: {e})")
+                    backend.mark_failed()
+            if warmed:
+                print(f"🔥 Pre-warmed {warmed} voice replies.")
+
+        thread = threading.Thread(target=warm, name="tts-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+    def is_busy(self):
+        return pygame.mixer.get_init() is not None and pygame.mixer.music.get_busy()
+
+    # --- WORKERS ---
+    def _is_stale(self, utterance):
+        return self.stop_event.is_set() or utterance.generation != self._generation
+
+    def _synth_loop(self):
+        while True:
+            utterance = self._text_queue.get()
+            if utterance is None:
+                self._clip_queue.put(None)
+                break
+            for sentence in utterance.sentences:
+                if self._is_stale(utterance):
+                    break
+                started = time.perf_counter()
+                try:
+                    clip = self._synthesize(sentence)
+                except Exception as e:
+                    print(f"(TTS Error: {e})")
+                    continue
+                if utterance.trace is not None:
+                    utterance.trace.record("tts_synth", time.perf_counter() - started, started)
+                self._clip_queue.put((utterance, clip))
+            # End-of-utterance marker so the player can release the caller
+            self._clip_queue.put((utterance, None))
+
+    def _play_loop(self):
+        try:
+            pygame.mixer.init()
+        except Exception as e:
+            print(f"(Audio Init Error: {e})")
+
+        while True:
+            item = self._clip_queue.get()
+            if item is None:
+                break
+            utterance, clip = item
+            if clip is None:
+                utterance.cancelled = utterance.cancelled or self._is_stale(utterance)
+                utterance.done.set()
+                continue
+            if self._is_stale(utterance):
+                utterance.cancelled = True
+                continue
+            try:
+                self._play(clip, utterance)
+            except Exception as e:
+                print(f"(Playback Error: {e})")
+
+        if pygame.mixer.get_init():
+            pygame.mixer.quit()
+
+    def _synthesize(self, text):
+        """Cached clip from the first usable backend, synthesizing if needed."""
+        last_error = None
+        for backend in self.backends:
+            if self.cache is not None:
+                data = self.cache.get(text, backend.lang, backend.cache_tag)
+                if data:
+                    return data
+            if not backend.available():
+                continue
+            try:
+                data = backend.synthesize(text)
+            except Exception as e:
+                # Probably offline: let the next backend take over for a while
+                backend.mark_failed()
+                last_error = e
+                continue
+            if self.cache is not None:
+                self.cache.put(text, data, backend.lang, backend.cache_tag)
+            return data
+        raise RuntimeError(f"no TTS backend could speak {text!r} ({last_error})")
+
+    def _play(self, data, utterance):
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        fmt = audio_format(data)
+        self._interrupt.clear()
+        pygame.mixer.music.load(io.BytesIO(data), fmt)
+        pygame.mixer.music.play()
+        if not utterance.playing:
+            utterance.playing = True
+            if utterance.trace is not None:
+                utterance.trace.record("playback_start", time.perf_counter() - utterance.queued_at, utterance.queued_at)
+
+        while pygame.mixer.music.get_busy():
+            if self._is_stale(utterance):
+                pygame.mixer.music.stop()
+                utterance.cancelled = True
+                break
+            self._interrupt.wait(self.poll_interval)
+        pygame.mixer.music.unload()
@@ -0,0 +1,8 @@
+"""
+Constants shared by the listener and the modules behind it.
+
+Kept free of imports so server.py can use them without loading the
+microphone, wake-word or STT stacks (those come up lazily as subsystems).
+"""
+
+WAKE_PHRASE = "hey jarvis"
@@ -0,0 +1,176 @@
+"""
+Bounded memory for the interpreter session.
+
+Open Interpreter keeps every message of every turn in `interpreter.messages`
+and sends all of it with each prompt, so a process that runs for a day ends
+up sending a very long prompt to Ollama for every question. `Conversation`
+wraps the chat call and, before each one:
+  - starts a new session if Jarvis has been idle for a while
+  - shortens old code output
+  - replaces the oldest turns with a one-message summary until the history
+    fits the token budget
+Token counts are estimates (about four characters per token), which is
+close enough to keep the prompt bounded without loading a tokenizer.
+
+There is one interpreter per process, but commands run on a worker pool, so
+one turn (compaction included) holds a lock until its stream is finished or
+closed; a second LLM question waits for the first instead of interleaving.
+"""
+import threading
+import time
+
+
+def estimate_tokens(text):
+    return (len(text) + 3) // 4
+
+
+def message_tokens(message):
+    content = message.get("content")
+    if not isinstance(content, str):
+        content = str(content or "")
+    return estimate_tokens(content) + 4  # role/format overhead
+
+
+class Conversation:
+    def __init__(self, interpreter, max_tokens=3000, keep_turns=4, idle_reset=15 * 60,
+                 max_output_chars=600, summary_chars=600):
+        self.interpreter = interpreter
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns
+        self.idle_reset = idle_reset
+        self.max_output_chars = max_output_chars
+        self.summary_chars = summary_chars
+        self.last_used = None
+        self.last_prompt_tokens = 0
+        self.compactions = 0
+        self.resets = 0
+        self._lock = threading.RLock()
+
+    # --- PUBLIC API ---
+    def stream(self, prompt, **kwargs):
+        """interpreter.chat(prompt, stream=True) with the history kept in bounds.
+
+        Holds the conversation until the stream ends; close() it when stopping early.
+        """
+        with self._lock:
+            if self.last_used is not None and time.monotonic() - self.last_used > self.idle_reset:
+                print("🧹 Idle for a while, starting a new conversation.")
+                self.reset()
+            self.compact(reserve=estimate_tokens(prompt))
+
+            self.last_prompt_tokens = self.prompt_tokens() + estimate_tokens(prompt)
+            print(f"🧮 Prompt: ~{self.last_prompt_tokens} tokens ({len(self.interpreter.messages)} messages of history)")
+            try:
+                yield from self.interpreter.chat(prompt, stream=True, **kwargs)
+            finally:
+                self.last_used = time.monotonic()
+
+    def in_context(self):
+        """True while earlier turns can change what the next question means ("why?", "tell me more")."""
+        if not self.interpreter.messages:
+            return False
+        return self.last_used is None or time.monotonic() - self.last_used <= self.idle_reset
+
+    def reset(self):
+        with self._lock:
+            self.interpreter.messages = []
+            self.last_used = None
+            self.resets += 1
+
+    def prompt_tokens(self):
+        return self._system_tokens() + sum(message_tokens(m) for m in self.interpreter.messages)
+
+    def stats(self):
+        return {
+            "messages": len(self.interpreter.messages),
+            "history_tokens": self.prompt_tokens(),
+            "last_prompt_tokens": self.last_prompt_tokens,
+            "compactions": self.compactions,
+            "resets": self.resets,
+        }
+
+    # --- COMPACTION ---
+    def compact(self, reserve=0):
+        with self._lock:
+            self._compact(reserve)
+
+    def _compact(self, reserve):
+        messages = self.interpreter.messages
+        if not messages:
+            return
+        budget = self.max_tokens - reserve
+        self._trim_outputs(messages)
+        if self.prompt_tokens() <= budget:
+            return
+
+        turns = self._turns(messages)
+        summary = None
+        if turns and self._is_summary(turns[0][0]):
+            summary = turns.pop(0)[0]
+        dropped = []
+        while len(turns) > self.keep_turns:
+            dropped.append(turns.pop(0))
+            if self._fits(summary, dropped, turns, budget):
+                break
+        # Still too big with only the recent turns left: drop those too, oldest first
+        while len(turns) > 1 and not self._fits(summary, dropped, turns, budget):
+            dropped.append(turns.pop(0))
+        if not dropped:
+            return
+
+        kept = [self._summarize(summary, dropped)]
+        for turn in turns:
+            kept.extend(turn)
+        self.interpreter.messages = kept
+        self.compactions += 1
+        print(f"🧹 Compacted {len(dropped)} old turn(s) into a summary.")
+
+    def _system_tokens(self):
+        system = estimate_tokens(getattr(self.interpreter, "system_message", "") or "")
+        return system + estimate_tokens(getattr(self.interpreter, "custom_instructions", "") or "")
+
+    def _fits(self, summary, dropped, turns, budget):
+        total = self._system_tokens() + message_tokens(self._summarize(summary, dropped))
+        total += sum(message_tokens(m) for turn in turns for m in turn)
+        return total <= budget
+
+    def _trim_outputs(self, messages):
+        """Old console output and code rarely matter later; keep their start."""
+        for message in messages:
+            if message.get("type") in ("console", "code") and isinstance(message.get("content"), str):
+                if len(message["content"]) > self.max_output_chars:
+                    message["content"] = message["content"][:self.max_output_chars] + "\n...(truncated)"
+
+    @staticmethod
+    def _turns(messages):
+        """Split the history into turns, each starting at a user message."""
+        turns = []
+        for message in messages:
+            if message.get("role") == "user" or not turns:
+                turns.append([])
+            turns[-1].append(message)
+        return turns
+
+    @staticmethod
+    def _is_summary(message):
+        return message.get("role") == "user" and str(message.get("content", "")).startswith("(Earlier in this conversation")
+
+    def _summarize(self, summary, dropped):
+        """One short message standing in for the dropped turns (extractive, no LLM call)."""
+        lines = []
+        if summary is not None:
+            previous = str(summary["content"]).split(":", 1)[-1].strip(" )")
+            if previous:
+                lines.append(previous)
+        for turn in dropped:
+            asked = next((m["content"] for m in turn if m.get("role") == "user" and m.get("type") == "message"), "")
+            answered = [m["content"] for m in turn if m.get("role") == "assistant" and m.get("type") == "message"]
+            if asked:
+                line = f"I asked: {str(asked)[:120]}"
+                if answered:
+                    line += f" / you said: {str(answered[-1])[:160]}"
+                lines.append(line)
+        text = "; ".join(lines)
+        if len(text) > self.summary_chars:
+            text = "..." + text[-self.summary_chars:]
+        return {"role": "user", "type": "message", "content": f"(Earlier in this conversation: {text})"}
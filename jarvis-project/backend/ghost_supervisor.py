@@ -0,0 +1,236 @@
+"""
+Supervisor for the ghost environment (Xvfb on :99 + Spotify inside it).
+
+Both are started as child processes we own, and readiness is probed rather
+than assumed: the display is up when its X socket accepts a connection,
+and Spotify is up when its MPRIS name appears on the session bus, owned by
+the process we started. One that was already running is adopted only if it
+is on the ghost display (e.g. left over from an earlier run); the worker
+clicks at fixed positions there, so a Spotify on the real desktop is never
+reported ready, and ours starts once it is closed. A monitor thread
+restarts whichever one dies, so the stack recovers without restarting
+Jarvis.
+"""
+import os
+import shutil
+import socket
+import subprocess
+import threading
+import time
+
+from mpris import MprisPlayer
+
+
+def x_socket_path(display):
+    return f"/tmp/.X11-unix/X{display.lstrip(':').split('.')[0]}"
+
+
+def display_is_up(display):
+    path = x_socket_path(display)
+    if not os.path.exists(path):
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(0.2)
+        try:
+            sock.connect(path)
+            return True
+        except OSError:
+            return False
+
+
+def display_of(pid):
+    """DISPLAY a process was started with, or None if it can't be read."""
+    try:
+        with open(f"/proc/{pid}/environ", "rb") as f:
+            env = f.read().split(b"\0")
+    except OSError:
+        return None
+    for entry in env:
+        if entry.startswith(b"DISPLAY="):
+            return entry[len(b"DISPLAY="):].decode("utf-8", "replace")
+    return None
+
+
+def same_display(a, b):
+    return a is not None and b is not None and a.split(".")[0] == b.split(".")[0]
+
+
+def wait_until(check, timeout, interval=0.05):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if check():
+            return True
+        time.sleep(interval)
+    return check()
+
+
+class GhostSupervisor:
+    def __init__(self, display=":99", screen="1024x768x24", spotify_cmd=("spotify",), check_interval=1.0):
+        self.display = display
+        self.screen = screen
+        self.spotify_cmd = list(spotify_cmd)
+        self.check_interval = check_interval
+        self.player = MprisPlayer("spotify")
+        self.ready = threading.Event()
+        self.restarts = {"xvfb": 0, "spotify": 0}
+        self._xvfb = None
+        self._spotify = None
+        self._spotify_owner = None  # PID holding the MPRIS name when we accepted it
+        self._rejected = None  # PID of a Spotify outside the ghost display, warned about once
+        self._running = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    # --- PUBLIC API ---
+    def start(self):
+        """Bring the stack up in the background. Use wait_ready() to block on it."""
+        with self._lock:
+            if self._running.is_set():
+                return
+            self._running.set()
+            self._thread = threading.Thread(target=self._supervise, name="ghost-supervisor", daemon=True)
+            self._thread.start()
+
+    def wait_ready(self, timeout=None):
+        return self.ready.wait(timeout)
+
+    def stop(self):
+        self._running.clear()
+        self.ready.clear()
+        for proc in (self._spotify, self._xvfb):
+            if proc and proc.poll() is None:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=3)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+
+    # --- CHILDREN ---
+    def _ensure_display(self):
+        if display_is_up(self.display):
+            return True
+        if self._xvfb and self._xvfb.poll() is None:
+            # Ours, still booting
+            return wait_until(lambda: display_is_up(self.display), timeout=10)
+
+        if not shutil.which("Xvfb"):
+            print("⚠️ Xvfb is not installed; the ghost screen cannot start.")
+            return False
+        print(f"👻 Starting Xvfb on {self.display}...")
+        started = time.monotonic()
+        self._xvfb = subprocess.Popen(
+            ["Xvfb", self.display, "-screen", "0", self.screen, "-nolisten", "tcp"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        if wait_until(lambda: display_is_up(self.display) or self._xvfb.poll() is not None, timeout=10) \
+                and display_is_up(self.display):
+            print(f"✅ Ghost display ready in {time.monotonic() - started:.2f}s")
+            return True
+        print("⚠️ Xvfb did not come up.")
+        return False
+
+    def _is_ours(self, pid):
+        """True if `pid` is the Spotify we started, or runs in its session (wrapper scripts)."""
+        if not (self._spotify and self._spotify.poll() is None):
+            return False
+        if pid == self._spotify.pid:
+            return True
+        try:
+            return os.getsid(pid) == self._spotify.pid
+        except OSError:
+            return False
+
+    def _claim_spotify(self):
+        """Whether a usable Spotify is on the bus: ours, or one already running on the ghost display."""
+        if not self.player.available():
+            return False
+        pid = self.player.owner_pid()
+        if pid is not None and not self._is_ours(pid) and pid != self._spotify_owner:
+            display = display_of(pid)
+            if not same_display(display, self.display):
+                if pid != self._rejected:
+                    print(f"⚠️ Spotify is already running (pid {pid}, display {display or 'unknown'}), "
+                          f"not on the ghost screen {self.display}. Song search needs it there; "
+                          f"close it and Jarvis will start its own.")
+                    self._rejected = pid
+                return False
+            print(f"👻 Adopting the Spotify already running on {self.display} (pid {pid}).")
+            if self._spotify and self._spotify.poll() is not None:
+                self._spotify = None  # ours handed off to it and exited
+        self._spotify_owner = pid
+        return True
+
+    def _spotify_alive(self):
+        if self._spotify and self._spotify.poll() is not None:
+            return False
+        if not self.player.available():
+            return False
+        # Same name, different process: the one we accepted went away
+        return self._spotify_owner is None or self.player.owner_pid() == self._spotify_owner
+
+    def _ensure_spotify(self):
+        if self._claim_spotify():
+            return True
+        if self.player.available():
+            return False  # someone else's Spotify holds the name; a new one would just hand off to it
+        if not (self._spotify and self._spotify.poll() is None):
+            print("👻 Starting Spotify on the ghost screen...")
+            self._spotify = subprocess.Popen(
+                self.spotify_cmd,
+                env={**os.environ, "DISPLAY": self.display},
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        started = time.monotonic()
+        ok = wait_until(
+            lambda: self.player.available() or self._spotify.poll() is not None,
+            timeout=30, interval=0.1,
+        ) and self._claim_spotify()
+        if ok:
+            print(f"✅ Spotify on the bus in {time.monotonic() - started:.2f}s")
+        else:
+            print("⚠️ Spotify did not register on D-Bus.")
+        return ok
+
+    # --- MONITOR ---
+    def _supervise(self):
+        backoff = 1.0
+        first = True
+        while self._running.is_set():
+            display_ok = self._ensure_display()
+            spotify_ok = display_ok and self._ensure_spotify()
+            if display_ok and spotify_ok:
+                if not self.ready.is_set():
+                    print("✅ Ghost Environment ready.")
+                self.ready.set()
+                backoff = 1.0
+                first = False
+                self._watch()
+                if not self._running.is_set():
+                    break
+                # Something died; count it and loop round to bring it back
+                self.ready.clear()
+            else:
+                self.ready.clear()
+                if not first:
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, 30.0)
+                first = False
+
+    def _watch(self):
+        """Return as soon as the display or Spotify goes away."""
+        while self._running.is_set():
+            time.sleep(self.check_interval)
+            if (self._xvfb and self._xvfb.poll() is not None) or not display_is_up(self.display):
+                print("💀 Ghost display died, restarting...")
+                self.restarts["xvfb"] += 1
+                self._xvfb = None
+                return
+            if not self._spotify_alive():
+                print("💀 Ghost Spotify died, restarting...")
+                self.restarts["spotify"] += 1
+                self._spotify = None
+                self._spotify_owner = None
+                return
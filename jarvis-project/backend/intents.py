@@ -0,0 +1,177 @@
+"""
+Declarative intent registry.
+
+Intents are registered once with a priority, one or more regex patterns and
+a handler. The registry compiles every pattern into a single regular
+expression: each pattern becomes a look-ahead alternative anchored at the
+start of the command, in priority order, so one `match()` call both finds
+the highest-priority intent and extracts its named slots. Commands that
+match nothing cost one failed regex match before going to the LLM.
+
+Compound commands ("pause the music and set volume to 30") are split by
+`match_all()`, and `schedule()` orders the parts by the resources they touch.
+"""
+import re
+import threading
+
+_GROUP_NAME = re.compile(r"\(\?P<([A-Za-z_][A-Za-z0-9_]*)>")
+# Between two actions: "and", "then", "and then", "also", or a comma
+CONNECTOR = re.compile(r"(\s*,\s*(?:and then |and |then )?|\s+(?:and then|and|then|also)\s+)")
+
+
+class Unhandled(Exception):
+    """Raised by a handler that turns out not to apply; the command goes on to the LLM."""
+
+
+class Intent:
+    def __init__(self, name, patterns, handler, priority=0, resources=()):
+        self.name = name
+        self.patterns = list(patterns)
+        self.handler = handler
+        self.priority = priority
+        # What the intent touches (e.g. "volume", "player"); used to decide
+        # which actions may run side by side
+        self.resources = frozenset(resources)
+
+    def __repr__(self):
+        return f"Intent({self.name!r}, priority={self.priority})"
+
+
+class IntentMatch:
+    def __init__(self, intent, slots, command):
+        self.intent = intent
+        self.slots = slots
+        self.command = command
+
+    def run(self):
+        return self.intent.handler(self.command, **self.slots)
+
+    def __repr__(self):
+        return f"IntentMatch({self.intent.name!r}, {self.slots!r})"
+
+
+def normalize(command):
+    return re.sub(r"\s+", " ", command.lower()).strip().rstrip(".!?").strip()
+
+
+class IntentRouter:
+    def __init__(self):
+        self._intents = []
+        self._compiled = None
+        self._alternatives = []  # index -> (intent, {mangled group: slot name})
+        self._lock = threading.Lock()
+
+    # --- REGISTRATION ---
+    def register(self, name, patterns, handler, priority=0, resources=()):
+        intent = Intent(name, patterns, handler, priority, resources)
+        with self._lock:
+            self._intents.append(intent)
+            self._compiled = None
+        return intent
+
+    def intent(self, name, patterns, priority=0, resources=()):
+        """Decorator form of register()."""
+        def wrap(handler):
+            self.register(name, patterns, handler, priority, resources)
+            return handler
+        return wrap
+
+    @property
+    def intents(self):
+        return list(self._intents)
+
+    # --- COMPILATION ---
+    def compile(self):
+        with self._lock:
+            if self._compiled is None:
+                self._compiled = self._build()
+            return self._compiled
+
+    def _build(self):
+        # Stable sort: equal priorities keep registration order
+        ordered = sorted(self._intents, key=lambda i: -i.priority)
+        alternatives = []
+        parts = []
+        for intent in ordered:
+            for pattern in intent.patterns:
+                index = len(alternatives)
+                slot_names = {}
+
+                def mangle(m, index=index, slot_names=slot_names):
+                    mangled = f"a{index}__{m.group(1)}"
+                    slot_names[mangled] = m.group(1)
+                    return f"(?P<{mangled}>"
+
+                body = _GROUP_NAME.sub(mangle, pattern)
+                parts.append(f"(?=.*?(?:{body}))(?P<_a{index}>)")
+                alternatives.append((intent, slot_names))
+
+        self._alternatives = alternatives
+        if not parts:
+            return re.compile(r"(?!)")
+        return re.compile("^(?:" + "|".join(parts) + ")", re.DOTALL)
+
+    # --- MATCHING ---
+    def match(self, command):
+        """Best IntentMatch for `command`, or None if nothing applies."""
+        command = normalize(command)
+        m = self.compile().match(command)
+        if not m:
+            return None
+        groups = m.groupdict()
+        for index, (intent, slot_names) in enumerate(self._alternatives):
+            if groups.get(f"_a{index}") is None:
+                continue
+            slots = {}
+            for mangled, slot in slot_names.items():
+                value = groups.get(mangled)
+                if value is not None:
+                    slots[slot] = value.strip()
+                else:
+                    slots.setdefault(slot, None)
+            return IntentMatch(intent, slots, command)
+        return None
+
+    def match_all(self, command):
+        """One IntentMatch per action in `command`, in the order spoken; [] if any part matches nothing.
+
+        A connector only splits where the text on both sides is a command on its
+        own, so "play simon and garfunkel on spotify" stays one action. A part
+        that changes nothing about the action it is glued to was not understood
+        ("mute and tell me a joke"), so the whole command goes to the LLM.
+        """
+        command = normalize(command)
+        pieces = CONNECTOR.split(command)
+        segments = [pieces[0]]
+        for connector, part in zip(pieces[1::2], pieces[2::2]):
+            left = self.match(segments[-1])
+            if left and self.match(part):
+                segments.append(part)
+                continue
+            segments[-1] += connector + part
+            joined = self.match(segments[-1])
+            if left and joined and (joined.intent, joined.slots) == (left.intent, left.slots):
+                return []
+        matches = [self.match(segment) for segment in segments]
+        if not all(matches):
+            return []
+        return matches
+
+
+def schedule(matches):
+    """Group matches into waves that run one after another.
+
+    Actions in the same wave share no resources and can run side by side; an
+    action lands in the wave after the last earlier action it conflicts with,
+    so "mute then unmute" keeps its order. Intents without resources never wait.
+    """
+    waves = []
+    placed = []  # (wave index, resources) per match so far
+    for match in matches:
+        resources = match.intent.resources
+        index = 1 + max((w for w, r in placed if r & resources), default=-1)
+        if index == len(waves):
+            waves.append([])
+        waves[index].append(match)
+        placed.append((index, resources))
+    return waves
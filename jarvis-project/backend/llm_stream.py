@@ -0,0 +1,123 @@
+"""
+Streaming helpers for the LLM fallback.
+
+`SentenceBuffer` turns the token stream from `interpreter.chat(stream=True)`
+into whole sentences as soon as each one is complete, so the first sentence
+can be spoken while the model is still writing the rest. `OllamaWarmer` keeps
+the model loaded in Ollama so the first question does not pay for loading
+the weights.
+"""
+import json
+import re
+import threading
+import urllib.request
+
+
+# --- SENTENCES ---
+_BOUNDARY = re.compile(r'(?<=[.!?])\s+|\n+')
+_MARKDOWN = re.compile(r'[*_`#>|]+')
+
+
+def message_text(chunk):
+    """The assistant's prose in one stream chunk, or "" (code and console output are not spoken)."""
+    if not isinstance(chunk, dict):
+        return ""
+    if chunk.get("role") != "assistant" or chunk.get("type") != "message":
+        return ""
+    content = chunk.get("content")
+    return content if isinstance(content, str) else ""
+
+
+def clean_for_speech(text):
+    return " ".join(_MARKDOWN.sub("", text).split())
+
+
+class SentenceBuffer:
+    def __init__(self, min_length=12):
+        self.min_length = min_length
+        self.text = ""  # everything fed so far, for the GUI
+        self._pending = ""
+
+    def feed(self, text):
+        """Add streamed text; returns the sentences it completed."""
+        self.text += text
+        self._pending += text
+        sentences = []
+        while True:
+            match = None
+            for candidate in _BOUNDARY.finditer(self._pending):
+                if len(self._pending[:candidate.start()].strip()) >= self.min_length:
+                    match = candidate
+                    break
+            if match is None:
+                break
+            sentence = clean_for_speech(self._pending[:match.start()])
+            self._pending = self._pending[match.end():]
+            if sentence:
+                sentences.append(sentence)
+        return sentences
+
+    def flush(self):
+        """Whatever is left once the stream ends."""
+        sentence = clean_for_speech(self._pending)
+        self._pending = ""
+        return [sentence] if sentence else []
+
+
+# --- WARM MODEL ---
+class OllamaWarmer:
+    """Loads the model in Ollama and refreshes its keep-alive in the background.
+
+    A chat request sent without keep_alive resets the model's expiry to
+    Ollama's default (5 minutes), so call refresh() after each one, and keep
+    `refresh_interval` under that default in case a refresh fails.
+    """
+
+    def __init__(self, api_base="http://localhost:11434", model="ollama/llama3", keep_alive="30m",
+                 refresh_interval=240.0, timeout=120.0):
+        self.url = api_base.rstrip("/") + "/api/generate"
+        self.model = model.split("/", 1)[1] if model.startswith("ollama/") else model
+        self.keep_alive = keep_alive
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.warm = threading.Event()
+        self._stop = threading.Event()
+        self._poke = threading.Event()
+        self._thread = None
+
+    def preload(self):
+        """Ask Ollama to load the model (a request with no prompt). Returns True on success."""
+        body = json.dumps({"model": self.model, "keep_alive": self.keep_alive}).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except Exception as e:
+            print(f"(Ollama preload failed: {e})")
+            self.warm.clear()
+            return False
+        self.warm.set()
+        return True
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+
+        def loop():
+            while not self._stop.is_set():
+                was_warm = self.warm.is_set()
+                if self.preload() and not was_warm:
+                    print(f"🔥 {self.model} is loaded in Ollama.")
+                self._poke.wait(self.refresh_interval if self.warm.is_set() else 30.0)
+                self._poke.clear()
+
+        self._thread = threading.Thread(target=loop, name="ollama-warmer", daemon=True)
+        self._thread.start()
+
+    def refresh(self):
+        """Re-send keep_alive now, e.g. right after a chat request reset it."""
+        self._poke.set()
+
+    def stop(self):
+        self._stop.set()
+        self._poke.set()
@@ -0,0 +1,356 @@
+"""
+Safe arithmetic for the math intent.
+
+Spoken arithmetic ("twenty five times four", "square root of 81",
+"15 percent of 200", "2 to the power of 10") is tokenized and evaluated by a
+small recursive-descent parser, so nothing ever reaches eval(). Input
+length, nesting, operand size, exponents and intermediate results are all
+capped, so every expression finishes in bounded time; anything outside the
+limits raises MathError instead of spinning the CPU.
+
+    evaluate("2 + 3 * 4")           -> 14
+    format_number(0.1 + 0.2)        -> "0.3"
+"""
+import math
+import re
+
+
+class MathError(ValueError):
+    pass
+
+
+class MathSyntaxError(MathError):
+    """Not an arithmetic expression at all (as opposed to one we can't compute)."""
+
+
+class DivisionByZero(MathError):
+    pass
+
+
+MAX_INPUT_CHARS = 200
+MAX_TOKENS = 64
+MAX_DEPTH = 32
+MAX_OPERAND = 10 ** 15
+MAX_EXPONENT = 1000
+MAX_MAGNITUDE = 10 ** 100
+
+
+# --- WORDS ---
+UNITS = {
+    "zero": 0, "oh": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+    "thirteen": 13, "fourteen": 14, "fifteen": 15, "sixteen": 16, "seventeen": 17,
+    "eighteen": 18, "nineteen": 19,
+}
+TENS = {
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+    "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+}
+SCALES = {"hundred": 100, "thousand": 10 ** 3, "million": 10 ** 6, "billion": 10 ** 9, "trillion": 10 ** 12}
+NUMBER_WORDS = set(UNITS) | set(TENS) | set(SCALES) | {"a", "and", "point"}
+
+# Spoken operators, rewritten to symbols before tokenizing (order matters)
+PHRASES = [
+    (r"\b(?:to the power of|raised to(?: the power of)?|to the power|power of|power)\b", " ^ "),
+    (r"\bsquared\b", " ^ 2 "),
+    (r"\bcubed\b", " ^ 3 "),
+    (r"\b(?:square root of|square root|root of|sqrt)\b", " sqrt "),
+    (r"\b(?:multiplied by|times)\b", " * "),
+    (r"\b(?:divided by|over)\b", " / "),
+    (r"\bplus\b", " + "),
+    (r"\b(?:minus|negative)\b", " - "),
+    (r"\b(?:percent|per cent)\b", " % "),
+    (r"%\s*of\b", " % * "),
+    (r"\b(?:mod|modulo)\b", " mod "),
+    (r"\*\*", " ^ "),
+    (r"(?<![a-z])x(?![a-z])|×", " * "),
+    (r"÷", " / "),
+    (r"\bthe\b", " "),
+]
+_TOKEN = re.compile(r"\d+(?:\.\d+)?|\.\d+|[-+*/^%()]|[a-z]+|\S")
+
+# What the math intent accepts as an expression (digits, number words, operators).
+# At least one actual number, so "what is the point" or "what is power" stay questions.
+# Digit runs are possessive: a run split across repetitions in every possible way
+# made a near miss ("what is 1111111111111111111111 q") backtrack exponentially.
+_A_NUMBER = r"(?=.*?(?:\d|\b(?:" + "|".join(sorted((set(UNITS) - {"oh"}) | set(TENS) | set(SCALES))) + r")\b))"
+SPOKEN_MATH = _A_NUMBER + (
+    r"(?:\d++(?:\.\d++)?|[\s+\-*/x×÷^%()]"
+    r"|multiplied by|divided by|square root(?: of)?|root of|sqrt|to the power(?: of)?|raised to|power(?: of)?"
+    r"|squared|cubed|plus|minus|negative|times|over|percent(?: of)?|per cent|mod(?:ulo)?|the"
+    r"|" + "|".join(sorted(NUMBER_WORDS, key=len, reverse=True)) + r")+"
+)
+
+
+# --- TOKENS ---
+def tokenize(text):
+    """Numbers and operator symbols. Spoken numbers become numbers."""
+    if len(text) > MAX_INPUT_CHARS:
+        raise MathError("expression is too long")
+    text = text.lower()
+    for pattern, replacement in PHRASES:
+        text = re.sub(pattern, replacement, text)
+
+    tokens = []
+    words = []  # pending spoken number, e.g. ["twenty", "five"]
+    for raw in _TOKEN.findall(text):
+        if raw in SCALES and not words and tokens and isinstance(tokens[-1], (int, float)):
+            tokens[-1] = _check(tokens[-1] * SCALES[raw])  # "2 million"
+            continue
+        if raw == "point" and not words and tokens and isinstance(tokens[-1], int):
+            words.append(tokens.pop())  # "3 point 5"
+        if raw in NUMBER_WORDS:
+            words.append(raw)
+            continue
+        if raw.isdigit() and words and words[-1] == "point":
+            words.append(raw)  # "three point 14"
+            continue
+        if words:
+            tokens.append(spoken_number(words))
+            words = []
+        if raw[0].isdigit() or raw[0] == ".":
+            tokens.append(_literal(raw))
+        elif raw in ("+", "-", "*", "/", "^", "%", "(", ")", "sqrt", "mod"):
+            tokens.append(raw)
+        else:
+            raise MathSyntaxError(f"unexpected word {raw!r}")
+        if len(tokens) > MAX_TOKENS:
+            raise MathError("expression is too long")
+    if words:
+        tokens.append(spoken_number(words))
+    return tokens
+
+
+def spoken_number(words):
+    """["two", "hundred", "and", "five"] -> 205, ["three", "point", "one", "four"] -> 3.14.
+
+    Digits spoken around "point" may come through as written: [3, "point", "5"] -> 3.5.
+    """
+    total = 0
+    current = 0
+    seen = False
+    decimals = None
+    last = None  # what the previous word was: unit, tens or a scale
+    for word in words:
+        if isinstance(word, int):
+            current += word  # a written whole part, always first
+            seen = True
+            last = "unit"
+            continue
+        # "twenty five" is one number; "one two" or "twenty twenty" are not
+        if word in UNITS or word == "a":
+            small = word == "a" or UNITS[word] < 10
+            if decimals is None and (last == "unit" or (last == "tens" and not small)):
+                raise MathSyntaxError("adjacent numbers")
+        elif word in TENS:
+            if last in ("unit", "tens"):
+                raise MathSyntaxError("adjacent numbers")
+        if word == "point":
+            if decimals is not None:
+                raise MathSyntaxError("two decimal points")
+            decimals = ""
+        elif decimals is not None:
+            if word.isdigit():
+                decimals += word
+                continue
+            if word not in UNITS or UNITS[word] > 9:
+                raise MathSyntaxError("only digits can follow 'point'")
+            decimals += str(UNITS[word])
+        elif word in UNITS:
+            current += UNITS[word]
+            seen = True
+            last = "unit"
+        elif word in TENS:
+            current += TENS[word]
+            seen = True
+            last = "tens"
+        elif word == "a":
+            current += 1
+            last = "unit"
+        elif word == "hundred":
+            current = (current or 1) * 100
+            seen = True
+            last = "scale"
+        elif word in SCALES:
+            total += (current or 1) * SCALES[word]
+            current = 0
+            seen = True
+            last = "scale"
+        # "and" just joins ("a hundred and five")
+    if not seen:
+        raise MathSyntaxError("not a number")
+    value = total + current
+    if decimals:
+        value = float(f"{value}.{decimals}")
+    return _check(value)
+
+
+def _literal(raw):
+    if len(raw.replace(".", "")) > 15:
+        raise MathError("number is too long")
+    value = float(raw) if "." in raw else int(raw)
+    return _check(value)
+
+
+def _check(value):
+    if isinstance(value, complex) or value != value or abs(value) > MAX_MAGNITUDE:
+        raise MathError("result is out of range")
+    return value
+
+
+# --- PARSER ---
+class _Parser:
+    """
+    expr    := term (("+" | "-") term)*
+    term    := unary (("*" | "/" | "mod") unary)*
+    unary   := ("-" | "+" | "sqrt") unary | power
+    power   := postfix ("^" unary)?          right-associative
+    postfix := primary "%"*
+    primary := number | "(" expr ")"
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+        self.depth = 0
+
+    def parse(self):
+        if not self.tokens:
+            raise MathSyntaxError("empty expression")
+        value = self.expr()
+        if self.pos != len(self.tokens):
+            raise MathSyntaxError(f"unexpected {self.tokens[self.pos]!r}")
+        return value
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expr(self):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise MathError("expression is nested too deeply")
+        value = self.term()
+        while self.peek() in ("+", "-"):
+            op = self.take()
+            right = self.term()
+            value = _check(value + right if op == "+" else value - right)
+        self.depth -= 1
+        return value
+
+    def term(self):
+        value = self.unary()
+        while self.peek() in ("*", "/", "mod"):
+            op = self.take()
+            right = self.unary()
+            if op == "*":
+                value = _multiply(value, right)
+            elif right == 0:
+                raise DivisionByZero("division by zero")
+            elif op == "mod":
+                value = value % right
+            else:
+                value = _divide(value, right)
+        return value
+
+    def unary(self):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise MathError("expression is nested too deeply")
+        token = self.peek()
+        if token in ("-", "+"):
+            self.take()
+            value = self.unary()
+            value = -value if token == "-" else value
+        elif token == "sqrt":
+            self.take()
+            operand = self.unary()
+            if operand < 0:
+                raise MathError("square root of a negative number")
+            root = math.isqrt(operand) if isinstance(operand, int) else None
+            value = root if root is not None and root * root == operand else math.sqrt(operand)
+        else:
+            value = self.power()
+        self.depth -= 1
+        return value
+
+    def power(self):
+        base = self.postfix()
+        if self.peek() != "^":
+            return base
+        self.take()
+        exponent = self.unary()
+        return _power(base, exponent)
+
+    def postfix(self):
+        value = self.primary()
+        while self.peek() == "%":
+            self.take()
+            value = _divide(value, 100)
+        return value
+
+    def primary(self):
+        token = self.take()
+        if isinstance(token, (int, float)):
+            return token
+        if token == "(":
+            value = self.expr()
+            if self.take() != ")":
+                raise MathSyntaxError("missing closing bracket")
+            return value
+        raise MathSyntaxError("expected a number" if token is None else f"unexpected {token!r}")
+
+
+def _multiply(a, b):
+    if a and b and math.log10(abs(a)) + math.log10(abs(b)) > 100:
+        raise MathError("result is out of range")
+    return _check(a * b)
+
+
+def _divide(a, b):
+    if isinstance(a, int) and isinstance(b, int) and a % b == 0:
+        return a // b
+    return _check(a / b)
+
+
+def _power(base, exponent):
+    """Checked before computing, so 9 ^ 9 ^ 9 fails at once instead of running for hours."""
+    if abs(exponent) > MAX_EXPONENT:
+        raise MathError("exponent is too large")
+    if base == 0 and exponent < 0:
+        raise DivisionByZero("division by zero")
+    if base and abs(exponent) * math.log10(abs(base)) > 100:
+        raise MathError("result is out of range")
+    if base < 0 and not float(exponent).is_integer():
+        raise MathError("fractional power of a negative number")
+    if isinstance(exponent, float) and exponent.is_integer():
+        exponent = int(exponent)
+    return _check(base ** exponent)
+
+
+# --- PUBLIC API ---
+def evaluate(text):
+    """Value of a written or spoken arithmetic expression. Raises MathError."""
+    try:
+        return _Parser(tokenize(text)).parse()
+    except ZeroDivisionError as e:
+        raise DivisionByZero(str(e))
+    except OverflowError as e:
+        raise MathError(str(e))
+
+
+def format_number(value):
+    """How to say a result: whole numbers as-is, everything else to 10 significant digits."""
+    if isinstance(value, float) and value.is_integer() and abs(value) < MAX_OPERAND:
+        value = int(value)
+    if isinstance(value, int) and abs(value) < MAX_OPERAND:
+        return str(value)
+    text = f"{value:.10g}"
+    if "e" in text:
+        mantissa, exponent = text.split("e")
+        return f"{mantissa} times ten to the power of {int(exponent)}"
+    return text
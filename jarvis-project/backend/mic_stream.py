@@ -0,0 +1,268 @@
+"""
+Always-open microphone capture.
+
+One PyAudio input stream is opened at startup and read by a single thread
+in small fixed-size frames. Consumers (wake-word detector, command capture)
+subscribe to the frame feed instead of opening their own sr.Microphone, so
+nobody pays device setup or ambient-noise calibration per cycle.
+"""
+import array
+import collections
+import math
+import queue
+import threading
+import time
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2            # 16-bit mono PCM
+FRAME_SAMPLES = 1280        # 80 ms, the chunk size openWakeWord expects
+FRAME_SECONDS = FRAME_SAMPLES / SAMPLE_RATE
+
+
+def frame_rms(frame):
+    samples = array.array('h', frame)
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+class Subscription:
+    """A consumer's view of the frame feed. Old frames are dropped if it falls behind."""
+
+    def __init__(self, stream, max_frames=64):
+        self._stream = stream
+        self._queue = queue.Queue(maxsize=max_frames)
+
+    def push(self, frame, rms):
+        try:
+            self._queue.put_nowait((frame, rms))
+        except queue.Full:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._queue.put_nowait((frame, rms))
+
+    def read(self, timeout=None):
+        """(frame, rms), or (None, 0.0) when nothing arrived within `timeout`."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None, 0.0
+
+    def drain(self):
+        """Empty the queue, returning the frames that were in it."""
+        frames = []
+        while True:
+            try:
+                frames.append(self._queue.get_nowait()[0])
+            except queue.Empty:
+                return frames
+
+    def close(self):
+        self._stream.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MicStream:
+    def __init__(self, device_index=None, preroll_seconds=1.0, speech_ratio=2.5, min_threshold=300.0,
+                 echo_ratio=4.0, echo_hangover=0.3, echo_decay=0.97, echo_warmup=12):
+        self.device_index = device_index
+        self.speech_ratio = speech_ratio
+        self.min_threshold = min_threshold
+        self.noise_floor = None
+        # Echo suppression: `echo_source()` is True while our own voice is
+        # playing. The mic keeps running, but speech then has to clear the
+        # echo level by `echo_ratio` (and for `echo_hangover` s after, for the
+        # room's tail) instead of just the noise floor. The echo level is a
+        # peak that decays by `echo_decay` per frame, so the gaps between our
+        # own words do not pull it down; until `echo_warmup` frames of our
+        # voice have been heard nothing counts as speech over it.
+        self.echo_source = None
+        self.echo_ratio = echo_ratio
+        self.echo_hangover = echo_hangover
+        self.echo_decay = echo_decay
+        self.echo_warmup = echo_warmup
+        self.echo_level = None
+        self._echo_frames = 0
+        self._echo_until = 0.0
+        self._preroll = collections.deque(maxlen=max(1, int(preroll_seconds / FRAME_SECONDS)))
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._running = threading.Event()
+        self._thread = None
+        self._pa = None
+        self._stream = None
+
+    # --- LIFECYCLE ---
+    def start(self):
+        with self._lock:
+            if self._running.is_set():
+                return
+            import pyaudio
+
+            self._pa = pyaudio.PyAudio()
+            self._stream = self._pa.open(
+                format=pyaudio.paInt16,
+                channels=1,
+                rate=SAMPLE_RATE,
+                input=True,
+                input_device_index=self.device_index,
+                frames_per_buffer=FRAME_SAMPLES,
+            )
+            self._running.set()
+            self._thread = threading.Thread(target=self._read_loop, name="mic-stream", daemon=True)
+            self._thread.start()
+        print("🎙️ Microphone stream open.")
+
+    def close(self):
+        self._running.clear()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+        if self._stream:
+            self._stream.stop_stream()
+            self._stream.close()
+        if self._pa:
+            self._pa.terminate()
+        self._stream = self._pa = self._thread = None
+
+    # --- SUBSCRIPTIONS ---
+    def subscribe(self, with_preroll=False):
+        self.start()
+        sub = Subscription(self)
+        with self._lock:
+            if with_preroll:
+                for frame, rms in self._preroll:
+                    sub.push(frame, rms)
+            self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    # --- LEVELS ---
+    @property
+    def speech_threshold(self):
+        floor = self.noise_floor or 0.0
+        threshold = max(self.min_threshold, floor * self.speech_ratio)
+        if self.echo_active:
+            if self._echo_frames < self.echo_warmup:
+                return float("inf")
+            threshold = max(threshold, self.echo_level * self.echo_ratio)
+        return threshold
+
+    @property
+    def echo_active(self):
+        return time.monotonic() < self._echo_until
+
+    def is_speech(self, rms):
+        return rms >= self.speech_threshold
+
+    def _track_noise(self, rms):
+        if self.echo_source is not None and self.echo_source():
+            self._echo_until = time.monotonic() + self.echo_hangover
+        if self.echo_active:
+            self._track_echo(rms)
+            return
+        # Slow moving average over quiet frames; replaces adjust_for_ambient_noise()
+        if self.noise_floor is None:
+            self.noise_floor = rms
+        elif rms < self.speech_threshold:
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * rms
+
+    def _track_echo(self, rms):
+        # Learned across replies, so it is already right when the next one starts.
+        # Frames over the gate may be a person talking over us: they only nudge
+        # the level up, so a louder voice is absorbed over a few seconds while
+        # someone talking over it keeps tripping the gate.
+        over_gate = rms >= self.speech_threshold
+        self._echo_frames += 1
+        if self.echo_level is None:
+            self.echo_level = max(rms, self.noise_floor or 0.0)
+        elif over_gate:
+            self.echo_level = 0.995 * self.echo_level + 0.005 * rms
+        else:
+            self.echo_level = max(rms, self.echo_level * self.echo_decay)
+
+    # --- READER ---
+    def _read_loop(self):
+        while self._running.is_set():
+            try:
+                frame = self._stream.read(FRAME_SAMPLES, exception_on_overflow=False)
+            except Exception as e:
+                print(f"(Mic Error: {e})")
+                time.sleep(0.1)
+                continue
+            self._dispatch(frame)
+
+    def _dispatch(self, frame):
+        """Hand one frame to every subscriber. Other frame sources (e.g. WAV playback) call this too."""
+        rms = frame_rms(frame)
+        self._track_noise(rms)
+        with self._lock:
+            self._preroll.append((frame, rms))
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            sub.push(frame, rms)
+
+    # --- PHRASE CAPTURE ---
+    def record_phrase(self, sub, start_timeout=5.0, pause_threshold=0.8, max_seconds=None, on_frame=None,
+                      heard=None):
+        """
+        Collect frames from `sub` until the speaker pauses.
+        Returns raw PCM bytes, or None if nobody started talking in time.
+        `on_frame(frame, is_speech)` sees every frame as it arrives; if it
+        returns True the phrase is cut short right there.
+        `heard` are frames already taken off the feed (e.g. the start of a
+        sentence that interrupted a reply); they are handled before `sub`.
+        """
+        started = False
+        frames = []
+        lead_in = collections.deque(maxlen=4)  # keep the soft start of the first word
+        silence = 0.0
+        waited = 0.0
+        spoken = 0.0
+        heard = collections.deque(heard or ())
+
+        while True:
+            if heard:
+                frame = heard.popleft()
+                rms = frame_rms(frame)
+            else:
+                frame, rms = sub.read(timeout=1.0)
+            if frame is None:
+                if not self._running.is_set():
+                    return None
+                continue
+            speech = self.is_speech(rms)
+            if on_frame and on_frame(frame, speech):
+                frames.append(frame)
+                break
+
+            if not started:
+                lead_in.append(frame)
+                if speech:
+                    started = True
+                    frames.extend(lead_in)
+                    continue
+                waited += FRAME_SECONDS
+                if start_timeout is not None and waited >= start_timeout:
+                    return None
+                continue
+
+            frames.append(frame)
+            spoken += FRAME_SECONDS
+            silence = 0.0 if speech else silence + FRAME_SECONDS
+            if silence >= pause_threshold:
+                break
+            if max_seconds is not None and spoken >= max_seconds:
+                break
+
+        return b"".join(frames)
@@ -0,0 +1,252 @@
+"""
+Minimal MPRIS client.
+
+Talks to a media player (Spotify by default) over the session D-Bus through
+Gio, which pygobject already gives us, so control and state queries are
+method calls on one long-lived connection instead of a `playerctl` process
+each. If Gio is unavailable it falls back to `playerctl`.
+"""
+import subprocess
+import time
+
+BUS_PREFIX = "org.mpris.MediaPlayer2."
+OBJECT_PATH = "/org/mpris/MediaPlayer2"
+ROOT_IFACE = "org.mpris.MediaPlayer2"
+PLAYER_IFACE = "org.mpris.MediaPlayer2.Player"
+
+
+class MprisError(Exception):
+    pass
+
+
+class _GioTransport:
+    def __init__(self):
+        from gi.repository import Gio, GLib
+
+        self._Gio = Gio
+        self._GLib = GLib
+        self.bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+
+    def call(self, bus_name, iface, method, args=None, timeout_ms=1000):
+        try:
+            return self.bus.call_sync(
+                bus_name, OBJECT_PATH, iface, method, args,
+                None, self._Gio.DBusCallFlags.NONE, timeout_ms, None,
+            )
+        except self._GLib.Error as e:
+            raise MprisError(str(e)) from e
+
+    def method(self, bus_name, name, *args):
+        params = None
+        if args:
+            params = self._GLib.Variant("(" + "".join(sig for sig, _ in args) + ")", tuple(v for _, v in args))
+        self.call(bus_name, PLAYER_IFACE, name, params)
+
+    def get(self, bus_name, prop):
+        reply = self.call(
+            bus_name, "org.freedesktop.DBus.Properties", "Get",
+            self._GLib.Variant("(ss)", (PLAYER_IFACE, prop)),
+        )
+        return reply.unpack()[0]
+
+    def set(self, bus_name, prop, variant):
+        self.call(
+            bus_name, "org.freedesktop.DBus.Properties", "Set",
+            self._GLib.Variant("(ssv)", (PLAYER_IFACE, prop, variant)),
+        )
+
+    def double(self, value):
+        return self._GLib.Variant("d", value)
+
+    def list_names(self):
+        try:
+            reply = self.bus.call_sync(
+                "org.freedesktop.DBus", "/org/freedesktop/DBus", "org.freedesktop.DBus",
+                "ListNames", None, None, self._Gio.DBusCallFlags.NONE, 500, None,
+            )
+            return list(reply.unpack()[0])
+        except self._GLib.Error as e:
+            raise MprisError(str(e)) from e
+
+    def has_owner(self, bus_name):
+        try:
+            reply = self.bus.call_sync(
+                "org.freedesktop.DBus", "/org/freedesktop/DBus", "org.freedesktop.DBus",
+                "NameHasOwner", self._GLib.Variant("(s)", (bus_name,)),
+                None, self._Gio.DBusCallFlags.NONE, 500, None,
+            )
+            return bool(reply.unpack()[0])
+        except self._GLib.Error:
+            return False
+
+    def owner_pid(self, bus_name):
+        try:
+            reply = self.bus.call_sync(
+                "org.freedesktop.DBus", "/org/freedesktop/DBus", "org.freedesktop.DBus",
+                "GetConnectionUnixProcessID", self._GLib.Variant("(s)", (bus_name,)),
+                None, self._Gio.DBusCallFlags.NONE, 500, None,
+            )
+            return int(reply.unpack()[0])
+        except self._GLib.Error:
+            return None
+
+
+class _PlayerctlTransport:
+    """Same surface as _GioTransport, one `playerctl` call per operation."""
+
+    _METHODS = {
+        "Play": "play", "Pause": "pause", "PlayPause": "play-pause",
+        "Next": "next", "Previous": "previous", "Stop": "stop",
+    }
+
+    def _run(self, player, *args):
+        try:
+            result = subprocess.run(
+                ["playerctl", "-p", player, *args],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=2,
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise MprisError(f"playerctl {' '.join(args)}: {e}") from e
+        if result.returncode != 0:
+            raise MprisError(f"playerctl {' '.join(args)} failed")
+        return result.stdout.strip()
+
+    def method(self, bus_name, name, *args):
+        player = bus_name[len(BUS_PREFIX):]
+        if name == "OpenUri":
+            self._run(player, "open", args[0][1])
+        else:
+            self._run(player, self._METHODS[name])
+
+    def get(self, bus_name, prop):
+        player = bus_name[len(BUS_PREFIX):]
+        if prop == "PlaybackStatus":
+            return self._run(player, "status")
+        if prop == "Metadata":
+            out = self._run(player, "metadata", "--format", "{{mpris:trackid}}\t{{xesam:title}}\t{{xesam:artist}}")
+            trackid, title, artist = (out.split("\t") + ["", "", ""])[:3]
+            return {"mpris:trackid": trackid, "xesam:title": title, "xesam:artist": [artist]}
+        if prop == "Volume":
+            out = self._run(player, "volume")
+            try:
+                return float(out)
+            except ValueError as e:
+                raise MprisError(f"playerctl volume: {out!r}") from e
+        raise MprisError(f"unsupported property {prop}")
+
+    def set(self, bus_name, prop, value):
+        player = bus_name[len(BUS_PREFIX):]
+        if prop != "Volume":
+            raise MprisError(f"unsupported property {prop}")
+        self._run(player, "volume", str(value))
+
+    def double(self, value):
+        return value
+
+    def list_names(self):
+        try:
+            result = subprocess.run(
+                ["playerctl", "-l"],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=2,
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise MprisError(str(e)) from e
+        return [BUS_PREFIX + line.strip() for line in result.stdout.splitlines() if line.strip()]
+
+    def has_owner(self, bus_name):
+        try:
+            self._run(bus_name[len(BUS_PREFIX):], "status")
+            return True
+        except Exception:
+            return False
+
+    def owner_pid(self, bus_name):
+        return None  # playerctl cannot tell us
+
+
+def connect():
+    """Session-bus transport: Gio if pygobject is usable, else playerctl."""
+    try:
+        return _GioTransport()
+    except Exception:
+        return _PlayerctlTransport()
+
+
+def list_players(transport=None):
+    """Names of the running MPRIS players, e.g. ["spotify", "firefox.instance123"]."""
+    transport = transport or connect()
+    return [name[len(BUS_PREFIX):] for name in transport.list_names() if name.startswith(BUS_PREFIX)]
+
+
+def active_player(transport=None):
+    """The player media keys would control: the one that is playing, else the first one. None if none run."""
+    transport = transport or connect()
+    players = [MprisPlayer(name, transport) for name in list_players(transport)]
+    for player in players:
+        try:
+            if player.status() == "Playing":
+                return player
+        except MprisError:
+            continue
+    return players[0] if players else None
+
+
+class MprisPlayer:
+    def __init__(self, name="spotify", transport=None):
+        self.name = name
+        self.bus_name = BUS_PREFIX + name
+        self._transport = transport or connect()
+
+    # --- STATE ---
+    def available(self):
+        return self._transport.has_owner(self.bus_name)
+
+    def owner_pid(self):
+        """PID of the process that owns the player's bus name, or None if unknown."""
+        return self._transport.owner_pid(self.bus_name)
+
+    def status(self):
+        return self._transport.get(self.bus_name, "PlaybackStatus")
+
+    def metadata(self):
+        return dict(self._transport.get(self.bus_name, "Metadata") or {})
+
+    def track_id(self):
+        return self.metadata().get("mpris:trackid", "")
+
+    def volume(self):
+        return self._transport.get(self.bus_name, "Volume")
+
+    def set_volume(self, value):
+        self._transport.set(self.bus_name, "Volume", self._transport.double(max(0.0, min(1.0, value))))
+
+    # --- CONTROL ---
+    def play(self): self._transport.method(self.bus_name, "Play")
+    def pause(self): self._transport.method(self.bus_name, "Pause")
+    def play_pause(self): self._transport.method(self.bus_name, "PlayPause")
+    def next(self): self._transport.method(self.bus_name, "Next")
+    def previous(self): self._transport.method(self.bus_name, "Previous")
+    def stop(self): self._transport.method(self.bus_name, "Stop")
+
+    def open_uri(self, uri):
+        self._transport.method(self.bus_name, "OpenUri", ("s", uri))
+
+    # --- WAITING ---
+    def wait_for(self, predicate, timeout=5.0, interval=0.05):
+        """Poll `predicate(self)` until it is true. Returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if predicate(self):
+                    return True
+            except MprisError:
+                pass
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
+
+    def wait_for_track_change(self, previous_id, timeout=5.0):
+        return self.wait_for(
+            lambda p: p.track_id() not in ("", previous_id) and p.status() == "Playing",
+            timeout=timeout,
+        )
@@ -0,0 +1,621 @@
+"""
+Headless end-to-end benchmark of the voice pipeline.
+
+    python pipeline_benchmark.py                         # built-in commands, 3 rounds
+    python pipeline_benchmark.py --runs 10 --json out.json
+    python pipeline_benchmark.py --fixtures my_wavs/     # recorded audio
+
+Drives the real jarvis_main_loop() from WAV fixtures instead of a microphone
+and reads latency from the request traces (see tracing.py). Everything the
+pipeline talks to is replaced by a local stand-in, so runs are repeatable
+and touch nothing on the machine:
+  - pactl, playerctl and the ollama CLI are fake scripts on PATH
+  - Ollama is a local HTTP server streaming a canned answer
+  - the Spotify worker is a fake listening on the usual socket
+  - the session bus and PulseAudio are pointed at nothing
+  - TTS is a tone generator and audio output goes to SDL's dummy driver
+  - with --xvfb, app launches and vision run against a private Xvfb
+STT is scripted by default (each fixture's transcript is returned for its
+audio), which isolates pipeline latency from recognition accuracy; use
+--stt auto to run the real recognizer on recorded fixtures. The response and
+TTS caches are emptied before each round so every round pays for the LLM and
+synthesis; --keep-caches measures the warm path instead.
+
+A fixtures folder holds WAV files plus manifest.json:
+    [{"wav": "volume_up.wav", "transcript": "hey jarvis volume up", "intent": "volume_up"}, ...]
+Without one, fixtures are generated with espeak-ng (or noise bursts shaped
+like speech if espeak-ng is missing).
+
+Reported per intent: wake-to-action (wake word detected -> action finished,
+or first LLM sentence ready) and wake-to-first-audio (-> first reply audio
+playing), as p50/p90/p99.
+"""
+import argparse
+import array
+import io
+import json
+import math
+import os
+import queue
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_FIXTURES = [
+    ("volume_up", "hey jarvis volume up"),
+    ("volume_set", "hey jarvis set the volume to 40"),
+    ("mute", "hey jarvis mute"),
+    ("unmute", "hey jarvis unmute"),
+    ("pause", "hey jarvis pause the music"),
+    ("resume", "hey jarvis resume spotify"),
+    ("next", "hey jarvis next song"),
+    ("math", "hey jarvis what is twenty five times four"),
+    ("spotify_play", "hey jarvis play bohemian rhapsody on spotify"),
+    ("launch_app", "hey jarvis open calculator"),
+    ("llm", "hey jarvis what is the capital of france"),
+    ("pause+volume_set", "hey jarvis pause the music and set the volume to 30"),
+]
+CANNED_ANSWER = "The capital of France is Paris. It sits on the Seine and is known for the Eiffel Tower."
+
+
+# --- FAKE SYSTEM TOOLS ---
+FAKE_PACTL = r'''
+import json, re, sys
+STATE = sys.argv[0] + ".json"
+try:
+    state = json.load(open(STATE))
+except Exception:
+    state = {"volume": 40, "muted": False}
+args = sys.argv[1:]
+cmd = args[0] if args else ""
+if cmd == "get-sink-volume":
+    v = state["volume"]; raw = int(v / 100 * 65536)
+    print(f"Volume: front-left: {raw} / {v}% / 0.00 dB,   front-right: {raw} / {v}% / 0.00 dB")
+elif cmd == "get-sink-mute":
+    print("Mute: " + ("yes" if state["muted"] else "no"))
+elif cmd == "set-sink-volume":
+    value = args[2]
+    number = int(re.sub(r"[^0-9]", "", value))
+    if value.startswith("+"): state["volume"] += number
+    elif value.startswith("-"): state["volume"] -= number
+    else: state["volume"] = number
+    state["volume"] = max(0, state["volume"])
+elif cmd == "set-sink-mute":
+    state["muted"] = (not state["muted"]) if args[2] == "toggle" else args[2] == "1"
+json.dump(state, open(STATE, "w"))
+'''
+
+FAKE_PLAYERCTL = r'''
+import json, sys
+STATE = sys.argv[0] + ".json"
+try:
+    state = json.load(open(STATE))
+except Exception:
+    state = {"status": "Paused", "track": 1, "volume": 1.0}
+args = sys.argv[1:]
+if args[:1] == ["-l"]:
+    print("spotify"); sys.exit()
+if args[:1] == ["-p"]:
+    args = args[2:]
+cmd = args[0] if args else "status"
+if cmd == "status": print(state["status"])
+elif cmd == "play": state["status"] = "Playing"
+elif cmd == "pause": state["status"] = "Paused"
+elif cmd == "play-pause": state["status"] = "Paused" if state["status"] == "Playing" else "Playing"
+elif cmd == "stop": state["status"] = "Stopped"
+elif cmd in ("next", "previous", "open"):
+    state["track"] += 1; state["status"] = "Playing"
+elif cmd == "metadata":
+    print(f"spotify:track:{state['track']}\tTrack {state['track']}\tBenchmark")
+elif cmd == "volume":
+    if len(args) > 1: state["volume"] = float(args[1])
+    else: print(state["volume"])
+json.dump(state, open(STATE, "w"))
+'''
+
+FAKE_OLLAMA_CLI = r'''
+import sys
+if sys.argv[1:2] == ["list"]:
+    print("NAME             ID              SIZE      MODIFIED")
+    print("llama3:latest    365c0bd3c000    4.7 GB    1 minute ago")
+'''
+
+FAKE_APP = r'''
+import sys, tkinter as tk
+title, wm_class = sys.argv[1], sys.argv[2]
+root = tk.Tk(className=wm_class)
+root.title(title)
+root.geometry("640x360+100+100")
+tk.Label(root, text=title, font=("Helvetica", 48)).pack(expand=True)
+root.after(20000, root.destroy)
+root.mainloop()
+'''
+
+
+def install_script(bin_dir, name, source):
+    path = os.path.join(bin_dir, name)
+    with open(path, "w") as f:
+        f.write(f"#!{sys.executable}\n{source.lstrip()}")
+    os.chmod(path, 0o755)
+    return path
+
+
+# --- FAKE OLLAMA SERVER ---
+class FakeOllama(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, first_token_delay=0.25, token_delay=0.03):
+        super().__init__(("127.0.0.1", 0), _OllamaHandler)
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.requests = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="fake-ollama", daemon=True).start()
+        return self
+
+
+class _OllamaHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _json(self, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith("/api/tags"):
+            return self._json({"models": [{"name": "llama3:latest", "model": "llama3:latest"}]})
+        self._json({})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            request = {}
+        self.server.requests += 1
+        if self.path.startswith("/api/show"):
+            return self._json({"modelfile": "", "parameters": "", "template": "", "details": {}, "model_info": {}})
+        chat = self.path.startswith("/api/chat")
+        if not chat and not request.get("prompt"):
+            return self._json({"model": request.get("model"), "response": "", "done": True})  # preload
+
+        words = CANNED_ANSWER.split(" ")
+        if request.get("stream", True) is False:
+            time.sleep(self.server.first_token_delay + self.server.token_delay * len(words))
+            if chat:
+                return self._json({"message": {"role": "assistant", "content": CANNED_ANSWER}, "done": True})
+            return self._json({"response": CANNED_ANSWER, "done": True})
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        time.sleep(self.server.first_token_delay)
+        for i, word in enumerate(words):
+            token = word if i == 0 else " " + word
+            chunk = {"message": {"role": "assistant", "content": token}} if chat else {"response": token}
+            chunk.update(model=request.get("model"), done=False)
+            self.wfile.write((json.dumps(chunk) + "\n").encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(self.server.token_delay)
+        final = {"model": request.get("model"), "done": True, "prompt_eval_count": 10, "eval_count": len(words)}
+        if chat:
+            final["message"] = {"role": "assistant", "content": ""}
+        else:
+            final["response"] = ""
+        self.wfile.write((json.dumps(final) + "\n").encode("utf-8"))
+
+
+# --- FAKE SPOTIFY WORKER ---
+class FakeSpotifyWorker:
+    """Speaks the worker's socket protocol; a play request bumps the fake player's track."""
+
+    def __init__(self, path, playerctl, play_delay=0.3):
+        self.path = path
+        self.playerctl = playerctl
+        self.play_delay = play_delay
+        self.plays = 0
+
+    def start(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.path)
+        server.listen(8)
+        threading.Thread(target=self._serve, args=(server,), name="fake-spotify", daemon=True).start()
+        return self
+
+    def _serve(self, server):
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                data = b""
+                while not data.endswith(b"\n"):
+                    chunk = conn.recv(4096)
+                    if not chunk:
+                        break
+                    data += chunk
+                request = json.loads(data or b"{}")
+                if request.get("action") == "play":
+                    self.plays += 1
+                    threading.Timer(self.play_delay, subprocess.run,
+                                    args=([self.playerctl, "-p", "spotify", "next"],)).start()
+                conn.sendall(b'{"ok": true}\n')
+
+
+# --- AUDIO FIXTURES ---
+def load_pcm(path, sample_rate):
+    """16-bit mono PCM at `sample_rate` from any 8/16-bit PCM WAV (averaged down, linearly resampled)."""
+    with wave.open(path, "rb") as wav:
+        channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+    if width == 1:
+        samples = array.array('h', ((b - 128) << 8 for b in raw))
+    elif width == 2:
+        samples = array.array('h', raw)
+    else:
+        raise ValueError(f"{path}: only 8/16-bit WAV is supported")
+    if channels > 1:
+        samples = array.array('h', (sum(samples[i:i + channels]) // channels
+                                    for i in range(0, len(samples), channels)))
+    if rate != sample_rate:
+        count = int(len(samples) * sample_rate / rate)
+        step = rate / sample_rate
+        out = array.array('h')
+        for i in range(count):
+            pos = i * step
+            j = int(pos)
+            nxt = samples[min(j + 1, len(samples) - 1)]
+            out.append(int(samples[j] + (nxt - samples[j]) * (pos - j)))
+        samples = out
+    return samples.tobytes()
+
+
+def write_wav(path, pcm, sample_rate):
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+
+
+def synth_speech(text, path, sample_rate):
+    """espeak-ng if present, else one noise burst per word (enough for the speech gate)."""
+    espeak = shutil.which("espeak-ng") or shutil.which("espeak")
+    if espeak:
+        subprocess.run([espeak, "-w", path, text], check=True, stderr=subprocess.DEVNULL)
+        return
+    rng = random.Random(text)
+    samples = array.array('h')
+    for word in text.split():
+        for _ in range(int(sample_rate * (0.12 + 0.04 * len(word)))):
+            samples.append(int(rng.gauss(0, 4000)))
+        samples.extend([0] * int(sample_rate * 0.06))
+    write_wav(path, samples.tobytes(), sample_rate)
+
+
+def load_fixtures(folder, workdir, sample_rate):
+    if folder:
+        with open(os.path.join(folder, "manifest.json")) as f:
+            manifest = json.load(f)
+        entries = [(m.get("intent", ""), m["transcript"], os.path.join(folder, m["wav"])) for m in manifest]
+    else:
+        entries = []
+        for intent, transcript in DEFAULT_FIXTURES:
+            path = os.path.join(workdir, f"{intent}.wav")
+            synth_speech(transcript, path, sample_rate)
+            entries.append((intent, transcript, path))
+    return [SimpleNamespace(intent=i, transcript=t, pcm=load_pcm(p, sample_rate)) for i, t, p in entries]
+
+
+# --- XVFB ---
+def start_xvfb(display):
+    from ghost_supervisor import display_is_up, wait_until
+    if not shutil.which("Xvfb"):
+        return None
+    proc = subprocess.Popen(["Xvfb", display, "-screen", "0", "1280x720x24", "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if not wait_until(lambda: display_is_up(display), timeout=10):
+        proc.kill()
+        return None
+    procs = [proc]
+    # Window events need a window manager to maintain _NET_CLIENT_LIST
+    for wm in ("openbox", "fluxbox", "xfwm4", "metacity", "icewm"):
+        if shutil.which(wm):
+            procs.append(subprocess.Popen([wm], env={**os.environ, "DISPLAY": display},
+                                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+            break
+    else:
+        print("⚠️ No window manager found; launches will be confirmed by OCR, not window events.")
+    return procs
+
+
+# --- RUN ---
+def percentile(values, p):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100.0 * len(ordered)))]
+
+
+def latencies(summary):
+    """(wake_to_action, wake_to_first_audio) for one trace summary, in seconds (None if absent)."""
+    spans = {}
+    for span in summary["spans"]:
+        spans.setdefault(span["stage"], span)
+    action = spans.get("action") or spans.get("llm_first_sentence") or spans.get("llm")
+    audio = spans.get("playback_start")
+    end = lambda s: s["at"] + s["seconds"] if s else None
+    return end(action), end(audio)
+
+
+def prepare_environment(workdir, args):
+    bin_dir = os.path.join(workdir, "bin")
+    os.makedirs(bin_dir)
+    playerctl = install_script(bin_dir, "playerctl", FAKE_PLAYERCTL)
+    install_script(bin_dir, "pactl", FAKE_PACTL)
+    install_script(bin_dir, "ollama", FAKE_OLLAMA_CLI)
+    app = install_script(bin_dir, "jarvis-fake-app", FAKE_APP)
+
+    ollama = FakeOllama(args.llm_first_token, args.llm_token_delay).start()
+    os.environ.update({
+        "PATH": bin_dir + os.pathsep + os.environ.get("PATH", ""),
+        "XDG_RUNTIME_DIR": workdir,
+        "XDG_CACHE_HOME": os.path.join(workdir, "cache"),
+        "DBUS_SESSION_BUS_ADDRESS": "unix:path=" + os.path.join(workdir, "no-bus"),
+        "PULSE_SERVER": "unix:" + os.path.join(workdir, "no-pulse"),
+        "SDL_AUDIODRIVER": "dummy",
+        "JARVIS_OLLAMA_URL": ollama.url,
+        "JARVIS_SERVER": "threading",
+        "LITELLM_LOCAL_MODEL_COST_MAP": "True",
+    })
+    xvfb = None
+    if args.xvfb:
+        xvfb = start_xvfb(args.display)
+        if xvfb:
+            os.environ["DISPLAY"] = args.display
+        else:
+            print("⚠️ Xvfb unavailable; launch_app fixtures will be skipped.")
+    return SimpleNamespace(playerctl=playerctl, app=app, ollama=ollama, xvfb=xvfb)
+
+
+def build_stand_ins(server, env, args):
+    from mic_stream import MicStream, FRAME_SAMPLES, FRAME_SECONDS, SAMPLE_RATE, SAMPLE_WIDTH
+    from stt_backends import STTBackend, STTSession, build_stt
+    from tts_backends import TTSBackend
+    from audio_engine import AudioEngine
+    from tts_cache import TTSCache
+    from wakeword import SpeechGateDetector
+    from spotify_control import SpotifyClient, socket_path
+
+    class FixtureMic(MicStream):
+        """A MicStream fed from WAV fixtures in real time, silence in between."""
+
+        def __init__(self, speed=1.0):
+            super().__init__()
+            self.speed = speed
+            self._pending = queue.Queue()
+
+        def start(self):
+            with self._lock:
+                if self._running.is_set():
+                    return
+                self._running.set()
+                self._thread = threading.Thread(target=self._feed, name="fixture-mic", daemon=True)
+                self._thread.start()
+
+        def close(self):
+            self._running.clear()
+
+        def play(self, pcm):
+            size = FRAME_SAMPLES * SAMPLE_WIDTH
+            for i in range(0, len(pcm), size):
+                self._pending.put(pcm[i:i + size].ljust(size, b"\0"))
+
+        def _feed(self):
+            silence = b"\0" * FRAME_SAMPLES * SAMPLE_WIDTH
+            next_at = time.perf_counter()
+            while self._running.is_set():
+                try:
+                    frame = self._pending.get_nowait()
+                except queue.Empty:
+                    frame = silence
+                self._dispatch(frame)
+                next_at += FRAME_SECONDS / self.speed
+                time.sleep(max(0.0, next_at - time.perf_counter()))
+
+    class _ScriptedSession(STTSession):
+        def __init__(self, stt):
+            self.stt = stt
+
+        def finish(self, audio_bytes):
+            time.sleep(self.stt.delay)
+            return self.stt.current
+
+    class ScriptedSTT(STTBackend):
+        """Returns the transcript of the fixture being played."""
+        name = "scripted"
+        pause_threshold = 1.0
+
+        def __init__(self, delay=0.0):
+            self.delay = delay
+            self.current = ""
+
+        def start(self):
+            return _ScriptedSession(self)
+
+    class ToneBackend(TTSBackend):
+        """A short tone per sentence, after a fixed synthesis delay."""
+        name = "tone"
+
+        def __init__(self, delay=0.05):
+            super().__init__("en", cooldown=0.0)
+            self.delay = delay
+
+        def synthesize(self, text):
+            time.sleep(self.delay)
+            count = int(SAMPLE_RATE * min(0.4, 0.03 * len(text.split())))
+            samples = array.array('h', (int(3000 * math.sin(2 * math.pi * 440 * i / SAMPLE_RATE)) for i in range(count)))
+            buffer = io.BytesIO()
+            with wave.open(buffer, "wb") as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(SAMPLE_RATE)
+                wav.writeframes(samples.tobytes())
+            return buffer.getvalue()
+
+    mic = FixtureMic(speed=args.speed)
+    stt = ScriptedSTT(args.stt_delay) if args.stt == "scripted" else build_stt(args.stt, language="en-US")
+
+    def load_ears():
+        mic.start()
+        return SimpleNamespace(mic=mic, stt=stt, detector=SpeechGateDetector(stt.transcribe))
+
+    def load_voice():
+        engine = AudioEngine(stop_event=server.stop_event, cache=TTSCache(), backends=[ToneBackend(args.tts_delay)])
+        engine.start()
+        return engine
+
+    def load_spotify():
+        ready = SimpleNamespace(wait_ready=lambda timeout=None: True)
+        return SimpleNamespace(ghost=ready, client=SpotifyClient(HERE, display=os.environ.get("DISPLAY", ":99")))
+
+    server.subsystems.register("ears", load_ears)
+    server.subsystems.register("voice", load_voice)
+    server.subsystems.register("spotify", load_spotify)
+    FakeSpotifyWorker(socket_path(), env.playerctl).start()
+
+    for name, entry in server.APP_MAP.items():
+        _, keyword, wm_class = entry
+        entry[0] = f"{env.app} {keyword} {wm_class}"
+    return mic, stt
+
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="jarvis-bench-")
+    env = prepare_environment(workdir, args)
+    sys.path.insert(0, HERE)
+    from mic_stream import SAMPLE_RATE
+    fixtures = load_fixtures(args.fixtures, workdir, SAMPLE_RATE)
+    if not env.xvfb:
+        fixtures = [f for f in fixtures if f.intent != "launch_app"]
+    if args.only:
+        fixtures = [f for f in fixtures if f.intent in args.only]
+
+    import server
+    mic, stt = build_stand_ins(server, env, args)
+
+    finished = queue.Queue()
+    server.tracer.on_finish(finished.put)
+    server.subsystems.start()
+    threading.Thread(target=server.jarvis_main_loop, name="jarvis-main", daemon=True).start()
+    server.subsystems.get("ears")
+    server.subsystems.get("voice")
+    time.sleep(1.0)  # let the noise floor settle on silence
+
+    results = []
+    for round_no in range(args.runs):
+        if not args.keep_caches:
+            # Every round measures the real llm/tts path, not replies cached by the round before
+            server.response_cache.clear()
+            server.subsystems.get("voice").cache.clear()
+        for fixture in fixtures:
+            stt.current = fixture.transcript
+            while not finished.empty():
+                finished.get_nowait()
+            mic.play(fixture.pcm)
+            try:
+                summary = finished.get(timeout=args.timeout)
+            except queue.Empty:
+                print(f"❌ {fixture.intent}: no trace within {args.timeout}s")
+                results.append({"expected": fixture.intent, "label": None, "action": None, "audio": None})
+                continue
+            action, audio = latencies(summary)
+            results.append({"expected": fixture.intent, "label": summary["label"],
+                            "action": action, "audio": audio, "trace": summary})
+            flag = "✅" if summary["label"] == fixture.intent else "⚠️"
+            print(f"{flag} round {round_no + 1} {fixture.intent:<13} -> {summary['label']:<13} "
+                  f"action {fmt(action)}  first audio {fmt(audio)}")
+            time.sleep(args.gap)
+
+    for proc in env.xvfb or []:
+        proc.terminate()
+    return results, server.tracer.snapshot(), env
+
+
+def fmt(seconds):
+    return "   -   " if seconds is None else f"{seconds * 1000:6.0f}ms"
+
+
+def report(results, snapshot):
+    by_intent = {}
+    for r in results:
+        by_intent.setdefault(r["expected"], []).append(r)
+
+    print("\n📊 Latency per intent (from wake word detected)")
+    print(f"  {'intent':<13} {'n':>3} {'ok':>3} | {'wake->action p50/p90/p99':^27} | {'wake->first audio p50/p90/p99':^27}")
+    for intent, rows in by_intent.items():
+        ok = sum(1 for r in rows if r["label"] == intent)
+        cells = []
+        for key in ("action", "audio"):
+            values = [r[key] for r in rows if r[key] is not None]
+            cells.append(" ".join(fmt(percentile(values, p)) for p in (50, 90, 99)))
+        print(f"  {intent:<13} {len(rows):>3} {ok:>3} | {cells[0]} | {cells[1]}")
+
+    print("\n⏱️ Per stage")
+    for stage, stats in snapshot["stages"].items():
+        print(f"  {stage:<20} n={stats['count']:<4} p50 {fmt(stats['p50'])}  p90 {fmt(stats['p90'])}  max {fmt(stats['max'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="folder with manifest.json and WAVs (default: generated)")
+    parser.add_argument("--runs", type=int, default=3, help="rounds over all fixtures")
+    parser.add_argument("--only", nargs="*", help="only these intents")
+    parser.add_argument("--stt", default="scripted", help="scripted (default), auto, google or vosk")
+    parser.add_argument("--stt-delay", type=float, default=0.0, help="simulated recognition time")
+    parser.add_argument("--tts-delay", type=float, default=0.05, help="simulated synthesis time")
+    parser.add_argument("--llm-first-token", type=float, default=0.25)
+    parser.add_argument("--llm-token-delay", type=float, default=0.03)
+    parser.add_argument("--speed", type=float, default=1.0, help="fixture playback speed")
+    parser.add_argument("--gap", type=float, default=1.0, help="pause between fixtures")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--keep-caches", action="store_true",
+                        help="keep response and TTS caches between rounds (measures warm hits)")
+    parser.add_argument("--xvfb", action="store_true", help="run launch_app and vision on a private Xvfb")
+    parser.add_argument("--display", default=":97")
+    parser.add_argument("--json", help="write raw results here")
+    args = parser.parse_args()
+
+    results, snapshot, env = run(args)
+    report(results, snapshot)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"results": results, "stages": snapshot["stages"]}, f, indent=2)
+        print(f"\n💾 Raw results in {args.json}")
+    failures = [r for r in results if r["label"] != r["expected"]]
+    # Anything routed to the wrong intent (or never finished) fails the run
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
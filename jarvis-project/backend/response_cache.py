@@ -0,0 +1,150 @@
+"""
+On-disk cache of LLM replies.
+
+Keyed on the normalized command (not the prompt, which carries the current
+time), so asking the same question again is answered without running the
+model. Questions about the time never hit the cache, questions about things
+that change during the day expire quickly, and everything else lives for a
+week. Entries persist in one JSON file; the least recently used ones are
+evicted first. The key has no conversation in it, so during a conversation
+callers skip the cache for questions that lean on it ("why?", "and what
+about Spain?"); see depends_on_context().
+"""
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from intents import normalize
+
+
+# Never cached: the answer is wrong a minute later
+NO_CACHE = re.compile(r"\b(time|clock|now|today|tonight|date|day is it|tomorrow|yesterday|timer|remind)\b")
+# Cached briefly: changes during the day
+SHORT_LIVED = re.compile(r"\b(weather|forecast|temperature|news|latest|current|price|score|traffic)\b")
+SHORT_TTL = 15 * 60
+DEFAULT_TTL = 7 * 24 * 3600
+
+# Phrasing that only makes sense after an earlier turn
+FOLLOW_UP = re.compile(
+    r"^(?:and|but|so|also|then|why|how come|really|are you sure|what about|how about"
+    r"|tell me more|more|go on|continue|again)\b"
+    r"|\b(?:it|its|it's|that|this|those|these|they|them|their|he|him|his|she|her|there"
+    r"|the other|the same|else|instead|previous|you said|earlier)\b"
+)
+
+_FILLER = re.compile(r"\b(please|jarvis|hey|can you|could you|would you|tell me)\b")
+
+
+def default_cache_path():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "jarvis", "responses.json")
+
+
+def cache_key(command):
+    """"Hey Jarvis, what's the capital of France?" and "what's the capital of france" match."""
+    text = normalize(command)
+    text = re.sub(r"[^\w\s']", " ", text)
+    text = _FILLER.sub(" ", text)
+    return " ".join(text.split())
+
+
+def depends_on_context(command):
+    """True if `command` reads like a follow-up, so its answer depends on the conversation."""
+    return bool(FOLLOW_UP.search(cache_key(command)))
+
+
+def ttl_for(command):
+    """Seconds a reply to `command` may be reused for; 0 means never cache it."""
+    key = cache_key(command)
+    if not key or NO_CACHE.search(key):
+        return 0
+    if SHORT_LIVED.search(key):
+        return SHORT_TTL
+    return DEFAULT_TTL
+
+
+class ResponseCache:
+    def __init__(self, path=None, max_entries=500):
+        self.path = path or default_cache_path()
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> {"reply", "expires"}, oldest first
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self._load()
+
+    # --- PUBLIC API ---
+    def get(self, command):
+        if not ttl_for(command):
+            with self._lock:
+                self.skipped += 1
+            return None
+        key = cache_key(command)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["expires"] < time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["reply"]
+
+    def put(self, command, reply):
+        ttl = ttl_for(command)
+        reply = (reply or "").strip()
+        if not ttl or not reply:
+            return False
+        with self._lock:
+            key = cache_key(command)
+            self._entries.pop(key, None)
+            self._entries[key] = {"reply": reply, "expires": time.time() + ttl}
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._save()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "skipped": self.skipped,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    # --- PERSISTENCE ---
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        # Stored oldest first, so the LRU order survives restarts
+        for key, entry in stored.get("entries", []):
+            if entry.get("expires", 0) > now and entry.get("reply"):
+                self._entries[key] = entry
+
+    def _save(self):
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"entries": list(self._entries.items())}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"(Response Cache Error: {e})")
+            if os.path.exists(tmp_path): os.remove(tmp_path)
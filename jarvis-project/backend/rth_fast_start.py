@@ -0,0 +1,6 @@
+# PyInstaller runtime hook for Jarvis-fast.spec, runs before server.py.
+import os
+
+# litellm fetches the model cost map from GitHub on import unless told to use
+# the copy bundled with it; that request alone can add seconds to a cold start.
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
@@ -3,71 +3,51 @@ import os
 import subprocess
 import time
 
-def ensure_ghost_environment():
-    """Checks if the Ghost Screen (:99) is running. If not, starts it."""
-    print("👻 Checking Ghost Environment...")
-    
-    # 1. Check if Display :99 is active using xdpyinfo
-    # We send output to DEVNULL to keep the terminal clean
-    check = subprocess.run(
-        "xdpyinfo -display :99", 
-        shell=True, 
-        stdout=subprocess.DEVNULL, 
-        stderr=subprocess.DEVNULL
-    )
-    
-    if check.returncode == 0:
-        print("✅ Ghost Environment is already running.")
-        return
-    
-    print("❌ Ghost not found. Starting it now...")
-    
-    # 2. Find the script path relative to the executable
-    if getattr(sys, 'frozen', False):
-        # If running as compiled Jarvis app
-        base_path = os.path.dirname(sys.executable)
-    else:
-        # If running as python script
-        base_path = os.path.dirname(os.path.abspath(__file__))
-
-    script_path = os.path.join(base_path, "ghost_spotify.sh")
-    
-    # 3. Launch the script
-    if os.path.exists(script_path):
-        try:
-            # We use Popen so it runs in the background
-            subprocess.Popen([script_path], cwd=base_path)
-            
-            # Give it 5 seconds to boot up Xvfb and Spotify
-            print("⏳ Waiting 5s for Spotify to load...")
-            time.sleep(5) 
-            print("✅ Ghost Environment Started!")
-        except Exception as e:
-            print(f"⚠️ Failed to start script: {e}")
-    else:
-        print(f"⚠️ Could not find script at: {script_path}")
-        print("Please make sure ghost_spotify.sh is in the same folder as Jarvis.")
-
 import datetime
 import threading
 import re
-from flask import Flask, send_from_directory
-from flask_socketio import SocketIO
-import webview  # The GUI engine
-import speech_recognition as sr
-from gtts import gTTS
-import pygame
-import pyautogui
-import pytesseract
-from PIL import Image, ImageOps
-from interpreter import interpreter
+import socket
+import collections
+import importlib.util
+from types import SimpleNamespace
+from tts_cache import TTSCache
+from constants import WAKE_PHRASE
+from intents import IntentRouter, Unhandled, schedule
+from task_runner import TaskRunner, current_token, use_token
+from spotify_control import SpotifyClient
+from subsystems import SubsystemRegistry
+from llm_stream import SentenceBuffer, OllamaWarmer, message_text
+from response_cache import ResponseCache, depends_on_context
+from math_eval import SPOKEN_MATH, DivisionByZero, MathError, MathSyntaxError, evaluate, format_number
+from system_control import SystemControl, SystemControlError, MAX_VOLUME
+from status_bus import StatusBus
+from web_server import Broadcast, MetricsServer, WebServer
+from webview_bridge import WebviewBridge
+from tracing import Tracer, current_trace, set_current, span, record, use
 
 # --- CONFIGURATION ---
-interpreter.offline = True
-interpreter.llm.model = "ollama/llama3"
-interpreter.llm.api_base = "http://localhost:11434"
-interpreter.auto_run = True
-interpreter.custom_instructions = "My terminal is Zsh. Always use 'gtk-launch' for GUI apps."
+# Voice: 'gtts' (cloud only), 'local' (espeak-ng/piper, no network) or 'auto'
+TTS_MODE = os.environ.get("JARVIS_TTS", "auto")
+# Ears: 'google' (cloud), 'vosk' (local, streaming partials) or 'auto'
+STT_MODE = os.environ.get("JARVIS_STT", "auto")
+SERVER_PORT = 5000
+# How the orb window gets its page and status: "bridge" (pywebview JS bridge,
+# no server) or "server" (loads http://127.0.0.1:SERVER_PORT like a browser would)
+GUI_TRANSPORT = os.environ.get("JARVIS_GUI", "bridge")
+# Also serve HTTP + Socket.IO for clients outside this process. Without it,
+# bridge mode still answers GET /metrics on SERVER_PORT.
+REMOTE_CLIENTS = os.environ.get("JARVIS_REMOTE_CLIENTS", "0") == "1"
+# Also send every finished request trace to the GUI as a 'trace' event
+PUSH_TRACES = os.environ.get("JARVIS_PUSH_TRACES", "0") == "1"
+LLM_MODEL = "ollama/llama3"
+LLM_API_BASE = os.environ.get("JARVIS_OLLAMA_URL", "http://localhost:11434")
+# How long Ollama keeps the model in memory between questions
+OLLAMA_KEEP_ALIVE = os.environ.get("JARVIS_OLLAMA_KEEP_ALIVE", "30m")
+# Prompt budget for the conversation history sent with each question
+LLM_HISTORY_TOKENS = int(os.environ.get("JARVIS_LLM_HISTORY_TOKENS", "3000"))
+# Talking over a reply cuts it and starts listening (JARVIS_BARGE_IN=0 turns it off)
+BARGE_IN = os.environ.get("JARVIS_BARGE_IN", "1") != "0"
+BARGE_IN_FRAMES = 5  # consecutive 80 ms frames of speech over a reply before it counts
 
 # --- HELPER: FIX PATHS FOR FROZEN APP ---
 def resource_path(relative_path):
@@ -80,293 +60,900 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
-# --- FLASK SETUP ---
+def app_base_path():
+    """Folder of the running Jarvis executable (or of this script in dev)."""
+    if getattr(sys, 'frozen', False):
+        # If running as compiled app (PyInstaller)
+        return os.path.dirname(sys.executable)
+    # If running as python script
+    return os.path.dirname(os.path.abspath(__file__))
+
+# --- GUI TRANSPORTS ---
 # We use resource_path to find the 'gui' folder safely
 gui_folder = resource_path('gui')
 
-app = Flask(__name__, static_folder=gui_folder, static_url_path='')
-# Force async_mode to 'eventlet' to prevent errors
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
-@app.route('/')
-def index():
-    return send_from_directory(app.static_folder, 'index.html')
+def metrics_snapshot():
+    voice = subsystems.peek("voice")
+    brain = subsystems.peek("brain")
+    return {
+        "latency": tracer.snapshot(),
+        "subsystems": subsystems.report(),
+        "status_bus": status_bus.stats(),
+        "response_cache": response_cache.stats(),
+        "tts_cache": voice.cache.stats() if voice and voice.cache else None,
+        "conversation": brain.stats() if brain else None,
+    }
+
+def build_web_server():
+    """Flask app behind Socket.IO. Only imported when something needs the server."""
+    from flask import Flask, send_from_directory, jsonify
+
+    app = Flask(__name__, static_folder=gui_folder, static_url_path='')
+
+    @app.route('/')
+    def index():
+        return send_from_directory(app.static_folder, 'index.html')
+
+    @app.route('/<path:path>')
+    def serve_static(path):
+        return send_from_directory(app.static_folder, path)
 
-@app.route('/<path:path>')
-def serve_static(path):
-    return send_from_directory(app.static_folder, path)
+    @app.route('/metrics')
+    def metrics():
+        return jsonify(metrics_snapshot())
+
+    # uvicorn + Socket.IO when available, else Flask-SocketIO on Werkzeug
+    return WebServer(app)
+
+bridge = WebviewBridge(gui_folder) if GUI_TRANSPORT == "bridge" else None
+http_server = build_web_server() if GUI_TRANSPORT == "server" or REMOTE_CLIENTS else None
+web = Broadcast([bridge, http_server])
 
 # Global Event to signal stopping
 stop_event = threading.Event()
 
+# --- TRACING ---
+# One trace per request, from the wake word to the end of the reply
+tracer = Tracer(capacity=200)
+
+def log_trace(summary):
+    stages = " | ".join(f"{s['stage']} {s['seconds']:.2f}s" for s in summary["spans"])
+    print(f"⏱️ #{summary['id']} {summary['label']}: {stages}")
+
+tracer.on_finish(log_trace)
+if PUSH_TRACES:
+    tracer.on_finish(lambda summary: web.emit('trace', summary))
+
 # --- HELPER: EMIT STATUS TO REACT ---
+# Changes are coalesced and sequence-numbered by the bus before they reach the orb
+status_bus = StatusBus(coalesce_window=0.05)
+status_bus.add_sink(lambda event: web.emit('status_update', event))
+
 def change_status(status):
     print(f"📡 STATUS: {status}")
-    socketio.emit('status_update', {'status': status})
+    status_bus.publish(status)
+
+def on_client_connect(sid, data):
+    # A fresh or reconnected orb starts from the current state
+    web.emit('status_update', status_bus.snapshot(), to=sid)
+
+def on_client_resync(sid, data):
+    """The client sends the last seq it saw; replay what it missed."""
+    seq = (data or {}).get('seq', 0)
+    for event in status_bus.since(seq):
+        web.emit('status_update', event, to=sid)
+
+web.on('connect', on_client_connect)
+web.on('resync', on_client_resync)
+
+# Fixed replies are synthesized once at startup and then played from cache
+COMMON_REPLIES = [
+    "Yes?",
+    "Muted.",
+    "Unmuted.",
+    "Next.",
+    "Nothing is playing.",
+    "Resuming Spotify.",
+    "Pausing Spotify.",
+    "Checking visual feed...",
+    "I couldn't start the background task.",
+    "Starting fresh.",
+]
+
+# --- SUBSYSTEMS ---
+# Heavy imports (litellm, pygame, Tesseract, PyAudio...) live in these
+# loaders. They run in parallel on background threads at start-up, so the
+# orb does not wait for them, and anything not loaded yet is loaded on first
+# use.
+subsystems = SubsystemRegistry()
+
+# Replies to repeated questions, keyed on the command rather than the timed prompt
+response_cache = ResponseCache()
+
+# Refreshed after every chat turn too; the interval is a backstop under Ollama's 5 min default
+ollama_warmer = OllamaWarmer(LLM_API_BASE, LLM_MODEL, keep_alive=OLLAMA_KEEP_ALIVE, refresh_interval=240.0)
+
+def load_brain():
+    # Ollama loads the weights while litellm is still importing
+    ollama_warmer.start()
+    from interpreter import interpreter
+    interpreter.offline = True
+    interpreter.llm.model = LLM_MODEL
+    interpreter.llm.api_base = LLM_API_BASE
+    interpreter.auto_run = True
+    interpreter.custom_instructions = "My terminal is Zsh. Always use 'gtk-launch' for GUI apps."
+    # History is compacted to a token budget instead of growing all day
+    from conversation import Conversation
+    return Conversation(interpreter, max_tokens=LLM_HISTORY_TOKENS)
+
+def load_voice():
+    # One long-lived engine: the mixer stays open and replies queue up instead
+    # of racing each other on a shared temp file.
+    from audio_engine import AudioEngine
+    from tts_backends import build_backends
+    engine = AudioEngine(
+        stop_event=stop_event,
+        cache=TTSCache(),
+        backends=build_backends(TTS_MODE, lang='en', tld='co.uk'),
+    )
+    engine.start()
+    engine.prewarm(COMMON_REPLIES)
+    return engine
+
+def load_ears():
+    # One microphone stream for the whole process. The wake-word detector runs
+    # locally on its frames; full recognition only happens after it fires.
+    from mic_stream import MicStream
+    from stt_backends import build_stt
+    from wakeword import build_detector
+    mic = MicStream()
+    mic.start()
+    stt = build_stt(STT_MODE, language='en-US')
+    detector = build_detector(stt.transcribe, vosk_model=getattr(stt, "model", None))
+    return SimpleNamespace(mic=mic, stt=stt, detector=detector)
+
+def load_vision():
+    from vision import ScreenReader
+    from window_watch import WindowWatcher
+    return SimpleNamespace(reader=ScreenReader(max_width=1920), windows=WindowWatcher())
+
+def load_spotify():
+    """Starts the Ghost Screen (:99) and Spotify under supervision, then the worker."""
+    from ghost_supervisor import GhostSupervisor
+    print("👻 Checking Ghost Environment...")
+    ghost = GhostSupervisor(display=":99")
+    ghost.start()
+    client = SpotifyClient(app_base_path(), display=":99")
+
+    def start_worker():
+        if ghost.wait_ready(timeout=60):
+            client.ensure_running()
+    threading.Thread(target=start_worker, daemon=True).start()
+    return SimpleNamespace(ghost=ghost, client=client)
+
+subsystems.register("voice", load_voice)
+subsystems.register("ears", load_ears)
+subsystems.register("vision", load_vision)
+subsystems.register("spotify", load_spotify)
+subsystems.register("brain", load_brain)
 
 # --- AUDIO ---
+def voice_or_none():
+    """The voice, or None if it failed to load; replies are then only shown as text."""
+    try:
+        return subsystems.get("voice")
+    except Exception as e:
+        print(f"(Voice unavailable, replying in text only: {e})")
+        return None
+
 def speak(text):
-    if stop_event.is_set(): return
+    if stop_event.is_set() or current_token().cancelled: return
+    voice = voice_or_none()
+    if voice is None:
+        print(f"💬 {text}")
+        web.emit('llm_partial', {'text': text, 'done': True})
+        return
     change_status("SPEAKING")
-    
+    print(f"🗣️ Speaking: {text}")
     try:
-        print(f"🗣️ Speaking: {text}")
-        tts = gTTS(text=text, lang='en', tld='co.uk')
-        filename = "voice.mp3"
-        tts.save(filename)
-        
-        pygame.mixer.init()
-        pygame.mixer.music.load(filename)
-        pygame.mixer.music.play()
-        
-        while pygame.mixer.music.get_busy():
-            if stop_event.is_set():
-                pygame.mixer.music.stop()
-                break
-            time.sleep(0.1)
-        
-        pygame.mixer.quit()
-        if os.path.exists(filename): os.remove(filename)
+        voice.say(text)
     except Exception as e:
         print(f"(TTS Error: {e})")
-    
-    change_status("IDLE")
+    if not current_token().cancelled:  # cut off: the next state is already set
+        change_status("IDLE")
+
+def cut_speech():
+    voice = subsystems.peek("voice")
+    if voice:
+        voice.stop()
+
+# --- TASKS ---
+# Commands run on a small worker pool so the wake-word listener never blocks
+# on them. "stop" cancels every task and cuts the current reply.
+awaiting_wakeword = threading.Event()
+
+def on_tasks_idle():
+    if awaiting_wakeword.is_set():
+        change_status("HIDDEN")
+
+runner = TaskRunner(
+    max_workers=2,
+    max_pending=2,
+    stop_event=stop_event,
+    on_cancel=cut_speech,
+    on_idle=on_tasks_idle,
+)
 
 # --- LISTENING ---
+# Short commands that are complete as soon as they are heard. With a
+# streaming STT these fire on the partial transcript, before the pause.
+FAST_PATH_COMMANDS = re.compile(
+    r"(pause|resume|next|skip|mute|unmute|stop"
+    r"|(skip|go|jump) (ahead )?to (the )?next( one| song| track)?"
+    r"|volume (up|down)|(increase|decrease) (the )?volume)"
+    r"( the)?( music| spotify)?( please)?"
+)
+# How long such a partial must stay unchanged, so a compound command can go on
+FAST_PATH_GRACE = 0.3
+
 def listen_for_wakeword():
-    change_status("HIDDEN")
-    r = sr.Recognizer()
-    with sr.Microphone() as source:
-        r.adjust_for_ambient_noise(source, duration=0.5)
-        r.pause_threshold = 0.8  
-        print("\n💤 Waiting for 'Hey Jarvis'...")
+    """Wait for the wake word. Returns (text heard, handoff).
+
+    While a reply is playing, the wake word or just talking over it
+    (BARGE_IN) cuts the reply at once. `handoff` then carries a live
+    subscription plus the frames already heard, for listen_for_command().
+    """
+    if not runner.busy():
+        change_status("HIDDEN")
+    ears = subsystems.get("ears")
+    mic, wake_detector = ears.mic, ears.detector
+
+    print("\n💤 Waiting for 'Hey Jarvis'...")
+    with mic.subscribe() as sub:
+        wake_detector.reset()
+        speech_started = None
+        speech_frames = 0
+        recent = collections.deque(maxlen=BARGE_IN_FRAMES + 4)
+        talked_over = False
         while True:
-            try:
-                audio = r.listen(source, timeout=None, phrase_time_limit=8)
-                text = r.recognize_google(audio, language='en-US').lower()
-                if "hey jarvis" in text:
-                    return text
-            except:
+            frame, rms = sub.read(timeout=1.0)
+            if frame is None:
                 continue
+            recent.append(frame)
+            is_speech = mic.is_speech(rms)
+            if is_speech and speech_started is None:
+                speech_started = time.perf_counter()
+                speech_frames = 0
+            if is_speech:
+                speech_frames += 1
+                if BARGE_IN and mic.echo_active and speech_frames >= BARGE_IN_FRAMES:
+                    talked_over = True
+                    break
+            if wake_detector.process(frame, is_speech):
+                break
+            if not is_speech:
+                speech_started = None
+
+        # The request starts here; "wake" is speech onset to detection
+        trace = tracer.start()
+        set_current(trace)
+        if speech_started is not None:
+            trace.record("wake", time.perf_counter() - speech_started, speech_started)
+
+        if BARGE_IN and (talked_over or mic.echo_active):
+            barge_in()
+        if talked_over:
+            # Open the next subscription before this one closes so no frame falls in between
+            handoff = SimpleNamespace(sub=mic.subscribe(), heard=list(recent) + sub.drain())
+            return "", handoff
+
+        if wake_detector.transcript:
+            return wake_detector.transcript, None
+
+        # "Hey Jarvis, open firefox" in one breath: keep the rest of the phrase
+        command = capture_command(ears, sub, start_timeout=0.6, pause_threshold=0.8, max_seconds=8)
+
+    if command:
+        return f"{WAKE_PHRASE} {command}", None
+    return WAKE_PHRASE, None
+
+def barge_in():
+    """The user spoke over a reply: cut it and drop the task producing it."""
+    started = time.perf_counter()
+    cancelled = runner.cancel_all()
+    # Tasks and queued audio are cancelled by now; the next command must be able to speak
+    stop_event.clear()
+    record("barge_in", time.perf_counter() - started)
+    print(f"✋ Barge-in ({cancelled} task(s) cancelled)")
+
+def capture_command(ears, sub, start_timeout, pause_threshold, max_seconds=None, heard=None):
+    """Record one utterance, returning early if a partial is already a fast-path command."""
+    session = ears.stt.start()
+    early = []
+    candidate = {}
+
+    def on_frame(frame, is_speech):
+        partial = session.feed(frame)
+        if not partial:
+            return False
+        # Only phrases an intent will actually take; anything else waits for the full pause
+        if not FAST_PATH_COMMANDS.fullmatch(partial) or router.match(partial) is None:
+            candidate.clear()
+            return False
+        # Hold it briefly: "pause the music" may go on "...and set volume to 30"
+        if candidate.get("text") != partial:
+            candidate.update(text=partial, at=time.perf_counter())
+        if time.perf_counter() - candidate["at"] >= FAST_PATH_GRACE:
+            early.append(partial)
+            return True
+        return False
 
-def listen_for_command():
+    with span("capture"):
+        audio = ears.mic.record_phrase(
+            sub,
+            start_timeout=start_timeout,
+            pause_threshold=pause_threshold,
+            max_seconds=max_seconds,
+            on_frame=on_frame,
+            heard=heard,
+        )
+    if early:
+        print(f"⚡ Fast path: {early[0]}")
+        record("stt", 0.0)
+        return early[0]
+    if not audio:
+        return None
+    try:
+        with span("stt"):
+            return session.finish(audio)
+    except:
+        return None
+
+def listen_for_command(handoff=None):
     change_status("LISTENING")
-    r = sr.Recognizer()
-    with sr.Microphone() as source:
-        r.adjust_for_ambient_noise(source, duration=0.5)
-        r.pause_threshold = 2.0  
-        r.dynamic_energy_threshold = True 
-        
-        print("👂 Listening (Patient Mode)...")
-        try:
-            audio = r.listen(source, timeout=5, phrase_time_limit=None)
-            change_status("THINKING")
-            return r.recognize_google(audio, language='en-US').lower()
-        except sr.WaitTimeoutError:
-            return None
-        except:
-            return None
+    ears = subsystems.get("ears")
+    print("👂 Listening (Patient Mode)...")
+    sub = handoff.sub if handoff else ears.mic.subscribe()
+    with sub:
+        command = capture_command(ears, sub, start_timeout=5, pause_threshold=ears.stt.pause_threshold,
+                                  heard=handoff.heard if handoff else None)
+    if command:
+        change_status("THINKING")
+    return command
 
 # --- VISION ---
-def scan_screen_for_text(target_word):
+def scan_screen_for_text(target_word, regions=None):
+    return subsystems.get("vision").reader.find_text(target_word, regions)
+
+def regions_for(window):
+    """Where to look for an app, cheapest first: its title bar, the window, the screen."""
+    from vision import title_bar
+    if window is None or not window.bounds:
+        return [None]
+    return [title_bar(window.bounds), window.bounds, None]
+
+# --- LOGIC BRAIN ---
+# Intents are declared once and compiled into a single matcher. Handlers
+# return the sentence to speak (or None); anything unmatched goes straight
+# to the LLM.
+router = IntentRouter()
+
+# name -> [command, word to look for on screen, WM_CLASS to look for]
+APP_MAP = {
+    "calculator": ["/usr/bin/gnome-calculator", "calculator", "gnome-calculator"],
+    "firefox": ["firefox-developer-edition", "firefox", "firefox"],
+    "fire": ["firefox-developer-edition", "firefox", "firefox"],
+    "browser": ["firefox-developer-edition", "firefox", "firefox"],
+    "terminal": ["gnome-terminal", "heitor", "gnome-terminal"],
+    "files": ["nemo", "home", "nemo"],
+    "spotify": ["spotify", "spotify", "spotify"],
+    "whatsapp": ["flatpak run com.rtosta.zapzap", "whatsapp", "zapzap"]
+}
+APP_NAMES = "|".join(sorted((re.escape(name) for name in APP_MAP), key=len, reverse=True))
+MUSIC_TARGET = r"(?:.*\b(?P<target>spotify|music)\b)?"
+
+# 0. STOP
+@router.intent("stop", [
+    r"^(?:stop|cancel|never ?mind|shut up|be quiet|quiet|enough)(?: it| that| this| everything| talking| now| please)*$",
+], priority=100)
+def stop_tasks(command):
+    cancelled = runner.cancel_all()
+    print(f"🛑 Stop requested ({cancelled} task(s) cancelled)")
+    return None
+
+@router.intent("new_conversation", [
+    r"^(?:start (?:a )?)?new (?:conversation|session|chat)$",
+    r"^(?:forget|clear) (?:everything|our conversation|the conversation|that)$",
+], priority=95)
+def new_conversation(command):
+    brain = subsystems.peek("brain")
+    if brain:
+        brain.reset()
+    return "Starting fresh."
+
+# 1. VOLUME
+# One service, one connection: each intent applies its steps together and
+# answers from the state it left the system in.
+system = SystemControl()
+
+def volume_reply(state, action):
+    if state.muted:
+        return "Muted."
+    return f"{action} {state.volume} percent."
+
+@router.intent("volume_set", [
+    r"\b(?:volume|audio)\b\D*?\b(?P<level>\d{1,3})\b",
+    r"\bset (?:the )?(?:sound|volume) to (?P<level>\d{1,3})\b",
+], priority=90, resources={"volume"})
+def set_volume(command, level):
     try:
-        screenshot = pyautogui.screenshot()
-        gray_image = screenshot.convert('L')
-        inverted_image = ImageOps.invert(gray_image)
-        screen_text = pytesseract.image_to_string(inverted_image).lower()
-        if target_word.lower() in screen_text:
-            return True
-        else:
-            return False
+        state = system.set_volume(int(level))
+    except SystemControlError as e:
+        print(f"🔊 Volume error: {e}")
+        return "I couldn't change the volume."
+    return volume_reply(state, "Volume set to")
+
+@router.intent("unmute", [r"\bunmute\b"], priority=85, resources={"volume"})
+def unmute(command):
+    try:
+        state = system.set_mute(False)
+    except SystemControlError as e:
+        print(f"🔊 Volume error: {e}")
+        return "I couldn't change the volume."
+    return "Unmuted." if not state.muted else "It's still muted."
+
+@router.intent("mute", [r"\bmute\b"], priority=85, resources={"volume"})
+def mute(command):
+    try:
+        state = system.set_mute(True)
+    except SystemControlError as e:
+        print(f"🔊 Volume error: {e}")
+        return "I couldn't change the volume."
+    return "Muted." if state.muted else "I couldn't mute it."
+
+@router.intent("volume_up", [
+    r"\b(?:volume|audio)\b.*\b(?:up|increase|louder|raise)\b",
+    r"\b(?:increase|raise|turn up)\b.*\b(?:volume|audio)\b",
+    r"\blouder\b",
+], priority=80, resources={"volume"})
+def volume_up(command):
+    try:
+        state = system.volume_up()
+    except SystemControlError as e:
+        print(f"🔊 Volume error: {e}")
+        return "I couldn't change the volume."
+    if state.volume >= MAX_VOLUME:
+        return "Volume is at maximum."
+    return volume_reply(state, "Volume up,")
+
+@router.intent("volume_down", [
+    r"\b(?:volume|audio)\b.*\b(?:down|decrease|lower|quieter)\b",
+    r"\b(?:decrease|lower|turn down)\b.*\b(?:volume|audio)\b",
+    r"\bquieter\b",
+], priority=80, resources={"volume"})
+def volume_down(command):
+    try:
+        state = system.volume_down()
+    except SystemControlError as e:
+        print(f"🔊 Volume error: {e}")
+        return "I couldn't change the volume."
+    return volume_reply(state, "Volume down,")
+
+# 2. MEDIA
+def media(action, player=None):
+    """Run a media action; returns its MediaState, or None if there was no player to run it on."""
+    try:
+        return system.media(action, player)
+    except SystemControlError as e:
+        print(f"🎵 Media error: {e}")
+        return None
+
+@router.intent("resume", [r"\bresume\b" + MUSIC_TARGET], priority=70, resources={"player"})
+def resume(command, target):
+    state = media("play", "spotify" if target else None)
+    if state is None:
+        return "Spotify isn't running." if target else "Nothing to resume."
+    return "Resuming Spotify." if target else None
+
+@router.intent("pause", [
+    r"\bpause\b" + MUSIC_TARGET,
+    # "stop" on its own cancels tasks; "stop the music" means the player
+    r"^stop (?:the )?(?P<target>music|spotify)(?: please)?$",
+], priority=70, resources={"player"})
+def pause(command, target):
+    state = media("pause", "spotify" if target else None)
+    if state is None:
+        return "Spotify isn't running." if target else None
+    return "Pausing Spotify." if target else None
+
+@router.intent("next", [
+    r"^(?:play )?(?:the )?next(?: one| song| track)?(?: please)?$",
+    r"^skip(?: this| the| this one)?(?: song| track)?(?: please)?$",
+    r"^(?:skip|go|jump) (?:ahead )?to (?:the )?next(?: one| song| track)?(?: please)?$",
+], priority=70, resources={"player"})
+def next_track(command):
+    if media("next") is None:
+        return "Nothing is playing."
+    return "Next."
+
+# 3. SPOTIFY SEARCH (GHOST WORKER METHOD)
+# The worker stays resident and takes songs over a local socket
+@router.intent("spotify_play", [
+    r"^play (?P<song>.+?) (?:on|in|with|from) spotify$",
+    r"^spotify,? play (?P<song>.+)$",
+], priority=60, resources={"player", "spotify"})
+def spotify_play(command, song):
+    try:
+        spotify = subsystems.get("spotify")
+        with span("ghost_ready"):
+            ready = spotify.ghost.wait_ready(timeout=20)
+        if not ready:
+            return "Spotify isn't ready yet."
+        with span("spotify_worker"):
+            spotify.client.play(song)
     except Exception as e:
-        print(f"Vision Error: {e}")
-        return False
+        print(f"Failed to reach worker: {e}")
+        return "I couldn't start the background task."
+    return f"Queuing {song}"
+
+# 4. MATH
+# Only pure arithmetic is claimed here; "what is the weather" goes to the LLM
+@router.intent("math", [
+    r"^(?:calculate|compute|what is|what's|how much is) (?P<expression>" + SPOKEN_MATH + r")$",
+], priority=50)
+def calculate(command, expression):
+    try:
+        result = evaluate(expression)
+    except DivisionByZero:
+        return "I can't divide by zero."
+    except MathSyntaxError as e:
+        # Looked like arithmetic but isn't; let the LLM have it
+        print(f"🧮 Not math: {e}")
+        raise Unhandled()
+    except MathError as e:
+        print(f"🧮 Math error: {e}")
+        return "I couldn't work that out."
+    return f"The result is {format_number(result)}"
+
+# 5. APP LAUNCHER
+@router.intent("launch_app", [
+    r"^(?:open|launch|start) (?:the )?(?P<app>" + APP_NAMES + r")(?: app)?$",
+], priority=40, resources={"screen"})
+def launch_app(command, app):
+    cmd, visual_keyword, wm_class = APP_MAP[app]
+    token = current_token()
+    window_watcher = subsystems.get("vision").windows
+    known_windows = window_watcher.snapshot()
+    subprocess.Popen(cmd, shell=True)
+
+    # Fast path: the window manager tells us the moment the window maps
+    with span("window_wait"):
+        window = window_watcher.wait_for([wm_class, visual_keyword], known=known_windows, timeout=6.0, token=token)
+    if token.cancelled:
+        return None
+    if window:
+        print(f"🪟 Window up: {window}")
+        return f"I see {visual_keyword}."
+
+    # Fallback: the app reused an existing window or we can't see X events
+    speak("Checking visual feed...")
+    for attempt in range(3):
+        regions = regions_for(window_watcher.newest())
+        with span("ocr"):
+            found = scan_screen_for_text(visual_keyword, regions)
+        if found:
+            return f"I see {visual_keyword}."
+        if token.sleep(1.5):
+            return None
+    return f"I opened it, but I don't see the {visual_keyword} window yet."
 
-# --- LOGIC BRAIN ---
 def execute_task(command):
-    if stop_event.is_set(): return
+    token = current_token()
+    if stop_event.is_set() or token.cancelled: return
     print(f"⚙️ Processing: {command}")
     change_status("THINKING")
 
-    # 1. VOLUME
-    if any(trigger in command for trigger in ["volume", "audio", "mute", "unmute"]):
-        numbers = re.findall(r'\d+', command)
-        if numbers:
-            level = numbers[0]
-            if int(level) > 120: level = "120"
-            subprocess.Popen(["pactl", "set-sink-mute", "@DEFAULT_SINK@", "0"])
-            subprocess.Popen(["pactl", "set-sink-volume", "@DEFAULT_SINK@", f"{level}%"])
-            speak(f"Volume set to {level} percent.")
-            return
-
-        if "unmute" in command:
-            subprocess.Popen(["pactl", "set-sink-mute", "@DEFAULT_SINK@", "0"])
-            speak("Unmuted.")
-            return
-            
-        if "mute" in command:
-            subprocess.Popen(["pactl", "set-sink-mute", "@DEFAULT_SINK@", "1"])
-            speak("Muted.")
-            return
-
-        if "up" in command or "increase" in command:
-            subprocess.Popen(["pactl", "set-sink-mute", "@DEFAULT_SINK@", "0"])
-            subprocess.Popen(["pactl", "set-sink-volume", "@DEFAULT_SINK@", "+10%"])
-            speak("Volume up.")
-            return
-
-        if "down" in command or "decrease" in command:
-            subprocess.Popen(["pactl", "set-sink-volume", "@DEFAULT_SINK@", "-10%"])
-            speak("Volume down.")
-            return
-        return
-
-    # 2. MEDIA
-    if "resume" in command:
-        if any(w in command for w in ["spotify", "music"]):
-             subprocess.Popen(["playerctl", "-p", "spotify", "play"])
-             speak("Resuming Spotify.")
-        else:
-             subprocess.Popen(["playerctl", "play"])
+    with span("intent"):
+        matches = router.match_all(command)
+    if len(matches) > 1:
+        run_compound(matches)
         return
-
-    if "pause" in command:
-        if any(w in command for w in ["spotify", "music"]):
-             subprocess.Popen(["playerctl", "-p", "spotify", "pause"])
-             speak("Pausing Spotify.")
+    match = matches[0] if matches else None
+    if match:
+        print(f"🎯 Intent: {match.intent.name} {match.slots}")
+        trace = current_trace()
+        if trace is not None:
+            trace.label = match.intent.name
+        try:
+            with span("action"):
+                reply = match.run()
+        except Unhandled:
+            print(f"↪️ {match.intent.name} passed it on to the LLM")
         else:
-             subprocess.Popen(["playerctl", "pause"])
-        return
-
-    if "next" in command or "skip" in command:
-        subprocess.Popen(["playerctl", "next"])
-        speak("Next.")
-        return
+            if reply:
+                speak(reply)
+            return
 
-# 3. SPOTIFY SEARCH (GHOST WORKER METHOD)
-    if "play" in command and "spotify" in command:
-        song_name = command.replace("play", "").replace("on spotify", "").strip()
-        speak(f"Queuing {song_name}")
-        
-        try:
-            # SMART PATH FIX:
-            # 1. Get the folder where the running 'Jarvis' executable lives
-            if getattr(sys, 'frozen', False):
-                # If running as compiled app (PyInstaller)
-                application_path = os.path.dirname(sys.executable)
-            else:
-                # If running as python script
-                application_path = os.path.dirname(os.path.abspath(__file__))
-
-            # 2. Combine with the worker name
-            worker_path = os.path.join(application_path, "spotify_worker")
-            
-            # 3. Run it
-            subprocess.Popen(
-                [worker_path, song_name],
-                env={**os.environ, "DISPLAY": ":99"} 
-            )
-        except Exception as e:
-            print(f"Failed to launch worker: {e}")
-            speak("I couldn't start the background task.")
-        return
+    trace = current_trace()
+    if trace is not None:
+        trace.label = "llm"
 
-    # 4. MATH
-    math_triggers = ["calculate", "what is", "what's", "how much is"]
-    if any(t in command for t in math_triggers):
-        expression = command
-        for t in math_triggers: expression = expression.replace(t, "")
-        expression = expression.replace("times", "*").replace("x", "*")
-        expression = expression.replace("divided by", "/").replace("plus", "+").replace("minus", "-")
-        safe = "0123456789.+-*/ "
-        expression = "".join([c for c in expression if c in safe])
-        try:
-            result = eval(expression)
-            speak(f"The result is {result}")
-        except:
-            pass
+    # 6. AI BRAIN (Fallback)
+    # Same question as before: answer from the cache without running the model.
+    # Except follow-ups mid-conversation: "why?" or "what about Spain?" depend on what came before
+    loaded = subsystems.peek("brain")
+    use_cache = not (loaded is not None and loaded.in_context() and depends_on_context(command))
+    cached = response_cache.get(command) if use_cache else None
+    if cached:
+        print(f"💾 Cached reply ({response_cache.stats()['hit_rate']:.0%} hit rate)")
+        speak(cached)
         return
 
-    # 5. APP LAUNCHER
-    triggers = ["open ", "launch ", "start "]
-    matched_trigger = next((t for t in triggers if command.startswith(t)), None)
-    if matched_trigger:
-        raw_app_name = command.replace(matched_trigger, "").strip()
-        app_map = {
-            "calculator": ["/usr/bin/gnome-calculator", "calculator"],
-            "firefox": ["firefox-developer-edition", "firefox"],
-            "fire": ["firefox-developer-edition", "firefox"],
-            "browser": ["firefox-developer-edition", "firefox"],
-            "terminal": ["gnome-terminal", "heitor"], 
-            "files": ["nemo", "home"], 
-            "spotify": ["spotify", "spotify"],
-            "whatsapp": ["flatpak run com.rtosta.zapzap", "whatsapp"]
-        }
-        if raw_app_name in app_map:
-            cmd, visual_keyword = app_map[raw_app_name]
-            subprocess.Popen(cmd, shell=True)
-            speak("Checking visual feed...")
-            
-            app_found = False
-            for attempt in range(5):
-                time.sleep(2.0)
-                if scan_screen_for_text(visual_keyword):
-                    app_found = True
-                    speak(f"I see {visual_keyword}.")
-                    break
-            if not app_found:
-                speak(f"I opened it, but I don't see the {visual_keyword} window yet.")
-            return
-
-    # 6. AI BRAIN (Fallback)
     try:
+        brain = subsystems.get("brain")
         now = datetime.datetime.now().strftime("%H:%M")
         prompt = f"(System: Time is {now}) {command}"
-        if not stop_event.is_set():
-            interpreter.chat(prompt)
+        with span("llm"):
+            try:
+                reply, complete = speak_stream(brain.stream(prompt, display=False))
+            finally:
+                # The chat request set the model's expiry back to Ollama's default
+                ollama_warmer.refresh()
+        if complete and use_cache:
+            response_cache.put(command, reply)
     except:
         pass
 
+def run_compound(matches):
+    """Several actions in one command: independent ones run side by side, one reply for all."""
+    names = [m.intent.name for m in matches]
+    print(f"🎯 Intents: {' + '.join(f'{m.intent.name} {m.slots}' for m in matches)}")
+    token = current_token()
+    trace = current_trace()
+    if trace is not None:
+        trace.label = "+".join(names)
+    replies = [None] * len(matches)
+
+    def run(i, match):
+        # Helper threads act for the same task and the same request
+        with use_token(token), use(trace):
+            try:
+                replies[i] = match.run()
+            except Exception as e:
+                print(f"⚠️ {match.intent.name} failed: {e}")
+
+    with span("action"):
+        for wave in schedule(matches):
+            if token.cancelled:
+                return
+            threads = [threading.Thread(target=run, args=(matches.index(m), m), daemon=True) for m in wave[1:]]
+            for thread in threads:
+                thread.start()
+            run(matches.index(wave[0]), wave[0])
+            for thread in threads:
+                thread.join()
+    reply = combine_replies(replies)
+    if reply:
+        speak(reply)
+
+def combine_replies(replies):
+    """'Pausing Spotify.' + 'Volume set to 30 percent.' -> one reply, repeats dropped."""
+    sentences = []
+    for reply in replies:
+        if not reply:
+            continue
+        reply = reply.strip()
+        if reply[-1] not in ".!?":
+            reply += "."
+        if reply not in sentences:
+            sentences.append(reply)
+    return " ".join(sentences)
+
+def speak_stream(chunks):
+    """Speak an LLM reply sentence by sentence while it is still being generated.
+
+    Returns (text, complete). `complete` is False if the turn was cut short or
+    ran code, since replaying such a reply from the cache would skip the action.
+    """
+    token = current_token()
+    voice = voice_or_none()  # without one the text still goes out as llm_partial
+    buffer = SentenceBuffer()
+    last = None
+    ran_code = False
+    finished = False
+    started = time.perf_counter()
+
+    def say(sentences):
+        nonlocal last
+        if voice is None:
+            return
+        for sentence in sentences:
+            if last is None:
+                record("llm_first_sentence", time.perf_counter() - started)
+                change_status("SPEAKING")
+            print(f"🗣️ Speaking: {sentence}")
+            last = voice.say(sentence, wait=False)
+
+    # Stream so a "stop" can cut the turn between chunks
+    for chunk in chunks:
+        if token.cancelled or stop_event.is_set():
+            break
+        if isinstance(chunk, dict) and chunk.get("type") in ("code", "console", "confirmation"):
+            ran_code = True
+        text = message_text(chunk)
+        if not text:
+            continue
+        say(buffer.feed(text))
+        web.emit('llm_partial', {'text': buffer.text, 'done': False})
+    else:
+        say(buffer.flush())
+        finished = True
+    # Ends the turn now (and frees the conversation for the next one) if we stopped early
+    close = getattr(chunks, "close", None)
+    if close:
+        close()
+    web.emit('llm_partial', {'text': buffer.text, 'done': True})
+
+    if last is not None:
+        last.done.wait()
+        if not token.cancelled:
+            change_status("IDLE")
+        finished = finished and not last.cancelled
+    return buffer.text, finished and not ran_code
+
+def dispatch(command):
+    """Hand a command to the worker pool. "stop" is handled right here."""
+    trace = current_trace()
+    match = router.match(command)
+    if match and match.intent.name == "stop":
+        match.run()
+        if trace is not None:
+            trace.label = "stop"
+            trace.finish()
+        return
+
+    def traced_task(command):
+        # The trace follows the command onto the worker thread
+        with use(trace):
+            try:
+                execute_task(command)
+            finally:
+                if trace is not None:
+                    trace.finish()
+
+    if runner.submit(traced_task, command) is None:
+        speak("I'm still working on the last few requests.")
+        if trace is not None:
+            trace.label = "busy"
+            trace.finish()
+
 # --- MAIN LOOP ---
+def wait_for_ears():
+    """Nothing works without the mic: keep retrying it instead of giving up."""
+    delay = 5.0
+    while True:
+        try:
+            return subsystems.get("ears")
+        except Exception as e:
+            print(f"⚠️ Can't listen ({e}); retrying in {delay:.0f}s")
+            time.sleep(delay)
+            delay = min(delay * 2, 60.0)
+            subsystems.retry("ears")
+
 def jarvis_main_loop():
+    # Nothing to listen with until the ears are up; without a voice, replies are text only
+    voice = voice_or_none()
+    ears = wait_for_ears()
+    if voice is not None:
+        # The mic stays open while Jarvis talks; it just has to tell its own voice apart
+        ears.mic.echo_source = voice.is_busy
     print("🧠 JARVIS BRAIN ONLINE")
     #speak("System Online.")
-    socketio.emit('status', {'status': 'IDLE', 'text': ''})
-    
+    web.emit('status', {'status': 'IDLE', 'text': ''})
+
     while True:
-        stop_event.clear()
-        wakeword_text = listen_for_wakeword()
-        
-        command = wakeword_text.replace("hey jarvis", "").strip()
-        if not command:
-            speak("Yes?")
-            command = listen_for_command()
-        
-        if not command:
+        try:
+            listen_once()
+        except Exception as e:
+            # Keep the only listener alive; one bad cycle must not leave a deaf window open
+            print(f"⚠️ Main loop error: {e}")
+            awaiting_wakeword.clear()
             change_status("HIDDEN")
-            continue
-
-        execute_task(command)
+            time.sleep(1.0)
+
+def listen_once():
+    """One wake word -> command cycle."""
+    stop_event.clear()
+    set_current(None)
+    awaiting_wakeword.set()
+    wakeword_text, handoff = listen_for_wakeword()
+    awaiting_wakeword.clear()
+
+    command = wakeword_text.replace(WAKE_PHRASE, "").strip()
+    if handoff:
+        # Talked over a reply: they are already saying the command
+        command = listen_for_command(handoff)
+    elif not command:
+        speak("Yes?")
+        command = listen_for_command()
+
+    if not command:
         change_status("HIDDEN")
+        trace = current_trace()
+        if trace is not None:
+            trace.label = "no command"
+            trace.finish()
+        return
+
+    dispatch(command)
 
 def start_flask():
-    ensure_ghost_environment()
-    # ADD allow_unsafe_werkzeug=True TO FIX THE CRASH
-    socketio.run(app, port=5000, debug=False, use_reloader=False, allow_unsafe_werkzeug=True)
+    http_server.run(SERVER_PORT)
+
+def wait_for_server(port, timeout=10.0):
+    """Readiness probe: returns as soon as the server accepts connections."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return True
+        except OSError:
+            time.sleep(0.02)
+    return False
+
+# Optional extras from pyproject.toml: (module, extra, what it gives, fallback)
+OPTIONAL_BACKENDS = [
+    ("openwakeword", "wakeword", "local wake word", "speech gate + cloud check"),
+    ("vosk", "vosk", "local speech-to-text", "Google cloud STT"),
+    ("tesserocr", "ocr", "persistent OCR engine", "pytesseract"),
+    ("pulsectl", "pulse", "native volume control", "pactl"),
+    ("uvicorn", "asgi", "ASGI web server", "Flask-SocketIO"),
+]
+
+def report_backends():
+    """Which optional backends are installed, without importing any of them."""
+    for module, extra, what, fallback in OPTIONAL_BACKENDS:
+        if importlib.util.find_spec(module) is not None:
+            print(f"🧩 {what}: {module}")
+        else:
+            print(f"🧩 {what}: not installed, using {fallback} (pip install 'backend[{extra}]')")
+    if GUI_TRANSPORT == "bridge":
+        print("🧩 GUI transport: pywebview bridge" + (" + web server" if http_server else ""))
+    else:
+        print(f"🧩 GUI transport: web server on port {SERVER_PORT}")
+
+def report_startup():
+    subsystems.wait_all(timeout=120)
+    subsystems.print_report()
 
 if __name__ == '__main__':
     # 1. Start Threads
+    # Subsystems load in parallel while the server and window come up
+    report_backends()
+    subsystems.start()
+    threading.Thread(target=report_startup, daemon=True).start()
+
+    if http_server:
+        t_server = threading.Thread(target=start_flask)
+        t_server.daemon = True
+        t_server.start()
+    else:
+        # No Flask in bridge mode, but /metrics stays where it always was
+        MetricsServer(metrics_snapshot).run(SERVER_PORT)
+
     t_logic = threading.Thread(target=jarvis_main_loop)
     t_logic.daemon = True
     t_logic.start()
-    
-    t_server = threading.Thread(target=start_flask)
-    t_server.daemon = True
-    t_server.start()
 
-    # --- ADD THIS DELAY ---
-    print("⏳ Waiting for server to start...")
-    time.sleep(2.0)  # Gives Flask 2 seconds to initialize port 5000
-    # ----------------------
+    import webview  # The GUI engine
+
+    if GUI_TRANSPORT == "server":
+        # Open the window the moment Flask answers instead of guessing with a sleep
+        print("⏳ Waiting for server to start...")
+        if wait_for_server(SERVER_PORT):
+            print(f"⏱️ server ready in {time.perf_counter() - subsystems.t0:.2f}s")
+        else:
+            print("⚠️ Server did not answer in time; opening the window anyway.")
 
     # 2. Debug Information
     print("🚀 Launching Jarvis...")
@@ -378,24 +965,31 @@ if __name__ == '__main__':
     # 3. Define Window Size
     ORB_WIDTH = 200
     ORB_HEIGHT = 200
-    
+
     # Define Icon Path
 
 
     # 4. Create Window
+    # Bridge: the page comes from disk and status from evaluate_js, no port involved
+    if bridge:
+        page = {'html': bridge.html(), 'js_api': bridge.api}
+    else:
+        page = {'url': f'http://127.0.0.1:{SERVER_PORT}'}
     window = webview.create_window(
-        'Jarvis', 
-        'http://127.0.0.1:5000',  # Now this URL should be ready!
+        'Jarvis',
         width=ORB_WIDTH,
         height=ORB_HEIGHT,
         transparent=True,
         frameless=True,
         on_top=True,
+        **page,
     )
+    if bridge:
+        bridge.attach(window)
 
     # 5. Snap to Right Logic
     def move_to_right():
-        time.sleep(1) 
+        time.sleep(1)
         try:
             screens = webview.screens
             screen = screens[0]
@@ -407,4 +1001,4 @@ if __name__ == '__main__':
 
     # 6. START
     webview.start(func=move_to_right, debug=False)
-    os._exit(0)
\ No newline at end of file
+    os._exit(0)
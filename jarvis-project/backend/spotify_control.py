@@ -0,0 +1,88 @@
+"""
+Client side of the resident Spotify worker.
+
+The worker (spotify_worker.py --daemon) is started once and then listens on
+a Unix socket. Each request is one line of JSON and gets one line of JSON
+back, so queuing a song is a local socket round trip instead of unpacking a
+PyInstaller binary.
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+
+def socket_path():
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or "/tmp"
+    return os.path.join(runtime_dir, f"jarvis-spotify-{os.getuid()}.sock")
+
+
+def send_request(request, timeout=2.0, path=None):
+    """Send one request to the worker and return its reply (raises OSError if it is down)."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path or socket_path())
+        sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        reply = b""
+        while not reply.endswith(b"\n"):
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            reply += chunk
+    return json.loads(reply.decode("utf-8") or "{}")
+
+
+def worker_command(base_path):
+    """How to start the worker: the frozen binary next to Jarvis, or the script in dev."""
+    if getattr(sys, 'frozen', False):
+        return [os.path.join(base_path, "spotify_worker"), "--daemon"]
+    return [sys.executable, os.path.join(base_path, "spotify_worker.py"), "--daemon"]
+
+
+class SpotifyClient:
+    def __init__(self, base_path, display=":99"):
+        self.base_path = base_path
+        self.display = display
+        self._process = None
+        self._lock = threading.Lock()
+
+    def is_running(self):
+        try:
+            return send_request({"action": "ping"}, timeout=0.5).get("ok", False)
+        except (OSError, ValueError):
+            return False
+
+    def ensure_running(self, timeout=10.0):
+        """Start the worker if nobody answers on the socket. Returns True once it does."""
+        with self._lock:
+            if self.is_running():
+                return True
+            if self._process is None or self._process.poll() is not None:
+                self._process = subprocess.Popen(
+                    worker_command(self.base_path),
+                    env={**os.environ, "DISPLAY": self.display},
+                    stdin=subprocess.DEVNULL,
+                )
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                if self.is_running():
+                    return True
+                if self._process.poll() is not None:
+                    return False
+                time.sleep(0.05)
+            return False
+
+    def play(self, query):
+        """Queue `query` on the worker. Returns the worker's reply."""
+        if not self.ensure_running():
+            raise RuntimeError("Spotify worker did not start")
+        return send_request({"action": "play", "query": query})
+
+    def shutdown(self):
+        try:
+            send_request({"action": "quit"}, timeout=0.5)
+        except (OSError, ValueError):
+            pass
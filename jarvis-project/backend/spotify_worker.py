@@ -1,33 +1,181 @@
 import sys
 import time
-import pyautogui
+import json
+import hashlib
 import os
+import queue
+import socket
+import threading
+from urllib.parse import quote
 
 # Force this script to see ONLY the Ghost Screen
 os.environ['DISPLAY'] = ':99'
 
-if len(sys.argv) > 1:
-    song_name = " ".join(sys.argv[1:])
-else:
-    sys.exit()
-
-try:
-    # 1. Search
-    pyautogui.click(500, 50) # Click Search Bar (Top Center)
-    pyautogui.hotkey('ctrl', 'l') 
-    time.sleep(0.5)
-    
-    pyautogui.write(song_name, interval=0.1)
-    pyautogui.press('enter')
-    time.sleep(2.0) # Wait for results to load
-    
-    # 2. CLICK THE "TOP RESULT" (Bullseye Method)
-    # Based on your screenshot, (300, 300) hits the center of the "Top Result" card
-    pyautogui.doubleClick(300, 300)
-    
+import pyautogui
+from mpris import MprisPlayer, MprisError
+from spotify_control import socket_path, send_request
+
+# Where the search results render on the 1024x768 ghost screen
+SEARCH_BAR = (500, 50)
+TOP_RESULT = (300, 300)
+RESULTS_REGION = (150, 100, 700, 400)
+
+pyautogui.PAUSE = 0  # no hidden 0.1 s sleep after every call
+
+
+# --- WAITING FOR STATE (instead of fixed sleeps) ---
+def region_digest(region=RESULTS_REGION):
+    return hashlib.blake2b(pyautogui.screenshot(region=region).tobytes(), digest_size=16).digest()
+
+def wait_for_results(before, timeout=4.0, interval=0.1):
+    """Wait until the results area changed from `before` and then held still for a moment."""
+    deadline = time.monotonic() + timeout
+    last = before
+    stable = 0
+    while time.monotonic() < deadline:
+        time.sleep(interval)
+        current = region_digest()
+        if current != before and current == last:
+            stable += 1
+            if stable >= 2:
+                return True
+        else:
+            stable = 0
+        last = current
+    return False
+
+
+# --- PLAYING ---
+def play(player, query):
+    previous_track = ""
+    try:
+        previous_track = player.track_id()
+    except MprisError:
+        pass
+
+    # 1. Direct links play straight through D-Bus, no UI at all
+    if query.startswith("spotify:") or "open.spotify.com/" in query:
+        player.open_uri(query)
+        return player.wait_for_track_change(previous_track, timeout=5.0)
+
+    # 2. Search
+    before = region_digest()
+    try:
+        # Jump to the search page over D-Bus instead of clicking the search bar
+        player.open_uri("spotify:search:" + quote(query))
+    except MprisError:
+        pyautogui.click(*SEARCH_BAR) # Click Search Bar (Top Center)
+        pyautogui.hotkey('ctrl', 'l')
+        pyautogui.write(query)
+        pyautogui.press('enter')
+    wait_for_results(before)
+
+    # 3. CLICK THE "TOP RESULT" (Bullseye Method)
+    pyautogui.doubleClick(*TOP_RESULT)
+    if player.wait_for_track_change(previous_track, timeout=3.0):
+        return True
+
     # Backup: Sometimes focus is weird, so we press Enter too
-    time.sleep(0.5)
     pyautogui.press('enter')
-        
-except Exception as e:
-    print(f"Error in ghost worker: {e}")
\ No newline at end of file
+    return player.wait_for_track_change(previous_track, timeout=3.0)
+
+
+# --- DAEMON ---
+class SpotifyWorker:
+    def __init__(self, path=None):
+        self.path = path or socket_path()
+        self.player = MprisPlayer("spotify")
+        self.requests = queue.Queue()
+        self.running = threading.Event()
+
+    def serve(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.path)
+        os.chmod(self.path, 0o600)
+        server.listen(8)
+        server.settimeout(0.5)
+        self.running.set()
+        threading.Thread(target=self.play_loop, daemon=True).start()
+        print(f"🎵 Spotify worker listening on {self.path}")
+
+        try:
+            while self.running.is_set():
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    continue
+                threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+        finally:
+            server.close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def handle(self, conn):
+        with conn:
+            conn.settimeout(2.0)
+            data = b""
+            try:
+                while not data.endswith(b"\n"):
+                    chunk = conn.recv(4096)
+                    if not chunk:
+                        break
+                    data += chunk
+                request = json.loads(data.decode("utf-8") or "{}")
+                reply = self.dispatch(request)
+            except Exception as e:
+                reply = {"ok": False, "error": str(e)}
+            try:
+                conn.sendall((json.dumps(reply) + "\n").encode("utf-8"))
+            except OSError:
+                pass
+
+    def dispatch(self, request):
+        action = request.get("action")
+        if action == "ping":
+            return {"ok": True}
+        if action == "play":
+            query = (request.get("query") or "").strip()
+            if not query:
+                return {"ok": False, "error": "empty query"}
+            self.requests.put(query)
+            return {"ok": True, "queued": self.requests.qsize()}
+        if action == "quit":
+            self.running.clear()
+            return {"ok": True}
+        return {"ok": False, "error": f"unknown action {action!r}"}
+
+    def play_loop(self):
+        # One song at a time: the UI can only do one search at once
+        while self.running.is_set():
+            try:
+                query = self.requests.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                started = time.monotonic()
+                ok = play(self.player, query)
+                print(f"🎵 {'Playing' if ok else 'Tried'} '{query}' in {time.monotonic() - started:.2f}s")
+            except Exception as e:
+                print(f"Error in ghost worker: {e}")
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ["--daemon"]:
+        SpotifyWorker().serve()
+        sys.exit()
+
+    if len(sys.argv) > 1:
+        song_name = " ".join(sys.argv[1:])
+    else:
+        sys.exit()
+
+    # Old one-shot usage: hand the song to a running daemon, or play it ourselves
+    try:
+        send_request({"action": "play", "query": song_name})
+    except (OSError, ValueError):
+        try:
+            play(MprisPlayer("spotify"), song_name)
+        except Exception as e:
+            print(f"Error in ghost worker: {e}")
@@ -0,0 +1,180 @@
+"""
+Cold-start benchmark for the two PyInstaller profiles.
+
+    python startup_benchmark.py                      # dist/Jarvis vs dist/Jarvis-fast
+    python startup_benchmark.py --runs 10 ./a ./b    # any executables
+
+Each run launches the executable, and records how long it takes until
+  - server: the Flask port accepts connections (when the orb can load)
+  - brain:  "JARVIS BRAIN ONLINE" is printed (voice and ears are loaded)
+then kills it along with everything it started (Spotify runs in its own
+session, so the process group alone would leave it behind and warm up the
+next run). Jarvis binds port 5000, so stop any running copy first.
+Runs use JARVIS_GUI=server so there is a port to wait for; the default
+bridge transport loads the orb without one.
+"""
+import argparse
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROFILES = {
+    "onefile": os.path.join(HERE, "dist", "Jarvis"),
+    "onedir": os.path.join(HERE, "dist", "Jarvis-fast", "Jarvis-fast"),
+}
+READY_LINE = "JARVIS BRAIN ONLINE"
+
+
+def port_open(port):
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=0.1):
+            return True
+    except OSError:
+        return False
+
+
+def descendants(pid):
+    """PIDs started under `pid`, including ones that moved to a session of their own."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name can contain spaces; the fields after it cannot
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    found = []
+    pending = [pid]
+    while pending:
+        for child in children.get(pending.pop(), []):
+            found.append(child)
+            pending.append(child)
+    return found
+
+
+def kill_tree(proc, grace=5.0):
+    """SIGTERM the launch's process group and every group its children started, then SIGKILL leftovers."""
+    groups = {proc.pid}
+    for pid in descendants(proc.pid):
+        try:
+            groups.add(os.getpgid(pid))
+        except ProcessLookupError:
+            pass
+    groups.discard(os.getpgid(0))  # never our own
+
+    def signal_all(sig):
+        alive = set()
+        for group in groups:
+            try:
+                os.killpg(group, sig)
+                alive.add(group)
+            except ProcessLookupError:
+                pass
+        return alive
+
+    signal_all(signal.SIGTERM)
+    try:
+        proc.wait(timeout=grace)
+    except subprocess.TimeoutExpired:
+        pass
+    deadline = time.monotonic() + grace
+    while signal_all(0) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    signal_all(signal.SIGKILL)
+    proc.wait()
+
+
+def run_once(executable, port, timeout):
+    """One launch. Returns {"server": s, "brain": s}; a stage that never came up is None."""
+    times = {"server": None, "brain": None}
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [executable],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        stdin=subprocess.DEVNULL,
+        start_new_session=True,  # the onefile bootloader forks; kill the whole group
+        env={**os.environ, "PYTHONUNBUFFERED": "1", "JARVIS_GUI": "server"},
+    )
+
+    def read_output():
+        for raw in proc.stdout:
+            if READY_LINE in raw.decode("utf-8", "replace") and times["brain"] is None:
+                times["brain"] = time.perf_counter() - started
+
+    reader = threading.Thread(target=read_output, daemon=True)
+    reader.start()
+    try:
+        deadline = started + timeout
+        while time.perf_counter() < deadline and proc.poll() is None:
+            if times["server"] is None and port_open(port):
+                times["server"] = time.perf_counter() - started
+            if times["server"] is not None and times["brain"] is not None:
+                break
+            time.sleep(0.01)
+    finally:
+        kill_tree(proc)
+        reader.join(timeout=1)
+    return times
+
+
+def wait_port_free(port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while port_open(port) and time.monotonic() < deadline:
+        time.sleep(0.1)
+
+
+def summarize(samples):
+    done = [s for s in samples if s is not None]
+    if not done:
+        return "never"
+    return (f"median {statistics.median(done):6.2f}s  min {min(done):6.2f}s  "
+            f"max {max(done):6.2f}s  ({len(done)}/{len(samples)})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("executables", nargs="*", help="defaults to the two dist/ profiles")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    targets = {os.path.basename(path): path for path in args.executables} or PROFILES
+    missing = [path for path in targets.values() if not os.path.exists(path)]
+    if missing:
+        print(f"❌ Not built: {', '.join(missing)}")
+        print("   Build with: pyinstaller Jarvis.spec && pyinstaller Jarvis-fast.spec")
+        sys.exit(1)
+    if port_open(args.port):
+        print(f"❌ Port {args.port} is already in use; stop the running Jarvis first.")
+        sys.exit(1)
+
+    results = {}
+    for name, path in targets.items():
+        results[name] = {"server": [], "brain": []}
+        for run in range(args.runs):
+            times = run_once(path, args.port, args.timeout)
+            for stage, seconds in times.items():
+                results[name][stage].append(seconds)
+            print(f"⏱️ {name} run {run + 1}: server {times['server']}, brain {times['brain']}")
+            wait_port_free(args.port)
+
+    print("\n📊 Cold start")
+    for name, stages in results.items():
+        print(f"  {name}")
+        for stage, samples in stages.items():
+            print(f"    {stage:<7} {summarize(samples)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Status channel between the brain and the GUI.
+
+`publish()` never blocks the caller. A flusher thread sends at most one event
+per coalescing window and only the latest state, so HIDDEN -> LISTENING ->
+HIDDEN inside 50 ms reaches the orb as nothing at all instead of as two
+redraws. Every event that does go out carries a sequence number; a client
+that reconnects sends the last one it saw and gets back either the events
+it missed or, if those have left the history, the current snapshot.
+"""
+import threading
+import time
+from collections import deque
+
+
+class StatusBus:
+    def __init__(self, coalesce_window=0.05, history=64):
+        self.coalesce_window = coalesce_window
+        self._history = deque(maxlen=history)
+        self._sinks = []
+        self._pending = None
+        self._last = {"seq": 0, "status": "HIDDEN", "ts": time.time()}
+        self._last_sent_at = 0.0
+        self._seq = 0
+        self.published = 0
+        self.coalesced = 0
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._flush_loop, name="status-bus", daemon=True)
+        self._thread.start()
+
+    # --- PUBLIC API ---
+    def add_sink(self, sink):
+        """`sink(event)` is called for every event sent, from the flusher thread."""
+        self._sinks.append(sink)
+
+    def publish(self, status, **fields):
+        with self._cond:
+            self.published += 1
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = dict(fields, status=status)
+            self._cond.notify()
+
+    def snapshot(self):
+        with self._cond:
+            return dict(self._last)
+
+    def since(self, seq):
+        """Events after `seq`, oldest first. A one-item [snapshot] if the gap is too old."""
+        with self._cond:
+            events = [e for e in self._history if e["seq"] > seq]
+            if events and events[0]["seq"] == seq + 1:
+                return events
+            if self._last["seq"] <= seq:
+                return []
+            return [dict(self._last, resync=True)]
+
+    def stats(self):
+        with self._cond:
+            return {"seq": self._seq, "published": self.published, "coalesced": self.coalesced}
+
+    # --- FLUSHER ---
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                # Leading edge goes out at once; bursts wait out the window
+                delay = self._last_sent_at + self.coalesce_window - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            with self._cond:
+                state, self._pending = self._pending, None
+                previous = {k: v for k, v in self._last.items() if k not in ("seq", "ts")}
+                if state == previous:
+                    # Flapped back to where the GUI already is
+                    self.coalesced += 1
+                    continue
+                self._seq += 1
+                event = dict(state, seq=self._seq, ts=time.time())
+                self._last = event
+                self._history.append(event)
+                self._last_sent_at = time.monotonic()
+
+            for sink in list(self._sinks):
+                try:
+                    sink(event)
+                except Exception as e:
+                    print(f"(Status sink error: {e})")
@@ -0,0 +1,128 @@
+"""
+Speech-to-text backends.
+
+A backend hands out one session per utterance. Frames are fed to the session
+as they arrive from the MicStream; streaming engines return partial
+transcripts while the user is still talking, so the caller can act on short
+commands before the utterance ends. `finish()` returns the final text.
+"""
+import json
+import os
+
+import speech_recognition as sr
+
+from mic_stream import SAMPLE_RATE, SAMPLE_WIDTH
+
+
+class STTSession:
+    def feed(self, frame):
+        """Returns the current partial transcript (lowercase) or None."""
+        return None
+
+    def finish(self, audio_bytes):
+        raise NotImplementedError
+
+
+class STTBackend:
+    name = "base"
+    streaming = False
+    # Silence that ends an utterance. Streaming engines can afford a shorter
+    # one because obvious commands already exit early on partials.
+    pause_threshold = 2.0
+
+    def start(self):
+        raise NotImplementedError
+
+    def transcribe(self, audio_bytes):
+        """One-shot recognition of a finished clip."""
+        session = self.start()
+        return session.finish(audio_bytes)
+
+
+# --- GOOGLE (CLOUD) ---
+class _GoogleSession(STTSession):
+    def __init__(self, recognizer, language):
+        self.recognizer = recognizer
+        self.language = language
+
+    def finish(self, audio_bytes):
+        audio = sr.AudioData(audio_bytes, SAMPLE_RATE, SAMPLE_WIDTH)
+        return self.recognizer.recognize_google(audio, language=self.language).lower()
+
+
+class GoogleSTT(STTBackend):
+    name = "google"
+
+    def __init__(self, language='en-US'):
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    def start(self):
+        return _GoogleSession(self.recognizer, self.language)
+
+
+# --- VOSK (LOCAL, STREAMING) ---
+class _VoskSession(STTSession):
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self._final = []
+
+    def feed(self, frame):
+        if self.recognizer.AcceptWaveform(frame):
+            text = json.loads(self.recognizer.Result()).get("text", "")
+            if text:
+                self._final.append(text)
+            return " ".join(self._final) or None
+        partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        return " ".join(self._final + [partial]).strip() or None
+
+    def finish(self, audio_bytes):
+        text = json.loads(self.recognizer.FinalResult()).get("text", "")
+        if text:
+            self._final.append(text)
+        result = " ".join(self._final).strip().lower()
+        if not result:
+            raise sr.UnknownValueError()
+        return result
+
+
+class VoskSTT(STTBackend):
+    name = "vosk"
+    streaming = True
+    pause_threshold = 1.0
+
+    def __init__(self, model_path):
+        from vosk import KaldiRecognizer, Model, SetLogLevel
+
+        SetLogLevel(-1)
+        self._recognizer_cls = KaldiRecognizer
+        self.model = Model(model_path)
+
+    def start(self):
+        return _VoskSession(self._recognizer_cls(self.model, SAMPLE_RATE))
+
+    def transcribe(self, audio_bytes):
+        session = self.start()
+        session.recognizer.AcceptWaveform(audio_bytes)
+        return session.finish(audio_bytes)
+
+
+def build_stt(mode='auto', language='en-US'):
+    """
+    'google' -> cloud recognizer (old behaviour)
+    'vosk'   -> local streaming recognizer, never touches the network
+    'auto'   -> Vosk when a model is configured, otherwise Google
+    """
+    if mode in ('vosk', 'auto'):
+        model_path = os.environ.get("JARVIS_VOSK_MODEL")
+        if model_path and os.path.isdir(model_path):
+            try:
+                backend = VoskSTT(model_path)
+                print("📝 Speech-to-text: Vosk (local, streaming)")
+                return backend
+            except Exception as e:
+                print(f"⚠️ Vosk unavailable: {e}")
+        elif mode == 'vosk':
+            print("⚠️ JARVIS_VOSK_MODEL is not set to a Vosk model folder.")
+    print("📝 Speech-to-text: Google (cloud; install backend[vosk] and set JARVIS_VOSK_MODEL for local)")
+    return GoogleSTT(language)
@@ -0,0 +1,108 @@
+"""
+Lazy, parallel subsystem loading.
+
+Heavy subsystems (LLM brain, voice, ears, vision, Spotify) are registered
+with a loader function instead of being imported at module top level.
+`start()` loads them on background threads while the server and window
+come up; `get()` blocks until one is ready, or loads it right there if
+nobody started it yet. Every load is timed so start-up cost can be reported
+per subsystem.
+"""
+import threading
+import time
+
+
+class Subsystem:
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self.value = None
+        self.error = None
+        self.seconds = None
+        self.ready = threading.Event()
+        self._started = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        started = time.perf_counter()
+        try:
+            self.value = self.loader()
+        except Exception as e:
+            self.error = e
+            print(f"⚠️ {self.name} failed to load: {e}")
+        finally:
+            self.seconds = time.perf_counter() - started
+            self.ready.set()
+            if self.error is None:
+                print(f"⏱️ {self.name} ready in {self.seconds:.2f}s")
+
+
+class SubsystemRegistry:
+    def __init__(self):
+        self._subsystems = {}
+        self._order = []
+        self.t0 = time.perf_counter()
+
+    def register(self, name, loader):
+        """Add a subsystem, or replace the loader of one that has not started yet."""
+        if name not in self._subsystems:
+            self._order.append(name)
+        self._subsystems[name] = Subsystem(name, loader)
+
+    def start(self, names=None):
+        """Load `names` (default: all) in parallel on background threads."""
+        for name in names or self._order:
+            subsystem = self._subsystems[name]
+            threading.Thread(target=subsystem.load, name=f"load-{name}", daemon=True).start()
+
+    def get(self, name, timeout=None):
+        """The loaded subsystem. Loads it in this thread if nobody has started it."""
+        subsystem = self._subsystems[name]
+        subsystem.load()
+        if not subsystem.ready.wait(timeout):
+            raise TimeoutError(f"{name} is still loading")
+        if subsystem.error is not None:
+            raise RuntimeError(f"{name} is unavailable: {subsystem.error}")
+        return subsystem.value
+
+    def retry(self, name):
+        """Forget a failed load, so the next get() runs the loader again."""
+        failed = self._subsystems[name]
+        if failed.ready.is_set() and failed.error is not None:
+            self._subsystems[name] = Subsystem(name, failed.loader)
+
+    def peek(self, name):
+        """The subsystem if it is already loaded, else None. Never blocks."""
+        subsystem = self._subsystems[name]
+        return subsystem.value if subsystem.ready.is_set() else None
+
+    def wait_all(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for name in self._order:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not self._subsystems[name].ready.wait(remaining):
+                return False
+        return True
+
+    def report(self):
+        """{name: {"ready": bool, "ok": bool, "seconds": float or None}} for every subsystem."""
+        return {
+            name: {
+                "ready": sub.ready.is_set(),
+                "ok": sub.ready.is_set() and sub.error is None,
+                "seconds": None if sub.seconds is None else round(sub.seconds, 3),
+            }
+            for name, sub in ((n, self._subsystems[n]) for n in self._order)
+        }
+
+    def print_report(self):
+        print("⏱️ Start-up times:")
+        for name, info in self.report().items():
+            seconds = "loading" if info["seconds"] is None else f"{info['seconds']:.2f}s"
+            flag = "✅" if info["ok"] else ("⏳" if not info["ready"] else "❌")
+            print(f"   {flag} {name:<8} {seconds}")
+        print(f"   total since boot: {time.perf_counter() - self.t0:.2f}s")
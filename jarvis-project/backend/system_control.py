@@ -0,0 +1,174 @@
+"""
+Volume and media control.
+
+One service owns the audio and media connections for the whole process:
+  - volume goes through a persistent PulseAudio/PipeWire connection
+    (pulsectl, if installed), or else through `pactl` calls that are run one
+    after another and waited for, so "unmute, then set 40%" cannot reorder
+  - media keys go to MPRIS over the session bus (see mpris.py)
+Volume and media each have their own lock: an operation applies all of its
+steps together and returns the resulting state, so replies describe what
+actually happened, while a volume change never waits on a player.
+"""
+import re
+import subprocess
+import threading
+from collections import namedtuple
+
+from mpris import MprisError, MprisPlayer, active_player, connect
+
+MAX_VOLUME = 120  # percent; PulseAudio allows boosting past 100
+
+VolumeState = namedtuple("VolumeState", ["volume", "muted"])
+MediaState = namedtuple("MediaState", ["player", "status"])
+
+
+class SystemControlError(Exception):
+    pass
+
+
+# --- VOLUME BACKENDS ---
+class _PulsectlBackend:
+    """Native protocol over one long-lived connection."""
+
+    def __init__(self):
+        import pulsectl
+
+        self._pulsectl = pulsectl
+        self._pulse = pulsectl.Pulse("jarvis")
+
+    def _sink(self):
+        try:
+            name = self._pulse.server_info().default_sink_name
+            return self._pulse.get_sink_by_name(name)
+        except self._pulsectl.PulseError:
+            # Server restarted (e.g. PipeWire crash): reconnect once
+            self._pulse.close()
+            self._pulse = self._pulsectl.Pulse("jarvis")
+            name = self._pulse.server_info().default_sink_name
+            return self._pulse.get_sink_by_name(name)
+
+    def state(self):
+        sink = self._sink()
+        return VolumeState(round(self._pulse.volume_get_all_chans(sink) * 100), bool(sink.mute))
+
+    def apply(self, volume=None, muted=None):
+        sink = self._sink()
+        if muted is not None:
+            self._pulse.mute(sink, muted)
+        if volume is not None:
+            self._pulse.volume_set_all_chans(sink, volume / 100.0)
+
+
+class _PactlBackend:
+    """`pactl` fallback. Calls are sequential and awaited, never fire-and-forget."""
+
+    SINK = "@DEFAULT_SINK@"
+
+    def _run(self, *args):
+        try:
+            result = subprocess.run(
+                ["pactl", *args],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=2,
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise SystemControlError(f"pactl {' '.join(args)}: {e}") from e
+        if result.returncode != 0:
+            raise SystemControlError(f"pactl {' '.join(args)}: {result.stderr.strip()}")
+        return result.stdout
+
+    def state(self):
+        volumes = [int(v) for v in re.findall(r"(\d+)%", self._run("get-sink-volume", self.SINK))]
+        muted = "yes" in self._run("get-sink-mute", self.SINK).lower()
+        return VolumeState(round(sum(volumes) / len(volumes)) if volumes else 0, muted)
+
+    def apply(self, volume=None, muted=None):
+        if muted is not None:
+            self._run("set-sink-mute", self.SINK, "1" if muted else "0")
+        if volume is not None:
+            self._run("set-sink-volume", self.SINK, f"{volume}%")
+
+
+def _volume_backend():
+    try:
+        backend = _PulsectlBackend()
+        print("🔊 Volume: pulsectl (persistent connection)")
+        return backend
+    except Exception:
+        print("🔊 Volume: pactl (install backend[pulse] for a persistent connection)")
+        return _PactlBackend()
+
+
+# --- SERVICE ---
+class SystemControl:
+    def __init__(self, volume_backend=None, mpris_transport=None):
+        self._volume = volume_backend
+        self._mpris = mpris_transport
+        self._volume_lock = threading.Lock()
+        self._media_lock = threading.Lock()
+
+    def _backend(self):
+        if self._volume is None:
+            self._volume = _volume_backend()
+        return self._volume
+
+    def _transport(self):
+        if self._mpris is None:
+            self._mpris = connect()
+        return self._mpris
+
+    # --- VOLUME ---
+    def volume_state(self):
+        with self._volume_lock:
+            return self._backend().state()
+
+    def change_volume(self, level=None, delta=None, muted=None):
+        """Set or nudge the volume and/or mute in one step. Returns the new VolumeState."""
+        with self._volume_lock:
+            backend = self._backend()
+            target = None
+            if delta is not None:
+                target = backend.state().volume + delta
+            if level is not None:
+                target = level
+            if target is not None:
+                target = max(0, min(MAX_VOLUME, int(target)))
+            backend.apply(volume=target, muted=muted)
+            return backend.state()
+
+    def set_volume(self, level):
+        return self.change_volume(level=level, muted=False)
+
+    def volume_up(self, step=10):
+        return self.change_volume(delta=step, muted=False)
+
+    def volume_down(self, step=10):
+        return self.change_volume(delta=-step)
+
+    def set_mute(self, muted):
+        return self.change_volume(muted=muted)
+
+    # --- MEDIA ---
+    def media(self, action, player=None):
+        """Play/pause/next/... on `player`, or on whichever player is active.
+
+        Returns MediaState after the change, or None if no player is running.
+        """
+        try:
+            with self._media_lock:
+                transport = self._transport()
+                target = MprisPlayer(player, transport) if player else active_player(transport)
+                if target is None or not target.available():
+                    return None
+                previous = target.track_id() if action in ("next", "previous") else None
+                getattr(target, action)()
+            # Waiting for the player to catch up doesn't need the lock
+            if action == "play":
+                target.wait_for(lambda p: p.status() == "Playing", timeout=1.0)
+            elif action == "pause":
+                target.wait_for(lambda p: p.status() != "Playing", timeout=1.0)
+            elif previous is not None:
+                target.wait_for(lambda p: p.track_id() != previous, timeout=1.0)
+            return MediaState(target.name, target.status())
+        except MprisError as e:
+            raise SystemControlError(str(e)) from e
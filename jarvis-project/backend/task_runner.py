@@ -0,0 +1,138 @@
+"""
+Background executor for commands.
+
+Commands run on a small bounded worker pool so the wake-word listener keeps
+running while a task waits on the LLM or on an app window. Every task gets
+its own CancelToken; code running inside a task can reach it through
+current_token() to sleep interruptibly or bail out early.
+"""
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def sleep(self, seconds):
+        """Sleep for `seconds` unless cancelled first. Returns True if cancelled."""
+        return self._event.wait(seconds)
+
+    def check(self):
+        if self.cancelled:
+            raise TaskCancelled()
+
+
+# Handed out outside of tasks (e.g. the main loop) so callers never need a None check
+_NEVER_CANCELLED = CancelToken()
+
+
+def current_token():
+    return getattr(_local, "token", None) or _NEVER_CANCELLED
+
+
+@contextmanager
+def use_token(token):
+    """Make `token` current on this thread, e.g. for helper threads a task starts."""
+    previous = getattr(_local, "token", None)
+    _local.token = token
+    try:
+        yield token
+    finally:
+        _local.token = previous
+
+
+class Task:
+    def __init__(self, task_id, command):
+        self.id = task_id
+        self.command = command
+        self.token = CancelToken()
+        self.future = None
+        self.submitted_at = time.monotonic()
+
+    def cancel(self):
+        self.token.cancel()
+
+    def __repr__(self):
+        return f"Task({self.id}, {self.command!r})"
+
+
+class TaskRunner:
+    def __init__(self, max_workers=2, max_pending=2, stop_event=None, on_cancel=None, on_idle=None):
+        self.stop_event = stop_event
+        self.on_cancel = on_cancel
+        self.on_idle = on_idle
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jarvis-task")
+        # Running + queued tasks; beyond this new commands are refused, not piled up
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._ids = itertools.count(1)
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, command):
+        """Run fn(command) in the background. Returns the Task, or None if saturated."""
+        if not self._slots.acquire(blocking=False):
+            return None
+        task = Task(next(self._ids), command)
+        with self._lock:
+            self._tasks[task.id] = task
+        task.future = self._pool.submit(self._run, task, fn)
+        return task
+
+    def cancel_all(self):
+        """Cancel every running and queued task and cut whatever is being spoken."""
+        with self._lock:
+            tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if self.stop_event is not None:
+            self.stop_event.set()
+        if self.on_cancel:
+            self.on_cancel()
+        return len(tasks)
+
+    def active(self):
+        with self._lock:
+            return list(self._tasks.values())
+
+    def busy(self):
+        with self._lock:
+            return bool(self._tasks)
+
+    def shutdown(self):
+        self.cancel_all()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, task, fn):
+        _local.token = task.token
+        try:
+            if not task.token.cancelled:
+                fn(task.command)
+        except TaskCancelled:
+            print(f"🛑 Cancelled: {task.command}")
+        except Exception as e:
+            print(f"⚠️ Task failed ({task.command}): {e}")
+        finally:
+            _local.token = None
+            with self._lock:
+                self._tasks.pop(task.id, None)
+                idle = not self._tasks
+            self._slots.release()
+            if idle and self.on_idle:
+                self.on_idle()
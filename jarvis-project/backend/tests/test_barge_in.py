@@ -0,0 +1,79 @@
+import array
+import random
+
+from mic_stream import FRAME_SAMPLES, MicStream
+from server import BARGE_IN_FRAMES
+
+
+def frame(level):
+    return array.array("h", [int(level), -int(level)] * (FRAME_SAMPLES // 2)).tobytes()
+
+
+class Playback:
+    """Feeds frames the way the mic thread does and counts barge-ins like listen_for_wakeword()."""
+
+    def __init__(self):
+        self.playing = False
+        self.mic = MicStream()
+        self.mic.echo_source = lambda: self.playing
+        self.run = 0
+        self.barge_ins = 0
+
+    def feed(self, level):
+        self.mic._dispatch(frame(level))
+        if self.mic.is_speech(level):
+            self.run += 1
+            if self.mic.echo_active and self.run == BARGE_IN_FRAMES:
+                self.barge_ins += 1
+        else:
+            self.run = 0
+
+    def own_voice(self, rng, frames):
+        """Words around 1500 RMS with short gaps near the noise floor in between."""
+        fed = 0
+        while fed < frames:
+            for _ in range(rng.randint(2, 6)):
+                self.feed(rng.uniform(1100, 1900))
+                fed += 1
+            for _ in range(rng.randint(1, 3)):
+                self.feed(rng.uniform(50, 200))
+                fed += 1
+
+
+def test_own_voice_does_not_barge_in():
+    rng = random.Random(7)
+    p = Playback()
+    for _ in range(25):
+        p.feed(60)
+    for _ in range(3):  # a few replies, with silence in between
+        p.playing = True
+        p.own_voice(rng, 120)
+        p.playing = False
+        for _ in range(20):
+            p.feed(60)
+    assert p.barge_ins == 0
+
+
+def test_talking_over_a_reply_barges_in():
+    rng = random.Random(7)
+    p = Playback()
+    for _ in range(25):
+        p.feed(60)
+    p.playing = True
+    p.own_voice(rng, 60)
+    for n in range(BARGE_IN_FRAMES + 2):
+        p.feed(9000)
+        if p.barge_ins:
+            break
+    assert p.barge_ins == 1
+    assert n + 1 == BARGE_IN_FRAMES
+
+
+def test_nothing_counts_before_the_echo_is_learned():
+    p = Playback()
+    for _ in range(25):
+        p.feed(60)
+    p.playing = True
+    for _ in range(p.mic.echo_warmup - 1):
+        p.feed(9000)
+    assert p.barge_ins == 0
@@ -0,0 +1,111 @@
+import pytest
+
+import server
+from intents import IntentRouter, normalize, schedule
+
+
+@pytest.fixture
+def router():
+    router = IntentRouter()
+    router.register("low", [r"\bmusic\b"], lambda c: "low", priority=10)
+    router.register("high", [r"^pause\b"], lambda c: "high", priority=50, resources=("player",))
+    router.register("volume", [r"\bvolume to (?P<level>\d+)"], lambda c, level: level, priority=30,
+                    resources=("volume",))
+    router.register("play", [r"^play (?P<song>.+?) on spotify$"], lambda c, song: song, priority=20,
+                    resources=("player",))
+    return router
+
+
+def test_normalize():
+    assert normalize("  Pause   the Music!  ") == "pause the music"
+
+
+def test_highest_priority_wins(router):
+    assert router.match("pause the music").intent.name == "high"
+    assert router.match("play some music").intent.name == "low"
+    assert router.match("what's the capital of france") is None
+
+
+def test_slots_are_extracted_and_handler_gets_them(router):
+    match = router.match("Set volume to 30.")
+    assert match.slots == {"level": "30"}
+    assert match.run() == "30"
+
+
+def test_register_after_compile_recompiles(router):
+    assert router.match("open firefox") is None
+    router.register("open", [r"^open (?P<app>\w+)$"], lambda c, app: app)
+    assert router.match("open firefox").slots == {"app": "firefox"}
+
+
+def test_match_all_splits_on_connectors(router):
+    matches = router.match_all("pause the music and then set volume to 30")
+    assert [m.intent.name for m in matches] == ["high", "volume"]
+
+
+def test_match_all_keeps_an_and_inside_a_slot(router):
+    matches = router.match_all("play simon and garfunkel on spotify")
+    assert [m.slots for m in matches] == [{"song": "simon and garfunkel"}]
+
+
+def test_match_all_is_empty_if_any_part_is_unknown(router):
+    assert router.match_all("pause the music and tell me a joke") == []
+
+
+def test_schedule_orders_conflicting_actions(router):
+    matches = router.match_all("pause, set volume to 30, then play abba on spotify")
+    waves = schedule(matches)
+    assert [[m.intent.name for m in wave] for wave in waves] == [["high", "volume"], ["play"]]
+
+
+# --- SERVER INTENTS ---
+@pytest.mark.parametrize("command, name, slots", [
+    ("stop", "stop", {}),
+    ("never mind", "stop", {}),
+    ("shut up please", "stop", {}),
+    ("stop the music", "pause", {"target": "music"}),
+    ("pause spotify", "pause", {"target": "spotify"}),
+    ("resume the music", "resume", {"target": "music"}),
+    ("start a new conversation", "new_conversation", {}),
+    ("set volume to 30", "volume_set", {"level": "30"}),
+    ("mute", "mute", {}),
+    ("unmute", "unmute", {}),
+    ("volume up", "volume_up", {}),
+    ("turn the volume down", "volume_down", {}),
+    ("next", "next", {}),
+    ("skip to the next song", "next", {}),
+    ("play simon and garfunkel on spotify", "spotify_play", {"song": "simon and garfunkel"}),
+    ("what is 3 plus 4", "math", {"expression": "3 plus 4"}),
+    ("open firefox", "launch_app", {"app": "firefox"}),
+])
+def test_server_intents(command, name, slots):
+    match = server.router.match(command)
+    assert match is not None and match.intent.name == name
+    assert {k: v for k, v in match.slots.items() if v is not None} == slots
+
+
+@pytest.mark.parametrize("command", [
+    "what's the capital of france",
+    "tell me a story about a dragon",
+])
+def test_questions_go_to_the_llm(command):
+    assert server.router.match(command) is None
+
+
+def test_server_compound_command():
+    matches = server.router.match_all("pause the music and set volume to 30")
+    assert [m.intent.name for m in matches] == ["pause", "volume_set"]
+    assert [[m.intent.name for m in wave] for wave in schedule(matches)] == [["pause", "volume_set"]]
+    matches = server.router.match_all("mute then unmute")
+    assert [[m.intent.name for m in wave] for wave in schedule(matches)] == [["mute"], ["unmute"]]
+
+
+@pytest.mark.parametrize("partial", ["pause", "next", "mute", "stop", "volume up", "skip to the next song",
+                                     "pause the music please"])
+def test_fast_path_commands_are_intents(partial):
+    assert server.FAST_PATH_COMMANDS.fullmatch(partial)
+    assert server.router.match(partial) is not None
+
+
+def test_server_compound_with_a_question_goes_to_the_llm():
+    assert server.router.match_all("mute and tell me a joke") == []
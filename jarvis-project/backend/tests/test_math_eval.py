@@ -0,0 +1,90 @@
+import re
+import time
+
+import pytest
+
+from math_eval import (
+    SPOKEN_MATH, DivisionByZero, MathError, MathSyntaxError, evaluate, format_number, spoken_number,
+)
+
+# Shaped like the math intent's pattern once the router has compiled it
+MATH = re.compile(r"(?=.*?(?:^(?:calculate|what is) (?P<expression>" + SPOKEN_MATH + r")$))")
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2 + 3 * 4", 14),
+    ("(2 + 3) * 4", 20),
+    ("twenty five times four", 100),
+    ("square root of 81", 9),
+    ("15 percent of 200", 30),
+    ("2 to the power of 10", 1024),
+    ("2 ^ 3 ^ 2", 512),
+    ("a hundred and five minus five", 100),
+    ("three point one four", 3.14),
+    ("3 point 5", 3.5),
+    ("three point 14", 3.14),
+    ("7 mod 3", 1),
+    ("10 / 4", 2.5),
+])
+def test_evaluate(text, expected):
+    assert evaluate(text) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("text", ["one two", "twenty twenty", "3 point 5 point 2", "hello", "", "2 +"])
+def test_not_an_expression(text):
+    with pytest.raises(MathSyntaxError):
+        evaluate(text)
+
+
+def test_division_by_zero():
+    with pytest.raises(DivisionByZero):
+        evaluate("5 divided by 0")
+    with pytest.raises(DivisionByZero):
+        evaluate("0 ^ -1")
+
+
+@pytest.mark.parametrize("text", ["9 ^ 9 ^ 9", "10 ^ 1000", "(" * 40 + "1" + ")" * 40, "1" * 30, "1 + " * 80 + "1"])
+def test_limits_fail_fast(text):
+    started = time.perf_counter()
+    with pytest.raises(MathError):
+        evaluate(text)
+    assert time.perf_counter() - started < 0.1
+
+
+def test_spoken_number():
+    assert spoken_number(["two", "hundred", "and", "five"]) == 205
+    assert spoken_number(["one", "million", "twenty", "three"]) == 1_000_023
+    with pytest.raises(MathSyntaxError):
+        spoken_number(["five", "six"])
+
+
+def test_format_number():
+    assert format_number(0.1 + 0.2) == "0.3"
+    assert format_number(4.0) == "4"
+    assert format_number(1e20) == "1 times ten to the power of 20"
+
+
+@pytest.mark.parametrize("command", [
+    "what is 2 plus 2", "calculate twenty five times four", "what is 3 point 5 times 2",
+])
+def test_pattern_claims_arithmetic(command):
+    assert MATH.match(command)
+
+
+@pytest.mark.parametrize("command", ["what is the point", "what is power", "what is the weather"])
+def test_pattern_leaves_questions(command):
+    assert not MATH.match(command)
+
+
+@pytest.mark.parametrize("tail", [
+    "1" * 22 + " q",
+    "1234567890 times 1234567890 divided by 1234567 in hex",
+    "one " * 40 + "q",
+    "1.1" * 30 + " q",
+])
+def test_pattern_near_miss_is_fast(tail):
+    # Used to backtrack exponentially in the length of the digit run
+    # (22 digits took ~1.7 s; kept that short so a regression fails instead of hanging)
+    started = time.perf_counter()
+    assert not MATH.match("what is " + tail)
+    assert time.perf_counter() - started < 0.05
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from response_cache import DEFAULT_TTL, SHORT_TTL, ResponseCache, cache_key, depends_on_context, ttl_for
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(path=str(tmp_path / "responses.json"), max_entries=3)
+
+
+def test_key_ignores_wake_word_filler_and_punctuation():
+    assert cache_key("Hey Jarvis, what's the capital of France?") == cache_key("what's the capital of france")
+    assert cache_key("can you please tell me who wrote Dune") == "who wrote dune"
+
+
+@pytest.mark.parametrize("command, ttl", [
+    ("what time is it", 0),
+    ("what's the date today", 0),
+    ("what's the weather like", SHORT_TTL),
+    ("who wrote dune", DEFAULT_TTL),
+    ("hey jarvis", 0),
+])
+def test_ttl(command, ttl):
+    assert ttl_for(command) == ttl
+
+
+def test_hit_after_put(cache):
+    assert cache.get("who wrote dune") is None
+    assert cache.put("Who wrote Dune?", "Frank Herbert.")
+    assert cache.get("hey jarvis who wrote dune") == "Frank Herbert."
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_time_questions_are_never_stored(cache):
+    assert not cache.put("what time is it", "Ten past three.")
+    assert cache.get("what time is it") is None
+    assert cache.stats()["skipped"] == 1
+
+
+def test_expired_entries_miss(cache, monkeypatch):
+    cache.put("what's the weather like", "Sunny.")
+    later = time.time() + SHORT_TTL + 1
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert cache.get("what's the weather like") is None
+
+
+def test_least_recently_used_is_evicted(cache):
+    for name in ("a", "b", "c"):
+        cache.put(f"who is {name}", name)
+    cache.get("who is a")  # a is now the most recent
+    cache.put("who is d", "d")
+    assert cache.get("who is b") is None
+    assert cache.get("who is a") == "a"
+
+
+def test_survives_restart(tmp_path):
+    path = str(tmp_path / "responses.json")
+    ResponseCache(path=path).put("who wrote dune", "Frank Herbert.")
+    assert ResponseCache(path=path).get("who wrote dune") == "Frank Herbert."
+
+
+def test_clear(cache):
+    cache.put("who wrote dune", "Frank Herbert.")
+    cache.clear()
+    assert cache.get("who wrote dune") is None
+
+
+@pytest.mark.parametrize("command", [
+    "why", "and what about spain", "how about tomorrow", "tell me more",
+    "how old is he", "what's its population", "say that again",
+])
+def test_follow_ups_depend_on_context(command):
+    assert depends_on_context(command)
+
+
+@pytest.mark.parametrize("command", [
+    "who wrote dune", "what's the capital of france", "how far is the moon", "hey jarvis what is a black hole",
+])
+def test_standalone_questions_do_not(command):
+    assert not depends_on_context(command)
@@ -0,0 +1,92 @@
+import queue
+import time
+
+import pytest
+
+from status_bus import StatusBus
+
+WINDOW = 0.2
+
+
+@pytest.fixture
+def bus():
+    return StatusBus(coalesce_window=WINDOW)
+
+
+@pytest.fixture
+def events(bus):
+    sent = queue.Queue()
+    bus.add_sink(sent.put)
+    return sent
+
+
+def drain(events, wait=WINDOW * 2):
+    time.sleep(wait)
+    out = []
+    while not events.empty():
+        out.append(events.get_nowait())
+    return out
+
+
+def test_leading_edge_goes_out_at_once(bus, events):
+    started = time.monotonic()
+    bus.publish("LISTENING")
+    event = events.get(timeout=1)
+    assert time.monotonic() - started < WINDOW / 2
+    assert event["status"] == "LISTENING" and event["seq"] == 1
+
+
+def test_burst_is_coalesced_to_the_latest(bus, events):
+    bus.publish("LISTENING")
+    events.get(timeout=1)
+    bus.publish("THINKING")
+    bus.publish("SPEAKING", text="hi")
+    bus.publish("SPEAKING", text="hi there")
+    assert [(e["status"], e.get("text")) for e in drain(events)] == [("SPEAKING", "hi there")]
+    assert bus.stats()["coalesced"] == 2
+
+
+def test_flapping_back_sends_nothing(bus, events):
+    bus.publish("LISTENING")
+    events.get(timeout=1)
+    bus.publish("HIDDEN")
+    bus.publish("LISTENING")
+    assert drain(events) == []
+    assert bus.snapshot()["status"] == "LISTENING"
+
+
+def test_sequence_numbers_increase(bus, events):
+    for status in ("LISTENING", "THINKING", "SPEAKING"):
+        bus.publish(status)
+        events.get(timeout=1)
+    assert bus.snapshot()["seq"] == 3
+    assert bus.stats() == {"seq": 3, "published": 3, "coalesced": 0}
+
+
+def test_since_replays_missed_events(bus, events):
+    for status in ("LISTENING", "THINKING", "SPEAKING"):
+        bus.publish(status)
+        events.get(timeout=1)
+    assert [e["status"] for e in bus.since(1)] == ["THINKING", "SPEAKING"]
+    assert bus.since(3) == []
+
+
+def test_since_resyncs_when_history_is_gone():
+    bus = StatusBus(coalesce_window=0.01, history=2)
+    sent = queue.Queue()
+    bus.add_sink(sent.put)
+    for status in ("LISTENING", "THINKING", "SPEAKING", "HIDDEN"):
+        bus.publish(status)
+        sent.get(timeout=1)
+    (event,) = bus.since(0)
+    assert event["resync"] and event["status"] == "HIDDEN" and event["seq"] == 4
+
+
+def test_failing_sink_does_not_stop_the_bus(bus, events):
+    def broken(event):
+        raise RuntimeError("socket closed")
+    bus.add_sink(broken)
+    bus.publish("LISTENING")
+    events.get(timeout=1)
+    bus.publish("THINKING")
+    assert events.get(timeout=1)["status"] == "THINKING"
@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+
+from task_runner import CancelToken, TaskCancelled, TaskRunner, current_token, use_token
+
+
+@pytest.fixture
+def runner():
+    runner = TaskRunner(max_workers=1, max_pending=1, stop_event=threading.Event())
+    yield runner
+    runner.shutdown()
+
+
+def blocker():
+    """A task body that runs until cancelled, and a gate that opens once it has started."""
+    started = threading.Event()
+
+    def fn(command):
+        started.set()
+        current_token().sleep(5)
+    return fn, started
+
+
+def test_runs_the_command(runner):
+    seen = []
+    task = runner.submit(seen.append, "hello")
+    task.future.result(timeout=1)
+    assert seen == ["hello"]
+    assert not runner.busy()
+
+
+def test_refuses_work_when_saturated(runner):
+    fn, started = blocker()
+    first = runner.submit(fn, "one")
+    assert started.wait(1)
+    assert runner.submit(fn, "two") is not None
+    assert runner.submit(fn, "three") is None
+    runner.cancel_all()
+    first.future.result(timeout=1)
+
+
+def test_cancel_all_wakes_sleepers_and_cuts_speech():
+    cut = []
+    runner = TaskRunner(max_workers=1, max_pending=0, stop_event=threading.Event(), on_cancel=lambda: cut.append(1))
+    fn, started = blocker()
+    task = runner.submit(fn, "long")
+    assert started.wait(1)
+    assert runner.cancel_all() == 1
+    task.future.result(timeout=1)
+    assert task.token.cancelled
+    assert runner.stop_event.is_set()
+    assert cut == [1]
+    runner.shutdown()
+
+
+def test_queued_task_never_runs_once_cancelled(runner):
+    fn, started = blocker()
+    ran = []
+    running = runner.submit(fn, "long")
+    assert started.wait(1)
+    queued = runner.submit(ran.append, "queued")
+    runner.cancel_all()
+    running.future.result(timeout=1)
+    queued.future.result(timeout=1)
+    assert ran == []
+
+
+def test_task_cancelled_is_swallowed(runner):
+    def fn(command):
+        current_token().cancel()
+        current_token().check()
+        raise AssertionError("check() should have raised")
+
+    task = runner.submit(fn, "bail out")
+    assert task.future.result(timeout=1) is None
+    assert not runner.busy()
+
+
+def test_on_idle_fires_when_the_last_task_ends():
+    idle = threading.Event()
+    runner = TaskRunner(on_idle=idle.set)
+    runner.submit(lambda command: None, "quick")
+    assert idle.wait(1)
+    runner.shutdown()
+
+
+def test_token_outside_a_task_is_never_cancelled():
+    assert not current_token().cancelled
+    assert current_token().sleep(0) is False
+
+
+def test_use_token_hands_the_token_to_helper_threads():
+    token = CancelToken()
+    with use_token(token):
+        assert current_token() is token
+        token.cancel()
+        assert current_token().sleep(1) is True
+        with pytest.raises(TaskCancelled):
+            current_token().check()
+    assert current_token() is not token
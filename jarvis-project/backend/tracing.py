@@ -0,0 +1,181 @@
+"""
+Per-request latency tracing.
+
+Each voice request gets a Trace that collects spans as it moves through the
+pipeline (wake, capture, stt, intent, action, tts_synth, playback_start,
+...). The current trace lives in a thread-local, so code deep in the stack
+just calls `span("stage")` without passing it around; hand-offs to other
+threads carry it explicitly with `use(trace)` or by storing it on the work
+item. Finished traces go to a ring buffer, and every span also feeds a
+per-stage histogram for the /metrics route.
+"""
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+_local = threading.local()
+
+
+class Trace:
+    def __init__(self, trace_id, tracer, label=""):
+        self.id = trace_id
+        self.tracer = tracer
+        self.label = label
+        self.started = time.perf_counter()
+        self.wall_started = time.time()
+        self.spans = []  # (stage, offset from start, seconds)
+        self.finished = False
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds, started=None):
+        offset = (started if started is not None else time.perf_counter() - seconds) - self.started
+        with self._lock:
+            self.spans.append((stage, round(offset, 4), round(seconds, 4)))
+        self.tracer.observe(stage, seconds)
+
+    @contextmanager
+    def span(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started, started)
+
+    def finish(self):
+        with self._lock:
+            if self.finished:
+                return
+            self.finished = True
+        self.record("total", time.perf_counter() - self.started, self.started)
+        self.tracer._finished(self)
+
+    def summary(self):
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "id": self.id,
+            "label": self.label,
+            "started": self.wall_started,
+            "spans": [{"stage": s, "at": at, "seconds": d} for s, at, d in spans],
+        }
+
+
+class Histogram:
+    def __init__(self, samples=500):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=samples)
+
+    def observe(self, seconds):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def percentile(self, p):
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(p / 100.0 * len(ordered)))]
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "mean": round(self.sum / self.count, 4) if self.count else None,
+            "p50": self._round(self.percentile(50)),
+            "p90": self._round(self.percentile(90)),
+            "p99": self._round(self.percentile(99)),
+            "max": round(self.max, 4),
+            "buckets": {("+Inf" if b == float("inf") else str(b)): c for b, c in zip(BUCKETS, self.counts)},
+        }
+
+    @staticmethod
+    def _round(value):
+        return None if value is None else round(value, 4)
+
+
+class Tracer:
+    def __init__(self, capacity=200):
+        self._traces = deque(maxlen=capacity)
+        self._histograms = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def start(self, label=""):
+        return Trace(next(self._ids), self, label)
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def on_finish(self, listener):
+        """`listener(summary)` is called for every finished trace."""
+        self._listeners.append(listener)
+
+    def _finished(self, trace):
+        summary = trace.summary()
+        with self._lock:
+            self._traces.append(summary)
+        for listener in list(self._listeners):
+            try:
+                listener(summary)
+            except Exception as e:
+                print(f"(Trace listener error: {e})")
+
+    def snapshot(self, recent=20):
+        with self._lock:
+            return {
+                "stages": {name: h.as_dict() for name, h in sorted(self._histograms.items())},
+                "recent": list(self._traces)[-recent:],
+            }
+
+
+# --- THREAD-LOCAL CURRENT TRACE ---
+def current_trace():
+    return getattr(_local, "trace", None)
+
+
+def set_current(trace):
+    _local.trace = trace
+
+
+@contextmanager
+def use(trace):
+    """Make `trace` current on this thread for the duration of the block."""
+    previous = current_trace()
+    _local.trace = trace
+    try:
+        yield trace
+    finally:
+        _local.trace = previous
+
+
+@contextmanager
+def span(stage):
+    """Time a block into the current trace; a no-op when there is none."""
+    trace = current_trace()
+    if trace is None:
+        yield
+        return
+    with trace.span(stage):
+        yield
+
+
+def record(stage, seconds):
+    trace = current_trace()
+    if trace is not None:
+        trace.record(stage, seconds)
@@ -0,0 +1,189 @@
+"""
+Text-to-speech backends.
+
+Every backend turns one piece of text into a playable clip (MP3 or WAV
+bytes). The AudioEngine tries them in order, so a cloud voice can be backed
+by a local engine that keeps working with no network.
+"""
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import time
+import wave
+
+from gtts import gTTS
+
+
+# --- SENTENCE SPLITTING ---
+_SENTENCE_END = re.compile(r'(?<=[.!?;:])\s+|\n+')
+
+def split_sentences(text, min_length=20):
+    """Split a reply into speakable chunks, gluing tiny fragments onto the next one."""
+    chunks = []
+    pending = ""
+    for part in _SENTENCE_END.split(text.strip()):
+        part = part.strip()
+        if not part:
+            continue
+        pending = f"{pending} {part}".strip() if pending else part
+        if len(pending) >= min_length:
+            chunks.append(pending)
+            pending = ""
+    if pending:
+        if chunks and len(pending) < min_length:
+            chunks[-1] = f"{chunks[-1]} {pending}"
+        else:
+            chunks.append(pending)
+    return chunks
+
+
+# --- BACKENDS ---
+class TTSBackend:
+    """Base class. `cache_tag` keeps clips from different voices apart in the TTSCache."""
+
+    name = "base"
+
+    def __init__(self, lang='en', cooldown=60.0):
+        self.lang = lang
+        self.cooldown = cooldown
+        self._down_until = 0.0
+
+    @property
+    def cache_tag(self):
+        return self.name
+
+    def available(self):
+        return time.monotonic() >= self._down_until
+
+    def mark_failed(self):
+        """Skip this backend for a while instead of paying its timeout on every sentence."""
+        self._down_until = time.monotonic() + self.cooldown
+
+    def synthesize(self, text):
+        raise NotImplementedError
+
+
+class GTTSBackend(TTSBackend):
+    name = "gtts"
+
+    def __init__(self, lang='en', tld='co.uk', timeout=4.0, cooldown=60.0):
+        super().__init__(lang, cooldown)
+        self.tld = tld
+        self.timeout = timeout
+
+    @property
+    def cache_tag(self):
+        # Matches the (text, lang, tld) keys written before backends existed
+        return self.tld
+
+    def synthesize(self, text):
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=self.lang, tld=self.tld, timeout=self.timeout).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class EspeakBackend(TTSBackend):
+    """espeak-ng (or classic espeak) writing a WAV to stdout."""
+
+    name = "espeak"
+
+    def __init__(self, voice='en-gb', speed=165, lang='en'):
+        super().__init__(lang, cooldown=5.0)
+        self.voice = voice
+        self.speed = speed
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak")
+
+    @property
+    def cache_tag(self):
+        return f"espeak:{self.voice}:{self.speed}"
+
+    def available(self):
+        return self.binary is not None and super().available()
+
+    def synthesize(self, text):
+        result = subprocess.run(
+            [self.binary, "-v", self.voice, "-s", str(self.speed), "--stdout", text],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        return result.stdout
+
+
+class PiperBackend(TTSBackend):
+    """Piper neural voice. Needs the `piper` binary and an .onnx voice model."""
+
+    name = "piper"
+
+    def __init__(self, model_path, lang='en'):
+        super().__init__(lang, cooldown=5.0)
+        self.model_path = model_path
+        self.binary = shutil.which("piper")
+        self.sample_rate = self._read_sample_rate(model_path)
+
+    @property
+    def cache_tag(self):
+        return f"piper:{os.path.basename(self.model_path)}"
+
+    def available(self):
+        return self.binary is not None and os.path.exists(self.model_path) and super().available()
+
+    def synthesize(self, text):
+        result = subprocess.run(
+            [self.binary, "--model", self.model_path, "--output-raw"],
+            input=text.encode("utf-8"),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        # Piper streams raw 16-bit mono PCM; wrap it so pygame can decode it
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(result.stdout)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _read_sample_rate(model_path):
+        try:
+            with open(f"{model_path}.json") as f:
+                return json.load(f)["audio"]["sample_rate"]
+        except Exception:
+            return 22050
+
+
+def local_backend():
+    """Best local engine on this machine, or None."""
+    model = os.environ.get("JARVIS_PIPER_MODEL")
+    if model:
+        piper = PiperBackend(model)
+        if piper.available():
+            return piper
+    espeak = EspeakBackend()
+    if espeak.available():
+        return espeak
+    return None
+
+
+def build_backends(mode='auto', lang='en', tld='co.uk'):
+    """
+    'gtts'  -> cloud voice only (old behaviour)
+    'local' -> local engine only, never touches the network
+    'auto'  -> cloud voice first, local engine when the network is down
+    """
+    backends = []
+    if mode in ('gtts', 'auto'):
+        backends.append(GTTSBackend(lang=lang, tld=tld))
+    if mode in ('local', 'auto'):
+        local = local_backend()
+        if local:
+            backends.append(local)
+        elif mode == 'local':
+            print("⚠️ No local TTS engine found (install espeak-ng or piper). Falling back to gTTS.")
+            backends.append(GTTSBackend(lang=lang, tld=tld))
+    return backends
@@ -0,0 +1,167 @@
+"""
+On-disk cache of synthesized speech.
+
+Clips are content-addressed by (text, lang, tld) and stored as one file per
+phrase, named after the clip's real format (gTTS gives MP3, the local
+voices WAV); local voices pass their own tag in place of the gTTS tld. The
+total size is capped and the least recently played clips are evicted first.
+Recency survives restarts through the files' modification times.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+FORMATS = ("mp3", "wav")
+
+
+def audio_format(data):
+    """File extension for a synthesized clip: WAV has a RIFF header, gTTS gives MP3."""
+    return "wav" if data[:4] == b"RIFF" else "mp3"
+
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "jarvis", "tts")
+
+
+class TTSCache:
+    def __init__(self, directory=None, max_bytes=50 * 1024 * 1024):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> size in bytes, oldest first
+        self._formats = {}  # key -> file extension
+        self._total = 0
+        self.hits = 0
+        self.misses = 0
+        self._load_index()
+
+    # --- KEYS ---
+    @staticmethod
+    def make_key(text, lang, tld):
+        normalized = " ".join(text.split())
+        raw = f"{lang}\x00{tld}\x00{normalized}".encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()
+
+    def _path(self, key, fmt=None):
+        return os.path.join(self.directory, f"{key}.{fmt or self._formats.get(key, FORMATS[0])}")
+
+    # --- PUBLIC API ---
+    def get(self, text, lang='en', tld='co.uk'):
+        key = self.make_key(text, lang, tld)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            try:
+                with open(self._path(key), "rb") as f:
+                    data = f.read()
+            except OSError:
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+        return data
+
+    def put(self, text, data, lang='en', tld='co.uk'):
+        if not data or len(data) > self.max_bytes:
+            return
+        key = self.make_key(text, lang, tld)
+        fmt = audio_format(data)
+        path = self._path(key, fmt)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with self._lock:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"(TTS Cache Error: {e})")
+                if os.path.exists(tmp_path): os.remove(tmp_path)
+                return
+            if key in self._entries:
+                if self._formats.get(key) != fmt:
+                    self._drop(key)  # same phrase, other format: remove the old file
+                else:
+                    self._total -= self._entries.pop(key)
+            self._entries[key] = len(data)
+            self._formats[key] = fmt
+            self._total += len(data)
+            self._evict()
+
+    def contains(self, text, lang='en', tld='co.uk'):
+        with self._lock:
+            return self.make_key(text, lang, tld) in self._entries
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    # --- INTERNALS ---
+    def _load_index(self):
+        if not os.path.isdir(self.directory):
+            return
+        found = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".tmp"):
+                # Leftover from a crash mid-write
+                try: os.remove(path)
+                except OSError: pass
+                continue
+            key, _, fmt = name.rpartition(".")
+            if fmt not in FORMATS:
+                continue
+            try:
+                if fmt == "mp3":
+                    fmt = self._fix_extension(path, key)
+                st = os.stat(self._path(key, fmt))
+            except OSError:
+                continue
+            found.append((st.st_mtime, key, fmt, st.st_size))
+
+        for _, key, fmt, size in sorted(found):
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = size
+            self._formats[key] = fmt
+            self._total += size
+        self._evict()
+
+    def _fix_extension(self, path, key):
+        """Older versions stored every clip as .mp3; move WAV clips to .wav."""
+        with open(path, "rb") as f:
+            fmt = audio_format(f.read(4))
+        if fmt != "mp3":
+            os.replace(path, self._path(key, fmt))
+        return fmt
+
+    def _evict(self):
+        while self._total > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._drop(key)
+
+    def _drop(self, key):
+        self._total -= self._entries.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+        self._formats.pop(key, None)
@@ -0,0 +1,258 @@
+"""
+Screen reading for the assistant.
+
+A few things keep OCR off the critical path:
+
+  * Regions of interest: callers pass boxes (a window's title bar, the
+    newest window's bounds) and only those pixels are grabbed and read.
+    Regions are tried in order and the scan stops at the first keyword hit.
+  * Downscaling: large captures are shrunk to `max_width` before OCR, so a
+    4K screen costs about as much as a 1080p one.
+  * A persistent Tesseract: with tesserocr installed the engine is loaded
+    once and reused in-process. Otherwise we fall back to pytesseract,
+    which forks a `tesseract` process per call.
+  * A frame cache for full-screen scans: the frame is cut into tiles, each
+    tile is hashed, and only tiles whose pixels changed since the last scan
+    are OCR'd again. Per-tile text is kept as a searchable index.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pyautogui
+import pytesseract
+from PIL import Image, ImageOps
+
+TITLE_BAR_HEIGHT = 48
+
+
+def title_bar(bounds, height=TITLE_BAR_HEIGHT):
+    """Strip at the top of a window where its title is drawn (CSD apps draw it inside)."""
+    x, y, w, h = bounds
+    return (x, max(0, y - height // 2), w, min(h, height))
+
+
+# --- OCR ENGINES ---
+class _TesserocrEngine:
+    name = "tesserocr"
+
+    def __init__(self, lang):
+        from tesserocr import PSM, PyTessBaseAPI
+
+        self._psm = PSM
+        self._api = PyTessBaseAPI(lang=lang, psm=PSM.SPARSE_TEXT)
+        self._lock = threading.Lock()  # one TessBaseAPI is not thread safe
+
+    def read(self, image, single_line=False):
+        with self._lock:
+            self._api.SetPageSegMode(self._psm.SINGLE_LINE if single_line else self._psm.SPARSE_TEXT)
+            self._api.SetImage(image)
+            return self._api.GetUTF8Text()
+
+
+class _PytesseractEngine:
+    name = "pytesseract"
+
+    def __init__(self, lang):
+        self.lang = lang
+
+    def read(self, image, single_line=False):
+        config = "--psm 7" if single_line else "--psm 11"
+        return pytesseract.image_to_string(image, lang=self.lang, config=config)
+
+
+def _build_engine(lang):
+    try:
+        return _TesserocrEngine(lang)
+    except Exception:
+        return _PytesseractEngine(lang)
+
+
+# --- FRAME CACHE ---
+class Tile:
+    def __init__(self, box, digest, text):
+        self.box = box          # (left, top, right, bottom) in prepared-image pixels
+        self.digest = digest
+        self.text = text
+
+
+class FrameCache:
+    """Tile-level OCR cache for full-screen scans."""
+
+    def __init__(self, reader, tile_size=(480, 270), overlap=32, max_digests=1024):
+        self.reader = reader
+        self.tile_size = tile_size
+        # Tiles overlap so a word on a seam is whole in at least one of them
+        self.overlap = overlap
+        self.max_digests = max_digests
+        self.scale = 1.0
+        self._tiles = {}                  # (col, row) -> Tile
+        self._by_digest = OrderedDict()   # digest -> text, shared across positions
+        self._lock = threading.Lock()
+        self.tiles_read = 0
+        self.tiles_reused = 0
+
+    def _boxes(self, width, height):
+        tw, th = self.tile_size
+        for row, top in enumerate(range(0, height, th)):
+            for col, left in enumerate(range(0, width, tw)):
+                yield (col, row), (
+                    max(0, left - self.overlap),
+                    max(0, top - self.overlap),
+                    min(width, left + tw + self.overlap),
+                    min(height, top + th + self.overlap),
+                )
+
+    def scan(self, image, scale=1.0, keyword=None):
+        """
+        Refresh the index from a prepared frame. With `keyword`, stop as soon
+        as any tile (fresh or cached) contains it and return True.
+        """
+        with self._lock:
+            self.scale = scale
+            seen = set()
+            changed = []
+            for pos, box in self._boxes(image.width, image.height):
+                seen.add(pos)
+                tile_image = image.crop(box)
+                digest = hashlib.blake2b(tile_image.tobytes(), digest_size=16).digest()
+                cached = self._tiles.get(pos)
+                if cached and cached.digest == digest and cached.box == box:
+                    self.tiles_reused += 1
+                    continue
+                if digest in self._by_digest:
+                    self._by_digest.move_to_end(digest)
+                    self._tiles[pos] = Tile(box, digest, self._by_digest[digest])
+                    self.tiles_reused += 1
+                    continue
+                changed.append((pos, box, digest, tile_image))
+
+            # Tiles that fell off a smaller frame (resolution change)
+            for pos in list(self._tiles):
+                if pos not in seen:
+                    del self._tiles[pos]
+
+            # Changed tiles still hold what used to be there: forget it before
+            # anything can return, so no later scan or search() sees it either.
+            # Tiles not read by the time we stop are read on the next scan.
+            for pos, _, _, _ in changed:
+                self._tiles.pop(pos, None)
+            if keyword and self._search_locked(keyword):
+                return True
+
+            for pos, box, digest, tile_image in changed:
+                text = self.reader.engine.read(tile_image).lower()
+                self.tiles_read += 1
+                self._tiles[pos] = Tile(box, digest, text)
+                self._remember(digest, text)
+                if keyword and keyword in text:
+                    return True
+            return False
+
+    def _remember(self, digest, text):
+        self._by_digest[digest] = text
+        while len(self._by_digest) > self.max_digests:
+            self._by_digest.popitem(last=False)
+
+    def _search_locked(self, keyword):
+        return [self._to_screen(tile.box) for tile in self._tiles.values() if keyword in tile.text]
+
+    def _to_screen(self, box):
+        left, top, right, bottom = (int(v / self.scale) for v in box)
+        return (left, top, right - left, bottom - top)
+
+    # --- INDEX ---
+    def search(self, keyword):
+        """Screen regions (x, y, w, h) of the tiles whose text contains `keyword`."""
+        with self._lock:
+            return self._search_locked(keyword.lower())
+
+    def text(self):
+        """Everything currently on screen, tile by tile in reading order."""
+        with self._lock:
+            ordered = sorted(self._tiles.items(), key=lambda item: (item[0][1], item[0][0]))
+            return "\n".join(tile.text.strip() for _, tile in ordered if tile.text.strip())
+
+    def stats(self):
+        with self._lock:
+            return {"tiles": len(self._tiles), "read": self.tiles_read, "reused": self.tiles_reused}
+
+
+class ScreenReader:
+    def __init__(self, max_width=1920, lang="eng", invert=True):
+        self.max_width = max_width
+        self.lang = lang
+        # The desktop uses a dark theme; Tesseract prefers dark text on light
+        self.invert = invert
+        self._engine = None
+        self._lock = threading.Lock()
+        self.frames = FrameCache(self)
+
+    @property
+    def engine(self):
+        with self._lock:
+            if self._engine is None:
+                self._engine = _build_engine(self.lang)
+                hint = " (install backend[ocr] for a persistent engine)" if self._engine.name == "pytesseract" else ""
+                print(f"👁️ OCR engine: {self._engine.name}{hint}")
+            return self._engine
+
+    # --- CAPTURE ---
+    def grab(self, region=None):
+        """Screenshot of `region` (x, y, w, h) or the full screen."""
+        if region is not None:
+            x, y, w, h = (int(v) for v in region)
+            if w <= 0 or h <= 0:
+                return None
+            return pyautogui.screenshot(region=(x, y, w, h))
+        return pyautogui.screenshot()
+
+    def prepare(self, image):
+        return self._prepare(image)[0]
+
+    def _prepare(self, image):
+        """Grayscale, downscaled, inverted copy of `image`, plus the scale factor used."""
+        image = image.convert('L')
+        ratio = 1.0
+        if image.width > self.max_width:
+            ratio = self.max_width / image.width
+            image = image.resize((self.max_width, max(1, int(image.height * ratio))), Image.BILINEAR)
+        if self.invert:
+            image = ImageOps.invert(image)
+        return image, ratio
+
+    # --- PUBLIC API ---
+    def read_text(self, region=None, single_line=False):
+        image = self.grab(region)
+        if image is None:
+            return ""
+        return self.engine.read(self.prepare(image), single_line=single_line).lower()
+
+    def scan_screen(self, keyword=None):
+        """Full-screen pass through the frame cache. Only changed tiles are OCR'd."""
+        prepared, ratio = self._prepare(self.grab())
+        return self.frames.scan(prepared, scale=ratio, keyword=keyword.lower() if keyword else None)
+
+    def screen_text(self):
+        """Current on-screen text, for "what's on my screen" style questions."""
+        self.scan_screen()
+        return self.frames.text()
+
+    def find_text(self, keyword, regions=None):
+        """
+        True as soon as `keyword` shows up in one of `regions`, tried in order.
+        A None entry (or regions=None) means the whole screen.
+        """
+        keyword = keyword.lower()
+        for region in (regions or [None]):
+            try:
+                if region is None:
+                    if self.scan_screen(keyword):
+                        return True
+                    continue
+                single_line = region is not None and region[3] <= TITLE_BAR_HEIGHT
+                if keyword in self.read_text(region, single_line=single_line):
+                    return True
+            except Exception as e:
+                print(f"Vision Error: {e}")
+        return False
@@ -0,0 +1,153 @@
+"""
+Local wake-word detectors.
+
+Each detector is fed one small microphone frame at a time and answers
+"did the wake word just end?". The preferred detectors run fully offline:
+
+  * openWakeWord ships a pretrained "hey_jarvis" model
+  * Vosk with a two-entry grammar ("hey jarvis" / [unk])
+
+If neither is installed we fall back to a speech gate: only frames the mic
+stream classifies as speech are grouped into phrases, and only those phrases
+go to the cloud recognizer. Silence and steady background noise never leave
+the machine.
+"""
+import os
+
+from constants import WAKE_PHRASE
+from mic_stream import FRAME_SECONDS, SAMPLE_RATE
+
+
+class WakeWordDetector:
+    name = "base"
+
+    def __init__(self):
+        # Words heard after the wake phrase in the same breath, when the
+        # detector happens to know them (only the speech gate does)
+        self.transcript = None
+
+    def process(self, frame, is_speech):
+        raise NotImplementedError
+
+    def reset(self):
+        self.transcript = None
+
+
+class OpenWakeWordDetector(WakeWordDetector):
+    name = "openwakeword"
+
+    def __init__(self, model_name="hey_jarvis", threshold=0.5):
+        super().__init__()
+        import numpy as np
+        from openwakeword.model import Model
+
+        self._np = np
+        self.model_name = model_name
+        self.threshold = threshold
+        self.model = Model(wakeword_models=[model_name])
+
+    def process(self, frame, is_speech):
+        scores = self.model.predict(self._np.frombuffer(frame, dtype=self._np.int16))
+        return any(score >= self.threshold for name, score in scores.items() if self.model_name in name)
+
+    def reset(self):
+        super().reset()
+        self.model.reset()
+
+
+class VoskWakeWordDetector(WakeWordDetector):
+    name = "vosk"
+
+    def __init__(self, model):
+        super().__init__()
+        import json
+        from vosk import KaldiRecognizer
+
+        self._json = json
+        self._model = model
+        self._make = lambda: KaldiRecognizer(self._model, SAMPLE_RATE, json.dumps([WAKE_PHRASE, "[unk]"]))
+        self.recognizer = self._make()
+
+    def process(self, frame, is_speech):
+        if self.recognizer.AcceptWaveform(frame):
+            text = self._json.loads(self.recognizer.Result()).get("text", "")
+        else:
+            text = self._json.loads(self.recognizer.PartialResult()).get("partial", "")
+        if WAKE_PHRASE in text:
+            self.recognizer.Reset()
+            return True
+        return False
+
+    def reset(self):
+        super().reset()
+        self.recognizer = self._make()
+
+
+class SpeechGateDetector(WakeWordDetector):
+    """Fallback: groups speech frames into phrases and asks `recognize` only about those."""
+
+    name = "speech-gate"
+
+    def __init__(self, recognize, pause_seconds=0.8, max_seconds=8.0):
+        super().__init__()
+        self.recognize = recognize
+        self.pause_seconds = pause_seconds
+        self.max_seconds = max_seconds
+        self._frames = []
+        self._silence = 0.0
+
+    def process(self, frame, is_speech):
+        if not self._frames and not is_speech:
+            return False
+        self._frames.append(frame)
+        self._silence = 0.0 if is_speech else self._silence + FRAME_SECONDS
+        duration = len(self._frames) * FRAME_SECONDS
+        if self._silence < self.pause_seconds and duration < self.max_seconds:
+            return False
+
+        audio = b"".join(self._frames)
+        self._frames = []
+        self._silence = 0.0
+        try:
+            text = self.recognize(audio)
+        except Exception:
+            return False
+        if WAKE_PHRASE in text:
+            self.transcript = text
+            return True
+        return False
+
+    def reset(self):
+        super().reset()
+        self._frames = []
+        self._silence = 0.0
+
+
+def build_detector(recognize, vosk_model=None):
+    """Best detector available on this machine. Reuses the STT's Vosk model if given."""
+    try:
+        detector = OpenWakeWordDetector()
+        print("🦻 Wake word: openWakeWord (local)")
+        return detector
+    except Exception:
+        pass
+
+    model_path = os.environ.get("JARVIS_VOSK_MODEL")
+    if vosk_model is None and model_path and os.path.isdir(model_path):
+        try:
+            from vosk import Model, SetLogLevel
+            SetLogLevel(-1)
+            vosk_model = Model(model_path)
+        except Exception as e:
+            print(f"⚠️ Vosk wake word unavailable: {e}")
+
+    if vosk_model is not None:
+        try:
+            detector = VoskWakeWordDetector(vosk_model)
+            print("🦻 Wake word: Vosk grammar (local)")
+            return detector
+        except Exception as e:
+            print(f"⚠️ Vosk wake word unavailable: {e}")
+
+    print("🦻 Wake word: speech gate + cloud check (install backend[wakeword] for fully local detection)")
+    return SpeechGateDetector(recognize)
@@ -0,0 +1,154 @@
+"""
+HTTP + Socket.IO server for the orb.
+
+Two ways to run, same surface (`emit`, `on`, `run`):
+  - asgi: uvicorn serving a python-socketio AsyncServer, with the Flask app
+    mounted behind it for the plain HTTP routes. Used when uvicorn is
+    installed; this is the one meant for always-on use.
+  - threading: Flask-SocketIO on the Werkzeug server, as before. Needs
+    nothing beyond the base dependencies.
+JARVIS_SERVER=asgi|threading forces one; the default picks asgi if it can.
+`emit()` is safe to call from any thread in both modes.
+
+The desktop window itself does not need any of this (see webview_bridge.py);
+`Broadcast` puts both behind one `emit`/`on` when remote clients are served too,
+and `MetricsServer` keeps /metrics available when there is no web server.
+"""
+import asyncio
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _asgi_available():
+    try:
+        import uvicorn  # noqa: F401
+        import socketio  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _wsgi_adapter(app):
+    try:
+        from a2wsgi import WSGIMiddleware
+    except ImportError:
+        from uvicorn.middleware.wsgi import WSGIMiddleware
+    return WSGIMiddleware(app)
+
+
+class WebServer:
+    def __init__(self, app, mode=None):
+        self.app = app
+        mode = mode or os.environ.get("JARVIS_SERVER", "auto")
+        if mode == "auto":
+            mode = "asgi" if _asgi_available() else "threading"
+        self.mode = mode
+        self._loop = None
+
+        if mode == "asgi":
+            import socketio
+            self.sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins="*")
+            self.asgi_app = socketio.ASGIApp(self.sio, other_asgi_app=_wsgi_adapter(app))
+        else:
+            from flask_socketio import SocketIO
+            self.sio = SocketIO(app, cors_allowed_origins="*", async_mode="threading")
+
+    # --- PUBLIC API ---
+    def on(self, event, handler):
+        """Register `handler(sid, data)` for a client event ('connect' gets data=None)."""
+        if self.mode == "asgi":
+            if event == "connect":
+                async def on_connect(sid, environ, auth=None):
+                    handler(sid, None)
+                self.sio.on("connect", on_connect)
+            else:
+                async def on_event(sid, data=None):
+                    handler(sid, data)
+                self.sio.on(event, on_event)
+        else:
+            from flask import request
+
+            def on_event(data=None, *args):
+                handler(request.sid, None if event == "connect" else data)
+            self.sio.on_event(event, on_event)
+
+    def emit(self, event, data, to=None):
+        if self.mode == "asgi":
+            if self._loop is None:
+                return  # nobody can be connected yet
+            asyncio.run_coroutine_threadsafe(self.sio.emit(event, data, to=to), self._loop)
+        else:
+            self.sio.emit(event, data, to=to)
+
+    def run(self, port, host="127.0.0.1"):
+        """Serve until the process exits. Blocks."""
+        hint = " (install backend[asgi] for uvicorn)" if self.mode != "asgi" else ""
+        print(f"🌐 Web server: {self.mode} on {host}:{port}{hint}")
+        if self.mode == "asgi":
+            import uvicorn
+            config = uvicorn.Config(self.asgi_app, host=host, port=port, log_level="warning")
+            server = uvicorn.Server(config)
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(server.serve())
+        else:
+            # ADD allow_unsafe_werkzeug=True TO FIX THE CRASH
+            self.sio.run(self.app, host=host, port=port, debug=False, use_reloader=False,
+                         allow_unsafe_werkzeug=True)
+
+
+class Broadcast:
+    """One `emit`/`on` over several transports. Sids are (transport, sid) pairs."""
+
+    def __init__(self, transports=()):
+        self.transports = [t for t in transports if t is not None]
+
+    def on(self, event, handler):
+        for transport in self.transports:
+            transport.on(event, lambda sid, data, transport=transport: handler((transport, sid), data))
+
+    def emit(self, event, data, to=None):
+        if to is not None:
+            transport, sid = to
+            transport.emit(event, data, to=sid)
+            return
+        for transport in self.transports:
+            transport.emit(event, data)
+
+
+class MetricsServer:
+    """Just GET /metrics as JSON, on the standard library's HTTP server."""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def run(self, port, host="127.0.0.1"):
+        """Serve on a daemon thread. Returns the server, or None if the port is taken."""
+        snapshot = self.snapshot
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = json.dumps(snapshot()).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        try:
+            server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            print(f"⚠️ /metrics not served on {host}:{port}: {e}")
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        print(f"📈 Metrics: http://{host}:{port}/metrics")
+        return server
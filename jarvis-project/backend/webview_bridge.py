@@ -0,0 +1,193 @@
+"""
+In-process transport for the orb: pywebview's JS bridge instead of a server.
+
+The bundled gui/ is read from disk and handed to the window as one HTML
+document (CSS and JS inlined, so nothing is fetched). A small shim goes in
+front of the bundle and stands in for the WebSocket the Socket.IO client
+opens: it answers the Engine.IO/Socket.IO handshake itself, turns events we
+push with `evaluate_js` into `42[...]` packets, and forwards what the client
+emits to Python through `js_api`. The built frontend runs unchanged.
+
+Same surface as WebServer (`on`, `emit`), so status sinks do not care which
+one they talk to. `emit()` never blocks: one sender thread runs the
+evaluate_js calls in order.
+"""
+import json
+import os
+import queue
+import re
+import threading
+
+SID = "bridge"  # one window, one client
+
+SHIM = r"""
+(function () {
+  var NativeWebSocket = window.WebSocket;
+  var sockets = [];
+  var ready = false;
+  var outbox = [];
+
+  function call(method, args) {
+    var send = function () { window.pywebview.api[method].apply(null, args); };
+    if (ready) { send(); } else { outbox.push(send); }
+  }
+  window.addEventListener('pywebviewready', function () {
+    ready = true;
+    outbox.splice(0).forEach(function (send) { send(); });
+  });
+
+  function BridgeSocket(url, protocols) {
+    if (String(url).indexOf('/socket.io/') === -1) {
+      return protocols ? new NativeWebSocket(url, protocols) : new NativeWebSocket(url);
+    }
+    var self = this;
+    this.url = url;
+    this.readyState = BridgeSocket.CONNECTING;
+    this.binaryType = 'arraybuffer';
+    this.protocol = '';
+    this.extensions = '';
+    this.bufferedAmount = 0;
+    sockets.push(this);
+    setTimeout(function () {
+      self.readyState = BridgeSocket.OPEN;
+      if (self.onopen) { self.onopen({}); }
+      self._receive('0' + JSON.stringify({
+        sid: '__SID__', upgrades: [], pingInterval: 25000, pingTimeout: 20000, maxPayload: 1000000
+      }));
+    }, 0);
+    // Keep the client's heartbeat timer happy; it answers with '3'
+    this._ping = setInterval(function () { self._receive('2'); }, 25000);
+  }
+  BridgeSocket.CONNECTING = 0;
+  BridgeSocket.OPEN = 1;
+  BridgeSocket.CLOSING = 2;
+  BridgeSocket.CLOSED = 3;
+
+  BridgeSocket.prototype._receive = function (data) {
+    if (this.readyState === BridgeSocket.OPEN && this.onmessage) { this.onmessage({ data: data }); }
+  };
+  BridgeSocket.prototype.send = function (data) {
+    if (typeof data !== 'string' || data === '3') { return; }
+    if (data.indexOf('40') === 0) {
+      this._receive('40' + JSON.stringify({ sid: '__SID__' }));
+      call('connect', []);
+      return;
+    }
+    var event = /^42\d*(\[.*)$/.exec(data);
+    if (event) {
+      var packet = JSON.parse(event[1]);
+      call('emit', [packet[0], packet.length > 1 ? packet[1] : null]);
+    }
+  };
+  BridgeSocket.prototype.close = function () {
+    clearInterval(this._ping);
+    this.readyState = BridgeSocket.CLOSED;
+    sockets = sockets.filter(function (s) { return s !== this; }, this);
+    if (this.onclose) { this.onclose({ code: 1000, reason: '', wasClean: true }); }
+  };
+  BridgeSocket.prototype.addEventListener = function () {};
+  BridgeSocket.prototype.removeEventListener = function () {};
+
+  window.WebSocket = BridgeSocket;
+  window.__jarvisBridge = {
+    deliver: function (event, data) {
+      var packet = '42' + JSON.stringify([event, data]);
+      sockets.forEach(function (s) { s._receive(packet); });
+    }
+  };
+})();
+""".replace("__SID__", SID)
+
+
+def _inline(html, gui_folder):
+    """index.html with its stylesheet and scripts pulled in, plus the shim first."""
+    def read(src):
+        with open(os.path.normpath(os.path.join(gui_folder, src)), encoding="utf-8") as f:
+            return f.read()
+
+    def script(match):
+        # A literal "</script" in the bundle would end the tag early
+        body = read(match.group(2)).replace("</script", "<\\/script")
+        return f'<script type="{match.group(1)}">{body}</script>'
+
+    def stylesheet(match):
+        return f"<style>{read(match.group(1))}</style>"
+
+    html = re.sub(r'<link rel="icon"[^>]*>\s*', "", html)
+    html = re.sub(r'<script type="(\w+)"[^>]*\ssrc="([^"]+)"[^>]*></script>', script, html)
+    html = re.sub(r'<link rel="stylesheet"[^>]*\shref="([^"]+)"[^>]*>', stylesheet, html)
+    return html.replace("<head>", f"<head>\n    <script>{SHIM}</script>", 1)
+
+
+class _Api:
+    """Exposed to the page as window.pywebview.api."""
+
+    def __init__(self, bridge):
+        self._bridge = bridge
+
+    def connect(self):
+        self._bridge._connected()
+
+    def emit(self, event, data=None):
+        self._bridge._dispatch(event, data)
+
+
+class WebviewBridge:
+    def __init__(self, gui_folder):
+        self.gui_folder = gui_folder
+        self.api = _Api(self)
+        self.window = None
+        self._handlers = {}
+        self._client = threading.Event()
+        self._outbox = queue.Queue()
+        self._thread = threading.Thread(target=self._send_loop, name="webview-bridge", daemon=True)
+        self._thread.start()
+
+    def html(self):
+        with open(os.path.join(self.gui_folder, "index.html"), encoding="utf-8") as f:
+            return _inline(f.read(), self.gui_folder)
+
+    def attach(self, window):
+        """Bind to the pywebview window created with `html=self.html(), js_api=self.api`."""
+        self.window = window
+
+    # --- PUBLIC API ---
+    def on(self, event, handler):
+        """Register `handler(sid, data)` for a client event ('connect' gets data=None)."""
+        self._handlers[event] = handler
+
+    def emit(self, event, data, to=None):
+        if not self._client.is_set():
+            return  # the page has not connected yet; it gets a snapshot when it does
+        self._outbox.put((event, data))
+
+    # --- FROM THE PAGE ---
+    def _connected(self):
+        # A page (re)load starts a new client; drop what was meant for the old one
+        self._client.clear()
+        while not self._outbox.empty():
+            self._outbox.get_nowait()
+        self._client.set()
+        self._dispatch("connect", None)
+
+    def _dispatch(self, event, data):
+        handler = self._handlers.get(event)
+        if handler is None:
+            return
+        try:
+            handler(SID, data)
+        except Exception as e:
+            print(f"(Bridge handler error in {event}: {e})")
+
+    # --- SENDER ---
+    def _send_loop(self):
+        while True:
+            event, data = self._outbox.get()
+            if self.window is None:
+                continue
+            try:
+                self.window.evaluate_js(
+                    f"window.__jarvisBridge && window.__jarvisBridge.deliver({json.dumps(event)}, {json.dumps(data)})"
+                )
+            except Exception as e:
+                print(f"(Bridge send error: {e})")
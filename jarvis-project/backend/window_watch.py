@@ -0,0 +1,195 @@
+"""
+Window-appearance watcher for the app launcher.
+
+Instead of OCR'ing the screen every two seconds after launching an app, we
+watch the window manager's client list (_NET_CLIENT_LIST on the root window)
+and match new windows by WM_CLASS or title.
+
+With python-xlib (already pulled in by pyautogui on Linux) this is event
+driven: we sleep on PropertyNotify for the root window and only look at the
+list when it changes. Without it we fall back to polling `wmctrl -lx`,
+which is one cheap process per 100 ms instead of a full Tesseract pass.
+"""
+import os
+import select
+import shutil
+import subprocess
+import time
+
+
+class WindowInfo:
+    def __init__(self, window_id, wm_class, title, bounds=None):
+        self.id = window_id
+        self.wm_class = wm_class or ""
+        self.title = title or ""
+        # (x, y, width, height) in root-window coordinates, when known
+        self.bounds = bounds
+
+    def matches(self, needles):
+        haystack = f"{self.wm_class} {self.title}".lower()
+        return any(n.lower() in haystack for n in needles if n)
+
+    def __repr__(self):
+        return f"WindowInfo(0x{self.id:x}, {self.wm_class!r}, {self.title!r})"
+
+
+# --- XLIB (EVENT DRIVEN) ---
+class _XlibSource:
+    def __init__(self, display_name=None):
+        from Xlib import X, display
+
+        self._X = X
+        self.display = display.Display(display_name)
+        self.root = self.display.screen().root
+        self.atom_clients = self.display.intern_atom("_NET_CLIENT_LIST")
+        self.atom_stacking = self.display.intern_atom("_NET_CLIENT_LIST_STACKING")
+        self.atom_name = self.display.intern_atom("_NET_WM_NAME")
+        self.atom_utf8 = self.display.intern_atom("UTF8_STRING")
+        self.root.change_attributes(event_mask=X.PropertyChangeMask)
+        self.display.flush()
+
+    def client_ids(self, stacking=False):
+        atom = self.atom_stacking if stacking else self.atom_clients
+        prop = self.root.get_full_property(atom, self._X.AnyPropertyType)
+        return list(prop.value) if prop else []
+
+    def describe(self, window_id):
+        try:
+            win = self.display.create_resource_object("window", window_id)
+            wm_class = win.get_wm_class() or ()
+            name = win.get_full_property(self.atom_name, self.atom_utf8)
+            title = name.value.decode("utf-8", "replace") if name else (win.get_wm_name() or "")
+            geometry = win.get_geometry()
+            origin = self.root.translate_coords(win, 0, 0)
+            bounds = (origin.x, origin.y, geometry.width, geometry.height)
+            return WindowInfo(window_id, " ".join(wm_class), title, bounds)
+        except Exception:
+            # Window vanished between listing and inspection
+            return None
+
+    def wait_for_change(self, timeout):
+        """Block until the client list may have changed, or `timeout` passes."""
+        deadline = time.monotonic() + timeout
+        while True:
+            while self.display.pending_events():
+                event = self.display.next_event()
+                if event.type == self._X.PropertyNotify and event.atom == self.atom_clients:
+                    return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            readable, _, _ = select.select([self.display.fileno()], [], [], remaining)
+            if not readable:
+                return False
+
+    def close(self):
+        self.display.close()
+
+
+# --- WMCTRL (POLLING FALLBACK) ---
+class _WmctrlSource:
+    def __init__(self, display_name=None, interval=0.1):
+        self.binary = shutil.which("wmctrl")
+        if not self.binary:
+            raise RuntimeError("wmctrl not installed")
+        self.interval = interval
+        self.env = dict(os.environ, DISPLAY=display_name) if display_name else None
+        self._cache = {}
+
+    def client_ids(self, stacking=False):
+        # wmctrl lists in mapping order, which is close enough to stacking order
+        out = subprocess.run(
+            [self.binary, "-lxG"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=self.env, text=True
+        ).stdout
+        self._cache = {}
+        for line in out.splitlines():
+            # 0x03a00003  0 10 40 1280 720  Navigator.firefox  host  Title words...
+            parts = line.split(None, 8)
+            if len(parts) < 7:
+                continue
+            window_id = int(parts[0], 16)
+            bounds = tuple(int(v) for v in parts[2:6])
+            title = parts[8] if len(parts) > 8 else ""
+            self._cache[window_id] = WindowInfo(window_id, parts[6].replace(".", " "), title, bounds)
+        return list(self._cache)
+
+    def describe(self, window_id):
+        return self._cache.get(window_id)
+
+    def wait_for_change(self, timeout):
+        time.sleep(min(self.interval, max(timeout, 0)))
+        return True
+
+    def close(self):
+        pass
+
+
+class WindowWatcher:
+    def __init__(self, display_name=None):
+        self.display_name = display_name
+
+    def _open(self):
+        try:
+            return _XlibSource(self.display_name)
+        except Exception:
+            return _WmctrlSource(self.display_name)
+
+    def snapshot(self):
+        """IDs of the windows that exist right now (call before launching)."""
+        try:
+            source = self._open()
+        except Exception:
+            return set()
+        try:
+            return set(source.client_ids())
+        finally:
+            source.close()
+
+    def newest(self, needles=None):
+        """Topmost window (optionally the topmost matching `needles`), with bounds."""
+        try:
+            source = self._open()
+        except Exception:
+            return None
+        try:
+            for window_id in reversed(source.client_ids(stacking=True)):
+                info = source.describe(window_id)
+                if info and (not needles or info.matches(needles)):
+                    return info
+            return None
+        finally:
+            source.close()
+
+    def wait_for(self, needles, known=None, timeout=10.0, token=None):
+        """
+        Wait for a window that is not in `known` and whose WM_CLASS or title
+        contains any of `needles`. Returns its WindowInfo, or None on timeout
+        or cancellation.
+        """
+        try:
+            source = self._open()
+        except Exception as e:
+            print(f"(Window watch unavailable: {e})")
+            return None
+
+        known = set(known or ())
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                for window_id in source.client_ids():
+                    if window_id in known:
+                        continue
+                    info = source.describe(window_id)
+                    if info is None:
+                        continue
+                    if info.matches(needles):
+                        return info
+                    # Titles fill in after mapping; only skip windows we could read
+                    if info.wm_class:
+                        known.add(window_id)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or (token is not None and token.cancelled):
+                    return None
+                source.wait_for_change(min(remaining, 0.25))
+        finally:
+            source.close()
@@ -1,8 +1,11 @@
 import tkinter as tk
+import os
+import sys
 import threading
 import speech_recognition as sr
 from gtts import gTTS
-import os
+import io
+import queue
 import time
 import pygame
 import datetime
@@ -13,16 +16,37 @@ import re
 from PIL import Image, ImageOps
 from interpreter import interpreter
 
+# Shares the backend's task runner rather than keeping its own pool
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "jarvis-project", "backend"))
+from task_runner import TaskRunner, current_token
+
 # --- CONFIGURATION ---
 interpreter.offline = True
 interpreter.llm.model = "ollama/llama3"
 interpreter.llm.api_base = "http://localhost:11434"
 interpreter.auto_run = True
 interpreter.custom_instructions = "My terminal is Zsh. Always use 'gtk-launch' for GUI apps."
+# One conversation on one global interpreter: tasks take turns
+interpreter_lock = threading.Lock()
 
 # Global Control Flags
 stop_event = threading.Event()
 ui_state = "HIDDEN"  # States: HIDDEN, LISTENING, THINKING, SPEAKING
+ui = None
+state_lock = threading.Lock()
+
+def set_state(state, only_from=None):
+    """Change the orb state and wake the UI (safe from any thread).
+
+    With `only_from`, the change only happens if the orb is still in that state.
+    """
+    global ui_state
+    with state_lock:
+        if state == ui_state or (only_from is not None and ui_state != only_from):
+            return
+        ui_state = state
+    if ui is not None:
+        ui.notify()
 
 # --- THE GUI CLASS (Linux Compatible) ---
 class JarvisUI:
@@ -51,14 +75,34 @@ class JarvisUI:
         self.label = tk.Label(self.root, text="OFFLINE", bg="black", fg="white", font=("Arial", 8))
         self.label.pack()
 
-        # Start the updater loop
+        # Redraw when the state changes instead of polling it
+        global ui
+        self.drawn_state = None
+        self.redraw_job = None
+        self.root.bind("<<StatusChanged>>", self.schedule_update)
+        ui = self
         self.update_ui()
         self.root.withdraw() # Start hidden
         self.root.mainloop()
 
+    def notify(self):
+        # Runs on worker threads; Tk hands the event to its own thread
+        try:
+            self.root.event_generate("<<StatusChanged>>", when="tail")
+        except tk.TclError:
+            pass
+
+    def schedule_update(self, event=None):
+        # Coalesce bursts (THINKING -> SPEAKING -> IDLE) into one redraw
+        if self.redraw_job is None:
+            self.redraw_job = self.root.after(50, self.update_ui)
+
     def update_ui(self):
-        global ui_state
-        
+        self.redraw_job = None
+        if ui_state == self.drawn_state:
+            return
+        self.drawn_state = ui_state
+
         if ui_state == "HIDDEN":
             self.root.withdraw()
         else:
@@ -72,43 +116,49 @@ class JarvisUI:
             elif ui_state == "SPEAKING":
                 self.canvas.itemconfig(self.ball, fill="#FF0000") # Red
                 self.label.config(text="SPEAKING")
-        
-        self.root.after(100, self.update_ui)
 
 # --- AUDIO FUNCTIONS ---
+# Replies go through one playback thread that keeps the mixer open and decodes
+# gTTS output from memory, so there is no temp file to race on.
+speech_queue = queue.Queue()
+
+def audio_worker():
+    pygame.mixer.init()
+    while True:
+        text, done = speech_queue.get()
+        try:
+            buffer = io.BytesIO()
+            gTTS(text=text, lang='en', tld='co.uk').write_to_fp(buffer)
+            buffer.seek(0)
+            if not stop_event.is_set():
+                pygame.mixer.music.load(buffer, "mp3")
+                pygame.mixer.music.play()
+                while pygame.mixer.music.get_busy():
+                    if stop_event.is_set():
+                        pygame.mixer.music.stop()
+                        break
+                    time.sleep(0.01)
+                pygame.mixer.music.unload()
+        except Exception as e:
+            print(f"(TTS Error: {e})")
+        done.set()
+
 def speak(text):
-    global ui_state
     if stop_event.is_set(): return
     
     prev_state = ui_state
-    ui_state = "SPEAKING" 
+    set_state("SPEAKING")
     
-    try:
-        print(f"🗣️ Speaking: {text}")
-        tts = gTTS(text=text, lang='en', tld='co.uk')
-        filename = "voice.mp3"
-        tts.save(filename)
-        
-        pygame.mixer.init()
-        pygame.mixer.music.load(filename)
-        pygame.mixer.music.play()
-        
-        while pygame.mixer.music.get_busy():
-            if stop_event.is_set():
-                pygame.mixer.music.stop()
-                break
-            time.sleep(0.1)
-        
-        pygame.mixer.quit()
-        if os.path.exists(filename): os.remove(filename)
-    except Exception as e:
-        print(f"(TTS Error: {e})")
+    print(f"🗣️ Speaking: {text}")
+    done = threading.Event()
+    speech_queue.put((text, done))
+    done.wait()
     
-    ui_state = prev_state 
+    set_state(prev_state)
 
 def listen_for_wakeword():
-    global ui_state
-    ui_state = "HIDDEN"
+    if not runner.busy():
+        set_state("HIDDEN")
     
     r = sr.Recognizer()
     with sr.Microphone() as source:
@@ -125,8 +175,7 @@ def listen_for_wakeword():
                 continue
 
 def listen_for_command():
-    global ui_state
-    ui_state = "LISTENING"
+    set_state("LISTENING")
     
     r = sr.Recognizer()
     with sr.Microphone() as source:
@@ -137,7 +186,7 @@ def listen_for_command():
         print("👂 Listening (I am being patient)...")
         try:
             audio = r.listen(source, timeout=5, phrase_time_limit=None)
-            ui_state = "THINKING"
+            set_state("THINKING")
             return r.recognize_google(audio, language='en-US').lower()
         except:
             return None
@@ -155,7 +204,6 @@ def scan_screen_for_text(target_word):
 
 # --- LOGIC BRAIN ---
 def execute_task(command):
-    global ui_state
     if stop_event.is_set(): return
     print(f"⚙️ Processing: {command}")
     
@@ -265,7 +313,8 @@ def execute_task(command):
             # Smart Wait Loop
             app_found = False
             for attempt in range(5):
-                time.sleep(2.0)
+                if current_token().sleep(2.0):
+                    return
                 if scan_screen_for_text(visual_keyword):
                     app_found = True
                     speak(f"I see {visual_keyword}.")
@@ -278,14 +327,21 @@ def execute_task(command):
     try:
         now = datetime.datetime.now().strftime("%H:%M")
         prompt = f"(System: Time is {now}) {command}"
-        if not stop_event.is_set():
-            interpreter.chat(prompt)
+        with interpreter_lock:
+            if not stop_event.is_set() and not current_token().cancelled:
+                interpreter.chat(prompt)
     except:
         pass
 
 # --- MAIN THREAD ---
+def hide_when_done():
+    # 4. Hide Ball, unless a new wake word has already moved it on
+    set_state("HIDDEN", only_from="THINKING")
+
+# Bounded, and "stop" cancels whatever is running or queued
+runner = TaskRunner(max_workers=2, max_pending=2, stop_event=stop_event, on_idle=hide_when_done)
+
 def jarvis_logic():
-    global ui_state
     speak("System Online.")
     
     while True:
@@ -301,20 +357,23 @@ def jarvis_logic():
             command = listen_for_command()
         
         if not command:
-            ui_state = "HIDDEN"
+            set_state("HIDDEN")
             continue
 
-        # 3. Execute
-        ui_state = "THINKING"
-        t_exec = threading.Thread(target=execute_task, args=(command,))
-        t_exec.start()
-        t_exec.join()
-        
-        # 4. Hide Ball
-        ui_state = "HIDDEN"
+        if command in ("stop", "cancel", "never mind"):
+            print(f"🛑 Cancelled {runner.cancel_all()} task(s)")
+            set_state("HIDDEN")
+            continue
+
+        # 3. Execute in the background so we go straight back to listening
+        set_state("THINKING")
+        if runner.submit(execute_task, command) is None:
+            speak("I'm still working on the last few requests.")
 
 # --- LAUNCHER ---
 if __name__ == "__main__":
+    threading.Thread(target=audio_worker, daemon=True).start()
+    
     t = threading.Thread(target=jarvis_logic)
     t.daemon = True 
     t.start()